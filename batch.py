@@ -0,0 +1,168 @@
+"""Creazione dei report di più clienti in parallelo, un processo per report."""
+import argparse
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from mercato import SezioneMercato
+from portfolio import Report
+
+
+def file_report(file_portafoglio: Path | str, cartella: Path | str) -> Path:
+    """
+    Percorso del report di un cliente: report_<nome del file di input>.xlsx nella cartella di output.
+
+    Arguments:
+        file_portafoglio {Path | str} -- file excel del cliente
+        cartella {Path | str} -- cartella in cui salvare i report
+
+    Returns:
+        Path -- percorso del report
+    """
+    return Path(cartella).joinpath(f'report_{Path(file_portafoglio).stem}.xlsx')
+
+
+def genera_report(file_portafoglio: Path | str, t1: str, file_output: Path | str,
+    mercato: SezioneMercato | None = None) -> dict:
+    """
+    Crea il report di un cliente. Eseguita in un processo separato: gli errori non vengono propagati
+    ma riportati nel risultato, così che un cliente non interrompa gli altri.
+
+    Arguments:
+        file_portafoglio {Path | str} -- file excel del cliente
+        t1 {str} -- data finale del report (gg/mm/aaaa)
+        file_output {Path | str} -- percorso del report
+
+    Keyword Arguments:
+        mercato {SezioneMercato | None} -- sezione di mercato già calcolata per t1 (default: {None})
+
+    Returns:
+        dict -- file di input e di output, esito, secondi impiegati ed eventuale errore
+    """
+    inizio = time.perf_counter()
+    risultato = {'input': str(file_portafoglio), 'output': str(file_output), 'esito': 'ok', 'errore': None}
+    try:
+        Report(t1=t1, file_portafoglio=file_portafoglio, mercato=mercato).genera(file_output)
+    except Exception:
+        risultato['esito'] = 'errore'
+        risultato['errore'] = traceback.format_exc()
+    risultato['secondi'] = round(time.perf_counter() - inizio, 3)
+    return risultato
+
+
+def espandi(percorsi: list) -> list[Path]:
+    """
+    Espande i percorsi con caratteri jolly (es. clienti/*.xlsx), eliminando i duplicati.
+    I percorsi senza corrispondenze sono mantenuti, così che compaiano tra i report falliti.
+
+    Arguments:
+        percorsi {list} -- file o pattern glob
+
+    Returns:
+        list[Path] -- file da elaborare, nell'ordine dato
+    """
+    file = {}
+    for percorso in percorsi:
+        for trovato in sorted(glob.glob(str(percorso))) or [percorso]:
+            file.setdefault(Path(trovato).resolve(), None)
+    return list(file)
+
+
+def sezione_comune(file: list[Path], t1: str) -> SezioneMercato | None:
+    """
+    Calcola la sezione di mercato una sola volta, dal primo file leggibile, da passare a tutti i processi.
+    Ogni report la usa solo se i suoi dati di mercato coincidono, altrimenti calcola la propria.
+
+    Arguments:
+        file {list[Path]} -- file excel dei clienti
+        t1 {str} -- data finale dei report (gg/mm/aaaa)
+
+    Returns:
+        SezioneMercato | None -- sezione di mercato, None se nessun file è leggibile
+    """
+    for file_portafoglio in file:
+        try:
+            return Report(t1=t1, file_portafoglio=file_portafoglio, pagine=['analisi_rendimenti_4']).mercato
+        except Exception:
+            continue
+    return None
+
+
+def batch(percorsi: list, t1: str, cartella: Path | str = 'report', processi: int | None = None) -> list[dict]:
+    """
+    Crea i report di tutti i clienti in un pool di processi e salva il riepilogo in riepilogo.json.
+
+    Arguments:
+        percorsi {list} -- file excel dei clienti o pattern glob
+        t1 {str} -- data finale dei report (gg/mm/aaaa)
+
+    Keyword Arguments:
+        cartella {Path | str} -- cartella in cui salvare i report (default: {'report'})
+        processi {int | None} -- numero di processi, il numero di CPU se None (default: {None})
+
+    Returns:
+        list[dict] -- esito di ogni report, nell'ordine dei file di input
+    """
+    file = espandi(percorsi)
+    uscite = [file_report(f, cartella) for f in file]
+    doppi = {u.name for u in uscite if uscite.count(u) > 1}
+    if doppi:
+        raise ValueError(f'Più file di input producono lo stesso report: {", ".join(sorted(doppi))}')
+    Path(cartella).mkdir(parents=True, exist_ok=True)
+
+    inizio = time.perf_counter()
+    mercato = sezione_comune(file, t1)
+    risultati = {}
+    with ProcessPoolExecutor(max_workers=processi) as pool:
+        futuri = {pool.submit(genera_report, f, t1, u, mercato): f for f, u in zip(file, uscite)}
+        for futuro in as_completed(futuri):
+            risultato = futuro.result()
+            risultati[futuri[futuro]] = risultato
+            print(f"{risultato['esito']:>6}  {risultato['secondi']:8.2f} s  {Path(risultato['input']).name}")
+    risultati = [risultati[f] for f in file]
+
+    totale = round(time.perf_counter() - inizio, 3)
+    riepilogo = {
+        't1': t1, 'secondi': totale, 'processi': processi or os.cpu_count(),
+        'ok': sum(r['esito'] == 'ok' for r in risultati), 'errori': sum(r['esito'] != 'ok' for r in risultati),
+        'report': risultati,
+    }
+    Path(cartella).joinpath('riepilogo.json').write_text(json.dumps(riepilogo, indent=2, ensure_ascii=False), encoding='utf-8')
+    stampa_riepilogo(riepilogo)
+    return risultati
+
+
+def stampa_riepilogo(riepilogo: dict):
+    """
+    Stampa il riepilogo del batch: report creati, falliti (con l'ultima riga dell'errore) e tempi.
+
+    Arguments:
+        riepilogo {dict} -- riepilogo prodotto da batch() o da storico.storico()
+    """
+    report = riepilogo['report']
+    print(f"\nReport creati : {riepilogo['ok']}, falliti : {riepilogo['errori']}, in {riepilogo['secondi']:.2f} secondi.")
+    for r in report:
+        if r['esito'] != 'ok':
+            print(f"  {Path(r['output']).name} : {r['errore'].strip().splitlines()[-1]}")
+    if report:
+        secondi = sorted(r['secondi'] for r in report)
+        print(f"Tempo per report : min {secondi[0]:.2f} s, mediana {secondi[len(secondi) // 2]:.2f} s, max {secondi[-1]:.2f} s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crea i report di più clienti in parallelo.')
+    parser.add_argument('input', nargs='+', help='file excel dei clienti o pattern glob (es. clienti/*.xlsx)')
+    parser.add_argument('--t1', required=True, help='data finale dei report (gg/mm/aaaa)')
+    parser.add_argument('--output', default='report', help='cartella in cui salvare i report (default: report)')
+    parser.add_argument('--processi', type=int, default=None, help='numero di processi (default: numero di CPU)')
+    args = parser.parse_args()
+    risultati = batch(args.input, args.t1, args.output, args.processi)
+    raise SystemExit(1 if any(r['esito'] != 'ok' for r in risultati) else 0)
+
+
+if __name__ == '__main__':
+    main()
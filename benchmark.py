@@ -0,0 +1,200 @@
+"""
+Benchmark del report su file di input sintetici di dimensioni crescenti.
+Misura il report completo e ogni fase (caricamento dei fogli, pagine, layout, salvataggio),
+salva i risultati come baseline e li confronta con una baseline salvata in precedenza.
+
+Esempio:
+    python benchmark.py --posizioni 50 200 800 3200 --salva benchmark_baseline.json
+    python benchmark.py --posizioni 50 200 800 3200 --confronta benchmark_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import immagini
+import mercato
+import sintetico
+from immagini import LOGO
+from portfolio import Report
+from profilo import Profilo
+
+# Fasi misurate per ogni scenario oltre a quelle del profilo
+TOTALE = 'totale'
+
+
+def nome_scenario(scenario: dict) -> str:
+    """
+    Nome di uno scenario, dai parametri del generatore (es. p800_i10_c8_d3_a5).
+
+    Arguments:
+        scenario {dict} -- parametri di sintetico.genera
+
+    Returns:
+        str -- nome dello scenario
+    """
+    return '_'.join(f'{chiave[0]}{scenario[chiave]}' for chiave in ('posizioni', 'intermediari', 'categorie', 'divise', 'anni'))
+
+
+def esegui(file_portafoglio: Path, t1: str) -> dict:
+    """
+    Crea un report completo a freddo, senza cache dei fogli, sezione di mercato o logo già letti,
+    e ne misura le fasi. Va eseguita nella cartella del file di input.
+
+    Arguments:
+        file_portafoglio {Path} -- file di input
+        t1 {str} -- data finale del report (gg/mm/aaaa)
+
+    Returns:
+        dict -- secondi per fase, compreso il totale
+    """
+    shutil.rmtree('.cache', ignore_errors=True)
+    mercato._sezioni.clear()
+    mercato._serie.clear()
+    mercato._indici.clear()
+    immagini._immagini.clear()
+    profilo = Profilo(memoria=False)
+    inizio = time.perf_counter()
+    Report(t1=t1, file_portafoglio=file_portafoglio, profilo=profilo).genera(file_portafoglio.with_name('report.xlsx'))
+    secondi = {fase['fase']: fase['secondi'] for fase in profilo.fasi}
+    secondi[TOTALE] = round(time.perf_counter() - inizio, 4)
+    return secondi
+
+
+def benchmark(scenari: list[dict], t1: str = '31/12/2024', ripetizioni: int = 3) -> dict:
+    """
+    Genera il file di input di ogni scenario e crea il report `ripetizioni` volte,
+    tenendo per ogni fase il tempo minimo, il meno disturbato dagli altri processi.
+
+    Arguments:
+        scenari {list[dict]} -- parametri di sintetico.genera per ogni scenario
+
+    Keyword Arguments:
+        t1 {str} -- data finale del report (gg/mm/aaaa) (default: {'31/12/2024'})
+        ripetizioni {int} -- esecuzioni per scenario (default: {3})
+
+    Returns:
+        dict -- parametri e secondi per fase di ogni scenario, per nome dello scenario
+    """
+    risultati = {}
+    cartella_iniziale = Path.cwd()
+    with tempfile.TemporaryDirectory() as cartella:
+        os.chdir(cartella) # il report legge il logo e salva la cache nella cartella di lavoro
+        try:
+            sintetico.logo(LOGO)
+            for scenario in scenari:
+                nome = nome_scenario(scenario)
+                file_portafoglio = sintetico.genera(Path(cartella).joinpath(f'{nome}.xlsx'), t1, **scenario)
+                misure = [esegui(file_portafoglio, t1) for _ in range(ripetizioni)]
+                secondi = {fase: min(misura[fase] for misura in misure) for fase in misure[0]}
+                risultati[nome] = {'parametri': scenario, 'secondi': secondi}
+                print(f'{nome:<24} {secondi[TOTALE]:8.3f} s')
+        finally:
+            os.chdir(cartella_iniziale)
+    return risultati
+
+
+def esponenti(risultati: dict) -> dict:
+    """
+    Per ogni fase, pendenza della retta log(secondi) ~ log(posizioni) tra gli scenari:
+    circa 1 se la fase cresce linearmente con le posizioni, circa 2 se quadraticamente, circa 0 se non ne dipende.
+
+    Arguments:
+        risultati {dict} -- risultati di benchmark()
+
+    Returns:
+        dict -- esponente per fase, vuoto se gli scenari hanno meno di due numeri di posizioni diversi
+    """
+    scenari = list(risultati.values())
+    posizioni = np.array([scenario['parametri']['posizioni'] for scenario in scenari], dtype=float)
+    if len(set(posizioni)) < 2:
+        return {}
+    fasi = set.intersection(*(set(scenario['secondi']) for scenario in scenari))
+    pendenze = {}
+    for fase in fasi:
+        secondi = np.array([scenario['secondi'][fase] for scenario in scenari])
+        if (secondi > 0).all():
+            pendenze[fase] = float(np.polyfit(np.log(posizioni), np.log(secondi), 1)[0])
+    return pendenze
+
+
+def confronta(risultati: dict, baseline: dict, soglia: float = 1.2, minimo: float = 0.01) -> list[tuple]:
+    """
+    Confronta i risultati con una baseline, fase per fase, negli scenari presenti in entrambi.
+
+    Arguments:
+        risultati {dict} -- risultati di benchmark()
+        baseline {dict} -- risultati salvati in precedenza
+
+    Keyword Arguments:
+        soglia {float} -- rapporto oltre il quale una fase è considerata peggiorata (default: {1.2})
+        minimo {float} -- secondi sotto i quali una fase non è considerata, troppo rumorosa (default: {0.01})
+
+    Returns:
+        list[tuple] -- (scenario, fase, secondi della baseline, secondi attuali) delle fasi peggiorate
+    """
+    peggiorate = []
+    for nome, scenario in risultati.items():
+        if nome not in baseline:
+            continue
+        riferimento = baseline[nome]['secondi']
+        for fase, secondi in scenario['secondi'].items():
+            prima = riferimento.get(fase)
+            if prima is None or max(prima, secondi) < minimo:
+                continue
+            rapporto = secondi / prima if prima else float('inf')
+            segno = '!!' if rapporto > soglia else '  '
+            print(f'{segno} {nome:<24} {fase:<40} {prima:8.3f} -> {secondi:8.3f} s  x{rapporto:5.2f}')
+            if rapporto > soglia:
+                peggiorate.append((nome, fase, prima, secondi))
+    return peggiorate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del report su file di input sintetici.')
+    parser.add_argument('--posizioni', type=int, nargs='+', default=[50, 200, 800, 3200])
+    parser.add_argument('--intermediari', type=int, default=10)
+    parser.add_argument('--categorie', type=int, default=len(sintetico.CATEGORIE))
+    parser.add_argument('--divise', type=int, default=3)
+    parser.add_argument('--anni', type=int, default=5, help='anni di storico giornaliero')
+    parser.add_argument('--t1', default='31/12/2024', help='data finale del report (gg/mm/aaaa)')
+    parser.add_argument('--ripetizioni', type=int, default=3)
+    parser.add_argument('--salva', help='file in cui salvare i risultati come baseline')
+    parser.add_argument('--confronta', help='baseline con cui confrontare i risultati')
+    parser.add_argument('--soglia', type=float, default=1.2, help='rapporto oltre il quale una fase è peggiorata')
+    args = parser.parse_args()
+
+    scenari = [
+        {'posizioni': posizioni, 'intermediari': args.intermediari, 'categorie': args.categorie,
+         'divise': args.divise, 'anni': args.anni}
+        for posizioni in args.posizioni
+    ]
+    risultati = benchmark(scenari, args.t1, args.ripetizioni)
+
+    pendenze = esponenti(risultati)
+    if pendenze:
+        print('\nCrescita con il numero di posizioni (secondi ~ posizioni^k):')
+        for fase, k in sorted(pendenze.items(), key=lambda voce: voce[1], reverse=True):
+            print(f'  {fase:<40} k = {k:5.2f}')
+
+    if args.salva:
+        Path(args.salva).write_text(json.dumps(
+            {'python': platform.python_version(), 'macchina': platform.machine(), 't1': args.t1, 'scenari': risultati},
+            indent=2, ensure_ascii=False
+        ), encoding='utf-8')
+    if args.confronta:
+        baseline = json.loads(Path(args.confronta).read_text(encoding='utf-8'))['scenari']
+        print()
+        peggiorate = confronta(risultati, baseline, args.soglia)
+        print(f'\nFasi peggiorate oltre x{args.soglia}: {len(peggiorate)}')
+        raise SystemExit(1 if peggiorate else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Riduzione dei punti delle serie dei grafici, mantenendone la forma (Largest-Triangle-Three-Buckets)."""
+import numpy as np
+import pandas as pd
+
+# Punti minimi di un campionamento: la prima e l'ultima riga e almeno un intervallo tra le due
+PUNTI_MINIMI = 3
+
+
+def lttb(valori: np.ndarray, punti: int) -> np.ndarray:
+    """
+    Sceglie `punti` righe di una serie con l'algoritmo Largest-Triangle-Three-Buckets: la prima e l'ultima riga
+    e, per ogni intervallo in cui sono divise le altre, la riga che forma il triangolo di area massima con la riga
+    scelta nell'intervallo precedente e la media dell'intervallo successivo. Così picchi e minimi restano visibili.
+    L'ascissa è la posizione della riga, come sull'asse delle categorie dei grafici.
+    I valori mancanti all'interno della serie non sono mai preferiti.
+
+    Arguments:
+        valori {np.ndarray} -- valori della serie, dal primo all'ultimo valore presente
+        punti {int} -- righe da scegliere, almeno PUNTI_MINIMI
+
+    Raises:
+        ValueError: se punti è minore di PUNTI_MINIMI
+
+    Returns:
+        np.ndarray -- posizioni delle righe scelte, in ordine crescente
+    """
+    if punti < PUNTI_MINIMI:
+        raise ValueError(f'Servono almeno {PUNTI_MINIMI} punti per campionare una serie, non {punti}')
+    righe = len(valori)
+    if righe <= punti:
+        return np.arange(righe)
+    # Estremi degli intervalli tra la seconda e la penultima riga
+    estremi = (np.arange(punti - 1) * (righe - 2) / (punti - 2)).astype(int) + 1
+    estremi[-1] = righe - 1
+    scelte = np.zeros(punti, dtype=int)
+    scelte[-1] = righe - 1
+    for intervallo in range(punti - 2):
+        inizio, fine = estremi[intervallo], estremi[intervallo + 1]
+        # Media dell'intervallo successivo (l'ultima riga per l'ultimo intervallo)
+        successivo = valori[fine:estremi[intervallo + 2] if intervallo + 2 < len(estremi) else righe]
+        presenti = ~np.isnan(successivo)
+        media_y = successivo[presenti].mean() if presenti.any() else np.nan
+        media_x = (fine + fine + len(successivo) - 1) / 2
+        x_a = scelte[intervallo]
+        y_a = valori[x_a]
+        x = np.arange(inizio, fine)
+        aree = np.abs((x_a - media_x) * (valori[inizio:fine] - y_a) - (x_a - x) * (media_y - y_a))
+        scelte[intervallo + 1] = inizio + np.argmax(np.where(np.isnan(aree), -1, aree))
+    return scelte
+
+
+def campiona_coppie(df: pd.DataFrame, punti: int | None) -> pd.DataFrame:
+    """
+    Riduce a `punti` righe un foglio in cui ogni serie è preceduta dalla sua colonna di date
+    (es. le serie giornaliere della pagina 5), scegliendo le righe di ogni serie con lttb.
+    Ogni serie è campionata sulle sue righe, dal primo all'ultimo valore presente, così che una serie più corta
+    delle altre mantenga il suo ultimo valore; le serie con meno righe sono completate da celle vuote.
+
+    Arguments:
+        df {pd.DataFrame} -- colonne alternate di date e valori
+        punti {int | None} -- righe da tenere per serie, almeno PUNTI_MINIMI; None per tenerle tutte
+
+    Returns:
+        pd.DataFrame -- foglio con al massimo `punti` righe, indicizzato da 0
+    """
+    if punti is None or len(df) <= punti:
+        return df
+    colonne = {}
+    for data, nome in zip(df.columns[::2], df.columns[1::2]):
+        presenti = np.flatnonzero(df[data].notna().to_numpy() & df[nome].notna().to_numpy())
+        righe = np.arange(presenti[0], presenti[-1] + 1) if len(presenti) else np.arange(0)
+        scelte = righe[lttb(df[nome].to_numpy(dtype=float)[righe], punti)]
+        colonne[data] = df[data].iloc[scelte].reset_index(drop=True)
+        colonne[nome] = df[nome].iloc[scelte].reset_index(drop=True)
+    return pd.DataFrame(colonne, columns=df.columns)
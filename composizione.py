@@ -0,0 +1,88 @@
+"""Serie dei benchmark costruite dai livelli degli indici che li compongono, con pesi e ribilanciamento periodico."""
+import numpy as np
+import pandas as pd
+
+
+def date_ribilanciamento(indice: pd.DatetimeIndex, frequenza: str | None) -> np.ndarray:
+    """
+    Date in cui il benchmark torna ai pesi obiettivo: la prima data e l'ultima data disponibile di ogni periodo.
+
+    Arguments:
+        indice {pd.DatetimeIndex} -- date dei livelli, in ordine crescente
+        frequenza {str | None} -- periodo di ribilanciamento di pandas (es. 'M' mensile, 'Q' trimestrale, 'Y' annuale),
+            None per non ribilanciare mai (buy and hold)
+
+    Returns:
+        np.ndarray -- True nelle date di ribilanciamento
+    """
+    ribilancia = np.zeros(len(indice), dtype=bool)
+    if frequenza is not None:
+        periodi = indice.to_period(frequenza).asi8
+        ribilancia[:-1] = periodi[1:] != periodi[:-1]
+        ribilancia[-1] = True
+    ribilancia[0] = True
+    return ribilancia
+
+
+def serie_composta(livelli: pd.DataFrame, pesi: dict, frequenza: str | None, base: str, valore_base: float = 100) -> pd.Series:
+    """
+    Valore di un benchmark composto dagli indici `pesi`, riportati ai pesi obiettivo a ogni data di ribilanciamento
+    e lasciati liberi di variare tra una data e l'altra. Il calcolo è un'unica operazione sugli array:
+    la crescita di ogni data rispetto all'ultimo ribilanciamento precedente è il prodotto scalare tra i pesi
+    e i rapporti tra i livelli, e il valore ai ribilanciamenti è il prodotto cumulato delle crescite.
+    La serie parte dalla prima data in cui tutti gli indici hanno un livello; i livelli mancanti dopo
+    quella data valgono come l'ultimo disponibile.
+
+    Arguments:
+        livelli {pd.DataFrame} -- livelli degli indici, una colonna per indice, indicizzati per data
+        pesi {dict} -- nome dell'indice -> peso, con somma 1
+        frequenza {str | None} -- periodo di ribilanciamento (vedi date_ribilanciamento)
+        base {str} -- data in cui il benchmark vale `valore_base`, risolta all'ultima data disponibile
+
+    Keyword Arguments:
+        valore_base {float} -- valore del benchmark alla data base (default: {100})
+
+    Raises:
+        ValueError: se i pesi non sommano a 1 o se la data base precede i livelli disponibili
+
+    Returns:
+        pd.Series -- valore del benchmark per data
+    """
+    if not np.isclose(sum(pesi.values()), 1):
+        raise ValueError(f'I pesi sommano a {sum(pesi.values()):.4f} invece di 1')
+    livelli = livelli[list(pesi)].sort_index().ffill().dropna()
+    valori = livelli.to_numpy(dtype=float)
+    ribilancia = date_ribilanciamento(livelli.index, frequenza)
+    posizioni = np.arange(len(valori))
+    # Ultimo ribilanciamento strettamente precedente a ogni data (la prima data si confronta con sé stessa)
+    ancore = np.maximum.accumulate(np.where(ribilancia, posizioni, 0))
+    precedenti = np.concatenate(([0], ancore[:-1]))
+    crescita = (valori / valori[precedenti]) @ np.array(list(pesi.values()))
+    catena = np.cumprod(np.where(ribilancia, crescita, 1.0))
+    valore = catena[precedenti] * crescita
+
+    posizione = livelli.index.get_indexer([pd.Timestamp(base)], method='pad')[0]
+    if posizione < 0:
+        raise ValueError(f'La data base {base} precede i livelli degli indici')
+    return pd.Series(valore / valore[posizione] * valore_base, index=livelli.index)
+
+
+def costruisci(benchmark: pd.DataFrame, componenti: pd.DataFrame, composizioni: dict) -> pd.DataFrame:
+    """
+    Foglio Benchmark con le serie di `composizioni` costruite dai livelli degli indici: le colonne già presenti
+    sono sostituite, le altre aggiunte. Le serie sono allineate alle date del foglio Benchmark,
+    usando per ogni data l'ultimo valore disponibile.
+
+    Arguments:
+        benchmark {pd.DataFrame} -- foglio Benchmark
+        componenti {pd.DataFrame} -- livelli degli indici (foglio Componenti)
+        composizioni {dict} -- nome del benchmark -> {'pesi': dict, 'ribilanciamento': str | None, 'base': str}
+
+    Returns:
+        pd.DataFrame -- foglio Benchmark con le serie costruite
+    """
+    costruite = {
+        nome: serie_composta(componenti, composizione['pesi'], composizione['ribilanciamento'], composizione['base'])
+        for nome, composizione in composizioni.items()
+    }
+    return benchmark.assign(**{nome: serie.reindex(benchmark.index, method='pad') for nome, serie in costruite.items()})
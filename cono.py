@@ -0,0 +1,86 @@
+"""Cono delle probabilità: bande dei valori attesi di un benchmark a partire da un mese, per livello di confidenza."""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Livelli di confidenza delle bande: per ognuno una banda inferiore e una superiore, oltre alla mediana
+LIVELLI = (0.9,)
+
+
+def quantili(livelli: tuple = LIVELLI) -> list[float]:
+    """
+    Quantili delle bande per i livelli di confidenza, in ordine crescente (es. 0.9 -> 5%, 50%, 95%).
+
+    Keyword Arguments:
+        livelli {tuple} -- livelli di confidenza, tra 0 e 1 (default: {LIVELLI})
+
+    Returns:
+        list[float] -- quantili, compresa la mediana
+    """
+    return sorted({0.5, *((1 - livello) / 2 for livello in livelli), *((1 + livello) / 2 for livello in livelli)})
+
+
+def nomi_bande(benchmark: str, livelli: tuple = LIVELLI) -> list[str]:
+    """
+    Nomi delle colonne delle bande del cono di un benchmark, nell'ordine dei quantili.
+
+    Arguments:
+        benchmark {str} -- colonna del foglio Benchmark
+
+    Keyword Arguments:
+        livelli {tuple} -- livelli di confidenza (default: {LIVELLI})
+
+    Returns:
+        list[str] -- nomi delle colonne (es. 'benchmark_2016 5%')
+    """
+    return [f'{benchmark} {quantile:.0%}' for quantile in quantili(livelli)]
+
+
+def bande(serie: pd.Series, inizio: pd.Timestamp | str, livelli: tuple = LIVELLI,
+    riserva: pd.Series | None = None) -> pd.DataFrame:
+    """
+    Bande del cono di una serie di prezzi mensili, dal mese di inizio all'ultima data della serie.
+    I rendimenti logaritmici mensili sono stimati sulla storia fino all'inizio del cono (media e deviazione standard)
+    e il valore dopo h mesi è lognormale: valore iniziale * exp(media * h + z * deviazione * sqrt(h)).
+    La storia è quella della serie stessa o, se ha meno di tre valori fino all'inizio del cono (es. un benchmark
+    che parte dall'inizio del cono), quella della serie di `riserva`.
+    Tutti gli orizzonti e i quantili sono calcolati con un'unica operazione sugli array.
+
+    Arguments:
+        serie {pd.Series} -- prezzi mensili indicizzati per data, in ordine crescente
+        inizio {pd.Timestamp | str} -- data di inizio del cono, risolta all'ultima quotazione disponibile
+
+    Keyword Arguments:
+        livelli {tuple} -- livelli di confidenza (default: {LIVELLI})
+        riserva {pd.Series | None} -- prezzi mensili da cui stimare i rendimenti se la storia della serie
+            è troppo corta (default: {None})
+
+    Raises:
+        ValueError: se la serie non ha un valore all'inizio del cono o se né la serie né la riserva
+            hanno almeno due rendimenti fino all'inizio del cono
+
+    Returns:
+        pd.DataFrame -- una colonna per quantile (nomi_bande) e una riga per data dall'inizio del cono
+    """
+    serie = serie.dropna()
+    posizione = serie.index.get_indexer([pd.Timestamp(inizio)], method='pad')[0]
+    if posizione < 0:
+        raise ValueError(f'{serie.name}: nessun valore prima di {inizio}, data di inizio del cono')
+    storia = serie.iloc[:posizione + 1]
+    if len(storia) < 3 and riserva is not None:
+        storia = riserva.dropna()
+        storia = storia[storia.index <= serie.index[posizione]]
+    if len(storia) < 3:
+        raise ValueError(
+            f'{storia.name}: storia insufficiente prima di {inizio} per stimare il cono '
+            f'(servono almeno tre valori mensili, ce ne sono {len(storia)})'
+        )
+    logaritmi = np.log(serie.to_numpy(dtype=float))
+    rendimenti = np.diff(np.log(storia.to_numpy(dtype=float)))
+    media, deviazione = rendimenti.mean(), rendimenti.std(ddof=1)
+
+    orizzonti = np.arange(len(serie) - posizione)[:, None]
+    z = np.array([NormalDist().inv_cdf(quantile) for quantile in quantili(livelli)])[None, :]
+    valori = np.exp(logaritmi[posizione] + media * orizzonti + z * deviazione * np.sqrt(orizzonti))
+    return pd.DataFrame(valori, index=serie.index[posizione:], columns=nomi_bande(serie.name, livelli))
@@ -0,0 +1,271 @@
+"""Caricamento dei fogli del file di input del report."""
+import hashlib
+import os
+import pickle
+import posixpath
+import threading
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pandas as pd
+
+from profilo import Profilo, misura
+
+# Fogli letti dal file di input, con le opzioni di lettura di ciascuno
+FOGLI = {
+    'Portfolio': {'header': 1},
+    'Indici': {'header': [0, 1], 'parse_dates': True, 'index_col': 0},
+    'Indici_in_euro': {'header': [0, 1], 'parse_dates': True, 'index_col': 0},
+    'Indici_giornalieri': {'names': ['Date', 'S&P 500', 'Date.1', 'USDEUR', 'Date.2', 'VIX', 'Date.3', 'EURO STOXX 50']},
+    'Benchmark': {'index_col': 0, 'header': 0},
+    'Portafoglio': {'index_col': 0, 'header': 0},
+    'Delta': {'index_col': 0, 'header': 0},
+    'Gestioni': {'header': 0},
+    'Componenti': {'index_col': 0, 'header': 0},
+    'Movimenti': {'header': 0, 'parse_dates': ['DATA']},
+}
+# Fogli che il file di input può non avere: se mancano non vengono letti e le pagine usano i dati alternativi
+FOGLI_FACOLTATIVI = ('Componenti', 'Delta', 'Movimenti')
+# Da incrementare quando cambia il modo in cui i fogli vengono letti, per invalidare la cache
+VERSIONE_CACHE = 2
+# Parti del file xlsx condivise da tutti i fogli: testi e formati (da cui dipende il riconoscimento delle date)
+PARTI_COMUNI = ('xl/sharedStrings.xml', 'xl/styles.xml')
+_NS = {
+    'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+
+def impronta_file(percorso: Path | str) -> str:
+    """
+    Calcola l'hash del contenuto di un file.
+
+    Arguments:
+        percorso {Path | str} -- file di cui calcolare l'hash
+
+    Returns:
+        str -- hash sha256 in esadecimale
+    """
+    h = hashlib.sha256()
+    with open(percorso, 'rb') as f:
+        for blocco in iter(lambda: f.read(1 << 20), b''):
+            h.update(blocco)
+    return h.hexdigest()
+
+
+def impronte_fogli(percorso: Path | str) -> dict[str, str]:
+    """
+    Calcola l'hash di ogni foglio di un file xlsx dal contenuto compresso del foglio nel pacchetto zip,
+    senza leggerne le celle. L'hash comprende le parti condivise (testi e formati), così che un foglio
+    risulti modificato anche quando cambia solo un testo o un formato che usa.
+    Correggere un prezzo in Portfolio cambia quindi l'impronta di Portfolio e non quella degli altri fogli.
+
+    Arguments:
+        percorso {Path | str} -- file excel
+
+    Returns:
+        dict[str, str] -- nome del foglio -> hash sha256 in esadecimale; vuoto se il file non è un xlsx
+    """
+    if not zipfile.is_zipfile(percorso):
+        return {}
+    with zipfile.ZipFile(percorso) as pacchetto:
+        membri = set(pacchetto.namelist())
+        comuni = hashlib.sha256()
+        for parte in PARTI_COMUNI:
+            if parte in membri:
+                comuni.update(pacchetto.read(parte))
+        relazioni = ElementTree.fromstring(pacchetto.read('xl/_rels/workbook.xml.rels'))
+        destinazioni = {}
+        for relazione in relazioni.iterfind('rel:Relationship', _NS):
+            destinazione = relazione.get('Target')
+            destinazioni[relazione.get('Id')] = (
+                destinazione.lstrip('/') if destinazione.startswith('/') else posixpath.normpath(posixpath.join('xl', destinazione))
+            )
+        impronte = {}
+        for foglio in ElementTree.fromstring(pacchetto.read('xl/workbook.xml')).iterfind('main:sheets/main:sheet', _NS):
+            h = comuni.copy()
+            h.update(pacchetto.read(destinazioni[foglio.get(_ID)]))
+            impronte[foglio.get('name')] = h.hexdigest()
+    return impronte
+
+
+class CacheFogli():
+    """
+    Cache su disco dei fogli già letti, indicizzata sull'hash del foglio e sul suo nome.
+    Ogni foglio è salvato come pickle del DataFrame, che conserva i dati per colonna come array numpy
+    e si ricarica senza passare dal parser xlsx.
+    Un foglio modificato cambia hash e quindi chiave, mentre i fogli non modificati dello stesso file
+    restano validi: le voci vecchie non vengono più lette
+    e sono eliminate quando la cartella supera la dimensione massima, a partire dalle meno usate.
+    """
+
+    def __init__(self, cartella: Path | str, dimensione_massima: int = 512 * 2**20):
+        """
+        Arguments:
+            cartella {Path | str} -- cartella in cui salvare i fogli
+
+        Keyword Arguments:
+            dimensione_massima {int} -- dimensione massima della cartella in byte (default: {512 MiB})
+        """
+        self.cartella = Path(cartella)
+        self.dimensione_massima = dimensione_massima
+
+    def chiave(self, impronta: str, nome: str) -> str:
+        """
+        Chiave di un foglio: dipende dal contenuto del foglio, dal suo nome, da come viene letto
+        e dalla versione di pandas, il cui formato pickle può cambiare tra una versione e l'altra.
+
+        Arguments:
+            impronta {str} -- hash del foglio (o del file, se non è un xlsx)
+            nome {str} -- nome del foglio
+
+        Returns:
+            str -- chiave del foglio
+        """
+        return hashlib.sha256(
+            f'{VERSIONE_CACHE}|{pd.__version__}|{impronta}|{nome}|{FOGLI[nome]!r}'.encode()
+        ).hexdigest()
+
+    def leggi(self, chiave: str) -> pd.DataFrame | None:
+        """
+        Restituisce il foglio salvato, o None se non è in cache o non si riesce a ricaricarlo
+        (file troncato, scritto da un'altra versione di pandas o numpy, eliminato da un altro processo):
+        in quel caso il foglio viene riletto e la voce riscritta.
+
+        Arguments:
+            chiave {str} -- chiave del foglio
+
+        Returns:
+            pd.DataFrame | None -- foglio salvato
+        """
+        percorso = self.cartella.joinpath(f'{chiave}.pkl')
+        try:
+            df = pd.read_pickle(percorso)
+        except Exception: # qualsiasi errore di caricamento vale come voce mancante
+            return None
+        try:
+            os.utime(percorso) # segna il foglio come usato di recente
+        except FileNotFoundError: # eliminato nel frattempo dalla pulizia di un altro processo
+            pass
+        return df
+
+    def scrivi(self, chiave: str, df: pd.DataFrame):
+        """
+        Salva un foglio e libera spazio se la cartella supera la dimensione massima.
+        Accetta qualsiasi oggetto serializzabile con pickle, come i risultati calcolati dalle pagine.
+
+        Arguments:
+            chiave {str} -- chiave del foglio
+            df {pd.DataFrame} -- foglio da salvare
+        """
+        self.cartella.mkdir(parents=True, exist_ok=True)
+        percorso = self.cartella.joinpath(f'{chiave}.pkl')
+        temporaneo = percorso.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        pd.to_pickle(df, temporaneo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaneo, percorso) # scrittura atomica, sicura anche con più processi
+        self.__pulisci()
+
+    def __pulisci(self):
+        """
+        Elimina i fogli usati meno di recente finché la cartella non rientra nella dimensione massima.
+        """
+        voci = []
+        for percorso in self.cartella.glob('*.pkl'):
+            try:
+                stat = percorso.stat()
+            except FileNotFoundError:
+                continue
+            voci.append((stat.st_mtime, stat.st_size, percorso))
+        totale = sum(dimensione for _, dimensione, _ in voci)
+        for _, dimensione, percorso in sorted(voci):
+            if totale <= self.dimensione_massima:
+                break
+            percorso.unlink(missing_ok=True)
+            totale -= dimensione
+
+
+class Dataset():
+    """Fogli del file di input, letti in un'unica passata e condivisi da tutte le pagine del report."""
+
+    def __init__(self, file_portafoglio: Path | str, fogli: list | None = None, cache: CacheFogli | None = None,
+        profilo: Profilo | None = None):
+        """
+        Apre il file excel una sola volta e legge tutti i fogli richiesti.
+        I fogli già presenti in cache non vengono riletti; se sono tutti in cache il file excel non viene aperto.
+        I fogli facoltativi assenti dal file sono ignorati (`nome in dataset` è falso).
+        L'impronta di ogni foglio resta in self.impronte, per riconoscere i risultati calcolati da fogli non modificati.
+
+        Arguments:
+            file_portafoglio {Path | str} -- percorso del file excel da lavorare
+
+        Keyword Arguments:
+            fogli {list | None} -- fogli da leggere, tutti quelli in FOGLI se None (default: {None})
+            cache {CacheFogli | None} -- cache su disco dei fogli già letti (default: {None})
+            profilo {Profilo | None} -- profilo in cui misurare la lettura di ogni foglio (default: {None})
+        """
+        self.file_portafoglio = Path(file_portafoglio)
+        fogli = list(FOGLI) if fogli is None else list(fogli)
+        self._fogli = {}
+        chiavi = {}
+        with misura(profilo, 'impronte fogli'):
+            impronte = impronte_fogli(self.file_portafoglio)
+            if impronte:
+                fogli = [nome for nome in fogli if nome in impronte or nome not in FOGLI_FACOLTATIVI]
+            if any(nome not in impronte for nome in fogli): # non è un xlsx o manca un foglio: vale il file intero
+                impronta = impronta_file(self.file_portafoglio)
+                impronte = {nome: impronte.get(nome, impronta) for nome in fogli}
+        self.impronte = {nome: impronte[nome] for nome in fogli}
+        if cache is not None:
+            for nome in fogli:
+                chiavi[nome] = cache.chiave(self.impronte[nome], nome)
+                with misura(profilo, f'carica {nome} (cache)'):
+                    df = cache.leggi(chiavi[nome])
+                if df is not None:
+                    self._fogli[nome] = df
+        mancanti = [nome for nome in fogli if nome not in self._fogli]
+        if mancanti:
+            with misura(profilo, 'apri file'):
+                xls = pd.ExcelFile(self.file_portafoglio)
+            with xls:
+                for nome in mancanti:
+                    if nome in FOGLI_FACOLTATIVI and nome not in xls.sheet_names:
+                        continue
+                    with misura(profilo, f'carica {nome}'):
+                        self._fogli[nome] = self.__leggi(xls, nome)
+                        if cache is not None:
+                            cache.scrivi(chiavi[nome], self._fogli[nome])
+
+    @staticmethod
+    def __leggi(xls: pd.ExcelFile, nome: str) -> pd.DataFrame:
+        """
+        Legge un foglio dal file già aperto.
+
+        Arguments:
+            xls {pd.ExcelFile} -- file excel aperto
+            nome {str} -- nome del foglio
+
+        Returns:
+            pd.DataFrame -- foglio letto
+        """
+        df = xls.parse(sheet_name=nome, **FOGLI[nome])
+        if isinstance(df.columns, pd.MultiIndex): # Indici e Indici_in_euro hanno due righe di intestazione
+            df.columns = df.columns.droplevel(-1)
+        return df
+
+    def __contains__(self, nome: str) -> bool:
+        return nome in self._fogli
+
+    def __getitem__(self, nome: str) -> pd.DataFrame:
+        """
+        Restituisce un foglio letto.
+        La copia è superficiale: le pagine possono riassegnare indice e colonne senza alterare i dati condivisi.
+
+        Arguments:
+            nome {str} -- nome del foglio
+
+        Returns:
+            pd.DataFrame -- foglio richiesto
+        """
+        return self._fogli[nome].copy(deep=False)
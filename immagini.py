@@ -0,0 +1,174 @@
+"""
+Immagini del report (il logo): ogni file è letto una sola volta per processo e inserito nel pacchetto
+excel una sola volta, anche se compare in tutte le pagine.
+La scrittura di una sola copia usa parti non pubbliche di openpyxl (Image._data e Image.path,
+ExcelWriter._write_images): con una versione di openpyxl diversa da quella verificata (VERSIONE_OPENPYXL)
+le immagini sono normali immagini di openpyxl e il workbook è salvato con Workbook.save.
+"""
+import datetime
+import hashlib
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import openpyxl
+from openpyxl.drawing.image import Image
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.writer.excel import ExcelWriter
+from PIL import Image as PILImage
+
+# Logo della società, cercato nella cartella di lavoro e poi in quella del programma
+LOGO = Path('img', 'logo_B&S.bmp')
+# Formati che excel legge direttamente, gli altri sono convertiti in png
+FORMATI_EXCEL = ('png', 'jpeg', 'gif')
+# Versione (major, minor) di openpyxl con cui è verificata la scrittura delle immagini condivise
+VERSIONE_OPENPYXL = (3, 1)
+
+# Immagini già lette in questo processo, per (percorso, comprimi)
+_immagini = {}
+
+
+def condivisione_supportata() -> bool:
+    """
+    Se la versione di openpyxl installata è quella verificata e ha le parti usate da ImmagineCondivisa
+    e _ScrittoreExcel; altrimenti si usano le immagini e il salvataggio di openpyxl.
+
+    Returns:
+        bool -- se le immagini possono essere condivise
+    """
+    versione = tuple(int(parte) for parte in openpyxl.__version__.split('.')[:2] if parte.isdigit())
+    return (
+        versione == VERSIONE_OPENPYXL and callable(getattr(Image, '_data', None))
+        and callable(getattr(ExcelWriter, '_write_images', None))
+    )
+
+
+def trova(percorso: Path | str) -> Path:
+    """
+    Percorso di un file del programma: relativo alla cartella di lavoro se esiste lì,
+    altrimenti alla cartella in cui si trova il programma.
+
+    Arguments:
+        percorso {Path | str} -- percorso assoluto o relativo
+
+    Returns:
+        Path -- percorso assoluto
+    """
+    percorso = Path(percorso)
+    if percorso.is_absolute() or percorso.exists():
+        return percorso.resolve()
+    return Path(__file__).resolve().parent.joinpath(percorso)
+
+
+class Risorsa():
+    """Immagine letta e codificata una volta, con il nome della sua parte nel pacchetto excel."""
+
+    def __init__(self, dati: bytes, formato: str, larghezza: int, altezza: int):
+        """
+        Arguments:
+            dati {bytes} -- contenuto del file da inserire nel pacchetto
+            formato {str} -- formato dei dati (png, jpeg, gif)
+            larghezza {int} -- larghezza in pixel
+            altezza {int} -- altezza in pixel
+        """
+        self.dati = dati
+        self.formato = formato
+        self.larghezza = larghezza
+        self.altezza = altezza
+        # Il nome dipende dal contenuto: la stessa immagine ha sempre la stessa parte
+        self.parte = f'/xl/media/image_{hashlib.sha256(dati).hexdigest()[:16]}.{formato}'
+
+    @classmethod
+    def leggi(cls, percorso: Path | str, comprimi: bool = True) -> 'Risorsa':
+        """
+        Legge un'immagine da file. I formati che excel non legge (es. bmp) sono convertiti in png.
+
+        Arguments:
+            percorso {Path | str} -- file immagine
+
+        Keyword Arguments:
+            comprimi {bool} -- ricodifica l'immagine in png con la compressione massima,
+                anche se è già in un formato letto da excel (default: {True})
+
+        Returns:
+            Risorsa -- immagine letta
+        """
+        with PILImage.open(percorso) as immagine:
+            formato = (immagine.format or 'png').lower()
+            if formato in FORMATI_EXCEL and not comprimi:
+                dati = Path(percorso).read_bytes()
+            else:
+                buffer = BytesIO()
+                immagine.save(buffer, format='png', optimize=comprimi)
+                dati, formato = buffer.getvalue(), 'png'
+            return cls(dati, formato, *immagine.size)
+
+
+class ImmagineCondivisa(Image):
+    """
+    Immagine di openpyxl che usa i dati di una Risorsa: non rilegge il file,
+    e tutte le immagini della stessa risorsa puntano alla stessa parte del pacchetto.
+    """
+
+    def __init__(self, risorsa: Risorsa):
+        """
+        Arguments:
+            risorsa {Risorsa} -- immagine già letta
+        """
+        super().__init__(BytesIO(risorsa.dati))
+        self.risorsa = risorsa
+
+    def _data(self) -> bytes:
+        return self.risorsa.dati
+
+    @property
+    def path(self) -> str:
+        return self.risorsa.parte
+
+
+def immagine(percorso: Path | str = LOGO, comprimi: bool = True) -> Image:
+    """
+    Nuova immagine da inserire in un foglio. Il file è letto solo la prima volta.
+    Se la condivisione non è supportata (condivisione_supportata) è un'immagine di openpyxl con gli stessi dati.
+
+    Keyword Arguments:
+        percorso {Path | str} -- file immagine, cercato con trova() (default: {LOGO})
+        comprimi {bool} -- ricodifica l'immagine in png compresso (default: {True})
+
+    Returns:
+        Image -- immagine da ancorare e aggiungere al foglio
+    """
+    chiave = (trova(percorso), comprimi)
+    if chiave not in _immagini:
+        _immagini[chiave] = Risorsa.leggi(chiave[0], comprimi)
+    if not condivisione_supportata():
+        return Image(BytesIO(_immagini[chiave].dati))
+    return ImmagineCondivisa(_immagini[chiave])
+
+
+class _ScrittoreExcel(ExcelWriter):
+    """ExcelWriter che scrive una sola volta le immagini con la stessa parte del pacchetto."""
+
+    def _write_images(self):
+        scritte = set()
+        for img in self._images:
+            if img.path not in scritte:
+                scritte.add(img.path)
+                self._archive.writestr(img.path[1:], img._data())
+
+
+def salva(wb: Workbook, percorso: Path | str):
+    """
+    Salva il workbook come Workbook.save, ma con una sola copia di ogni immagine condivisa
+    (con Workbook.save se la condivisione non è supportata).
+
+    Arguments:
+        wb {Workbook} -- workbook da salvare
+        percorso {Path | str} -- file excel
+    """
+    if not condivisione_supportata():
+        wb.save(percorso)
+        return
+    with ZipFile(percorso, 'w', ZIP_DEFLATED, allowZip64=True) as archivio:
+        wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+        _ScrittoreExcel(wb, archivio).save()
@@ -0,0 +1,178 @@
+"""
+Performance del mese per intermediario (pagina 11), calcolata dal foglio Portfolio, e istantanee dei mesi
+già elaborati da cui si ricava la performance da inizio anno.
+"""
+import datetime
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from movimenti import TOTALE, flussi_periodi, mwr, rendimenti_periodi
+
+# Colonne della tabella della pagina 11, nell'ordine delle colonne del foglio Delta che sostituisce
+PASSATO, CORRENTE, DELTA, DELTA_PERCENTUALE, DELTA_YTD = 'Totale mese passato', 'Totale mese corrente', 'Δ', 'Δ%', 'Δ% YTD'
+
+
+class Istantanee():
+    """
+    Totali per intermediario dei mesi già elaborati, salvati in un file csv (una riga per mese e intermediario).
+    Il file si può anche compilare a mano per i mesi precedenti al primo report creato con questa versione.
+    """
+
+    def __init__(self, percorso: Path | str):
+        """
+        Arguments:
+            percorso {Path | str} -- file csv delle istantanee, creato al primo salvataggio
+        """
+        self.percorso = Path(percorso)
+
+    def leggi(self) -> pd.DataFrame:
+        """
+        Restituisce le istantanee salvate.
+
+        Returns:
+            pd.DataFrame -- colonne mese ('aaaa-mm'), intermediario, Totale mese passato e Totale mese corrente
+        """
+        if not self.percorso.exists():
+            return pd.DataFrame(columns=['mese', 'intermediario', PASSATO, CORRENTE])
+        return pd.read_csv(self.percorso, dtype={'mese': str, 'intermediario': str})
+
+    def salva(self, mese: str, totali: pd.DataFrame, sovrascrivi: bool = False) -> bool:
+        """
+        Salva i totali di un mese. Un mese già salvato è sostituito solo se richiesto, così che rielaborare
+        un report (o elaborarlo con la data sbagliata) non alteri le istantanee da cui dipendono i mesi successivi.
+        La scrittura passa da un file temporaneo, così che un'interruzione non lasci il file a metà.
+
+        Arguments:
+            mese {str} -- mese ('aaaa-mm')
+            totali {pd.DataFrame} -- Totale mese passato e Totale mese corrente, indicizzati per intermediario
+
+        Keyword Arguments:
+            sovrascrivi {bool} -- sostituisce i totali già salvati per lo stesso mese (default: {False})
+
+        Returns:
+            bool -- se i totali sono stati salvati
+        """
+        istantanee = self.leggi()
+        if not sovrascrivi and (istantanee['mese'] == mese).any():
+            return False
+        nuove = totali[[PASSATO, CORRENTE]].rename_axis('intermediario').reset_index().assign(mese=mese)
+        istantanee = pd.concat([istantanee[istantanee['mese'] != mese], nuove[istantanee.columns]], ignore_index=True)
+        temporaneo = self.percorso.with_name(f'{self.percorso.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        istantanee.sort_values(['mese'], kind='stable').to_csv(temporaneo, index=False)
+        os.replace(temporaneo, self.percorso)
+        return True
+
+
+def _fine_mesi(t1: datetime.datetime) -> pd.DatetimeIndex:
+    """Fine dell'anno precedente, fine dei mesi precedenti a quello di t1 e t1: estremi dei mesi da inizio anno."""
+    return pd.DatetimeIndex(
+        [datetime.datetime(t1.year, mese, 1) - datetime.timedelta(days=1) for mese in range(1, t1.month + 1)] + [t1]
+    )
+
+
+def _mesi(portfolio: pd.DataFrame, t1: datetime.datetime, istantanee: pd.DataFrame,
+    esclusi: tuple) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, bool]:
+    """
+    Totali del mese per intermediario dal foglio Portfolio e totali di inizio e fine di ogni mese da inizio anno,
+    dalle istantanee per i mesi precedenti e dal foglio Portfolio per il mese di t1.
+
+    Arguments:
+        portfolio {pd.DataFrame} -- foglio Portfolio
+        t1 {datetime.datetime} -- data finale del report
+        istantanee {pd.DataFrame} -- istantanee dei mesi già elaborati (Istantanee.leggi)
+        esclusi {tuple} -- intermediari per cui non si calcola la performance
+
+    Returns:
+        tuple -- totali del mese (Totale mese passato e Totale mese corrente per intermediario, nell'ordine
+            del foglio Portfolio), totali di inizio e di fine mese (intermediari x mesi, NaN se un intermediario
+            manca dall'istantanea) e se ci sono le istantanee di tutti i mesi precedenti
+    """
+    tabella = portfolio.groupby('INTERMEDIARIO', sort=False)[['TOTALE t0', 'TOTALE t1']].sum()
+    tabella.columns = [PASSATO, CORRENTE]
+    tabella = tabella.drop(index=list(esclusi), errors='ignore')
+
+    precedenti = [f'{t1.year}-{mese:02d}' for mese in range(1, t1.month)]
+    mesi = istantanee[istantanee['mese'].isin(precedenti)]
+    indice = pd.MultiIndex.from_frame(mesi[['intermediario', 'mese']])
+    iniziali, finali = (
+        mesi[colonna].set_axis(indice).unstack('mese').reindex(index=tabella.index, columns=precedenti).astype(float)
+        .assign(**{t1.strftime('%Y-%m'): tabella[colonna]})
+        for colonna in (PASSATO, CORRENTE)
+    )
+    return tabella, iniziali, finali, set(precedenti) <= set(mesi['mese'])
+
+
+def performance_mese(portfolio: pd.DataFrame, t1: datetime.datetime, istantanee: pd.DataFrame,
+    esclusi: tuple = (), movimenti: pd.DataFrame | None = None, delta: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Totali del mese passato e corrente per intermediario con un'unica aggregazione per gruppo sulle colonne
+    TOTALE t0 e TOTALE t1, risultato e rendimento del mese al netto dei movimenti e rendimento da inizio anno.
+    Il rendimento da inizio anno concatena i rendimenti mensili dei mesi precedenti dello stesso anno, calcolati
+    dalle istantanee; se manca l'istantanea di uno di quei mesi è quello compilato nel foglio Delta, se c'è,
+    altrimenti NaN. Un intermediario assente da un'istantanea conta come rendimento nullo in quel mese.
+
+    Arguments:
+        portfolio {pd.DataFrame} -- foglio Portfolio
+        t1 {datetime.datetime} -- data finale del report
+        istantanee {pd.DataFrame} -- istantanee dei mesi già elaborati (Istantanee.leggi)
+
+    Keyword Arguments:
+        esclusi {tuple} -- intermediari per cui non si calcola la performance (default: {()})
+        movimenti {pd.DataFrame | None} -- foglio Movimenti, None se non ci sono conferimenti e prelievi (default: {None})
+        delta {pd.DataFrame | None} -- foglio Delta, da cui prendere il Δ% YTD se mancano istantanee (default: {None})
+
+    Returns:
+        pd.DataFrame -- colonne del foglio Delta, una riga per intermediario nell'ordine del foglio Portfolio
+    """
+    tabella, iniziali, finali, completi = _mesi(portfolio, t1, istantanee, esclusi)
+    flussi, pesati = flussi_periodi(movimenti, _fine_mesi(t1), tabella.index)
+    rendimenti = rendimenti_periodi(iniziali, finali, flussi.T, pesati.T) # intermediari x mesi
+    tabella[DELTA] = tabella[CORRENTE] - tabella[PASSATO] - flussi[-1]
+    tabella[DELTA_PERCENTUALE] = rendimenti[:, -1]
+    precedenti = np.nan_to_num(rendimenti[:, :-1])
+    if completi:
+        tabella[DELTA_YTD] = (1 + precedenti).prod(axis=1) * (1 + tabella[DELTA_PERCENTUALE]) - 1
+    elif delta is not None and DELTA_YTD in delta.columns:
+        tabella[DELTA_YTD] = pd.to_numeric(delta[DELTA_YTD], errors='coerce').reindex(tabella.index)
+    else:
+        tabella[DELTA_YTD] = np.nan
+    return tabella
+
+
+def performance_totale(portfolio: pd.DataFrame, t1: datetime.datetime, istantanee: pd.DataFrame,
+    esclusi: tuple = (), movimenti: pd.DataFrame | None = None) -> dict:
+    """
+    Rendimenti del totale degli intermediari di performance_mese, al netto dei movimenti:
+    ponderati per il tempo e per il denaro (non annualizzati), del mese e da inizio anno.
+    I rendimenti da inizio anno sono NaN se manca l'istantanea di uno dei mesi precedenti.
+
+    Arguments:
+        portfolio {pd.DataFrame} -- foglio Portfolio
+        t1 {datetime.datetime} -- data finale del report
+        istantanee {pd.DataFrame} -- istantanee dei mesi già elaborati (Istantanee.leggi)
+
+    Keyword Arguments:
+        esclusi {tuple} -- intermediari esclusi (default: {()})
+        movimenti {pd.DataFrame | None} -- foglio Movimenti (default: {None})
+
+    Returns:
+        dict -- 'mese', 'ytd', 'mwr_mese' e 'mwr_ytd'
+    """
+    tabella, iniziali, finali, completi = _mesi(portfolio, t1, istantanee, esclusi)
+    date = _fine_mesi(t1)
+    flussi, pesati = flussi_periodi(movimenti, date, tabella.index)
+    rendimenti = rendimenti_periodi(iniziali.sum(), finali.sum(), flussi.sum(axis=1), pesati.sum(axis=1))
+
+    def ponderato_denaro(mese: int) -> float:
+        # Controvalori all'inizio del mese e a t1: il tasso annuo riportato alla frazione d'anno trascorsa
+        valori = pd.DataFrame([iniziali.iloc[:, mese].fillna(0), finali.iloc[:, -1]], index=date[[mese, -1]])
+        return (1 + mwr(valori, movimenti)[TOTALE])**((date[-1] - date[mese]).days / 365.25) - 1
+
+    totale = {'mese': rendimenti[-1], 'ytd': np.nan, 'mwr_mese': ponderato_denaro(len(date) - 2), 'mwr_ytd': np.nan}
+    if completi:
+        totale.update(ytd=np.prod(1 + rendimenti) - 1, mwr_ytd=ponderato_denaro(0))
+    return totale
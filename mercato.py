@@ -0,0 +1,206 @@
+"""Sezione di mercato del report (pagine 3, 4 e 5), che dipende solo dai dati di mercato e da t1."""
+import datetime
+import hashlib
+
+import pandas as pd
+
+from dataset import CacheFogli, Dataset
+from rendimenti import IndiceRendimenti
+
+# Fogli di input da cui dipende la sezione di mercato
+FOGLI_MERCATO = ('Indici', 'Indici_in_euro', 'Indici_giornalieri')
+# Da incrementare quando cambia il calcolo della sezione, per invalidare la cache
+VERSIONE_MERCATO = 2
+
+# Sezioni già calcolate in questo processo, per impronta
+_sezioni = {}
+# Serie giornaliere dei grafici già calcolate in questo processo, per impronta: non dipendono da t1
+# e sono condivise anche tra i report di mesi diversi
+_serie = {}
+# Indici dei rendimenti cumulati dei fogli di mercato già costruiti in questo processo, per impronta del foglio
+_indici = {}
+
+
+def impronta_foglio(dati: Dataset, nome: str) -> str:
+    """
+    Impronta del contenuto di un foglio di mercato, indipendente dal file del cliente.
+
+    Arguments:
+        dati {Dataset} -- fogli di input
+        nome {str} -- nome del foglio
+
+    Returns:
+        str -- hash sha256 in esadecimale
+    """
+    df = dati[nome]
+    h = hashlib.sha256(f'{VERSIONE_MERCATO}|{nome}|{list(df.columns)!r}|'.encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def impronta_rendimenti(t1: datetime.datetime, orizzonti: dict, impronte: dict) -> str:
+    """
+    Impronta della tabella dei rendimenti della pagina 4: dipende solo dai fogli Indici e Indici_in_euro,
+    da t1 e dagli orizzonti, così che un cambio del foglio Indici_giornalieri non la invalidi.
+
+    Arguments:
+        t1 {datetime.datetime} -- data finale del report
+        orizzonti {dict} -- nome dell'orizzonte -> data iniziale
+        impronte {dict} -- impronta di ogni foglio di FOGLI_MERCATO (impronta_foglio)
+
+    Returns:
+        str -- hash sha256 in esadecimale
+    """
+    fogli = [impronte[nome] for nome in ('Indici', 'Indici_in_euro')]
+    return hashlib.sha256(f'{VERSIONE_MERCATO}|{t1!r}|{orizzonti!r}|{fogli}'.encode()).hexdigest()
+
+
+def impronta_mercato(t1: datetime.datetime, orizzonti: dict, impronte: dict) -> str:
+    """
+    Impronta della sezione di mercato: dipende dal contenuto dei fogli di mercato, da t1 e dagli orizzonti,
+    non dal file del cliente. Clienti diversi con gli stessi dati di mercato hanno la stessa impronta.
+    Comprende il foglio Indici_giornalieri perché la sezione contiene le serie dei grafici della pagina 5.
+
+    Arguments:
+        t1 {datetime.datetime} -- data finale del report
+        orizzonti {dict} -- nome dell'orizzonte -> data iniziale
+        impronte {dict} -- impronta di ogni foglio di FOGLI_MERCATO (impronta_foglio)
+
+    Returns:
+        str -- hash sha256 in esadecimale
+    """
+    return hashlib.sha256(
+        f"{impronta_rendimenti(t1, orizzonti, impronte)}|{impronte['Indici_giornalieri']}".encode()
+    ).hexdigest()
+
+
+def indice(dati: Dataset, nome: str, impronta: str) -> IndiceRendimenti:
+    """
+    Indice dei rendimenti cumulati di un foglio di mercato, costruito una volta per processo:
+    i rendimenti di qualsiasi periodo e di qualsiasi mese si ottengono poi dall'indice senza rileggere il foglio.
+
+    Arguments:
+        dati {Dataset} -- fogli di input
+        nome {str} -- foglio Indici o Indici_in_euro
+        impronta {str} -- impronta del foglio (impronta_foglio)
+
+    Returns:
+        IndiceRendimenti -- indice del foglio
+    """
+    if impronta not in _indici:
+        _indici[impronta] = IndiceRendimenti(dati[nome])
+    return _indici[impronta]
+
+
+def serie_giornaliere(dati: Dataset, impronta: str, cache: CacheFogli | None = None) -> pd.DataFrame:
+    """
+    Serie giornaliere dei grafici della pagina 5 (foglio Dati_indici), con le date mostrate come mese ('%m-%Y').
+    Non dipendono da t1: sono calcolate una volta per processo, o riprese dalla cache su disco.
+
+    Arguments:
+        dati {Dataset} -- fogli di input
+        impronta {str} -- impronta del foglio Indici_giornalieri
+
+    Keyword Arguments:
+        cache {CacheFogli | None} -- cache su disco (default: {None})
+
+    Returns:
+        pd.DataFrame -- serie giornaliere
+    """
+    if impronta in _serie:
+        return _serie[impronta]
+    chiave = hashlib.sha256(f'mercato|{impronta}|dati_indici'.encode()).hexdigest()
+    dati_indici = cache.leggi(chiave) if cache is not None else None
+    if dati_indici is None:
+        # Ogni serie giornaliera ha la sua colonna di date, mostrate come mese
+        dati_indici = dati['Indici_giornalieri']
+        for colonna in ('Date', 'Date.1', 'Date.2', 'Date.3'):
+            dati_indici[colonna] = pd.to_datetime(dati_indici[colonna], format='%Y-%m-%d %H:%M:%S').dt.strftime('%m-%Y')
+        if cache is not None:
+            cache.scrivi(chiave, dati_indici)
+    _serie[impronta] = dati_indici
+    return dati_indici
+
+
+class SezioneMercato():
+    """
+    Dati calcolati della sezione di mercato: tabella dei rendimenti degli indici (pagina 4)
+    e serie giornaliere per i grafici (pagina 5, foglio Dati_indici).
+    Si calcola una volta per mese e si riusa per tutti i report con gli stessi dati di mercato.
+    """
+
+    def __init__(self, impronta: str, rendimenti: pd.DataFrame, dati_indici: pd.DataFrame):
+        """
+        Arguments:
+            impronta {str} -- impronta dei dati da cui è calcolata la sezione
+            rendimenti {pd.DataFrame} -- rendimenti per indice (righe) e orizzonte (colonne MENSILI, YTD, 1y, 3y, YTD €)
+            dati_indici {pd.DataFrame} -- serie giornaliere dei grafici, con le date come mese ('%m-%Y')
+        """
+        self.impronta = impronta
+        self.rendimenti = rendimenti
+        self.dati_indici = dati_indici
+
+    @classmethod
+    def calcola(cls, indici: dict, t1: datetime.datetime, orizzonti: dict, impronta: str,
+        dati_indici: pd.DataFrame) -> 'SezioneMercato':
+        """
+        Calcola la sezione dagli indici dei rendimenti dei fogli di mercato.
+
+        Arguments:
+            indici {dict} -- nome del foglio -> indice dei rendimenti (indice), per Indici e Indici_in_euro
+            t1 {datetime.datetime} -- data finale del report
+            orizzonti {dict} -- nome dell'orizzonte -> data iniziale, per indici e tassi di cambio
+            impronta {str} -- impronta dei dati
+            dati_indici {pd.DataFrame} -- serie giornaliere già calcolate (serie_giornaliere)
+
+        Returns:
+            SezioneMercato -- sezione calcolata
+        """
+        # Rendimenti di indici e tassi di cambio su tutti gli orizzonti, in un'unica operazione per foglio;
+        # le date che cadono in un giorno senza quotazione usano l'ultima quotazione disponibile
+        rendimenti = indici['Indici'].rendimenti(t1, orizzonti).join(
+            indici['Indici_in_euro'].rendimenti(t1, {'YTD €': orizzonti['YTD']})
+        )
+        return cls(impronta, rendimenti, dati_indici)
+
+
+def sezione_mercato(dati: Dataset, t1: datetime.datetime, orizzonti: dict, cache: CacheFogli | None = None,
+    sezione: SezioneMercato | None = None) -> SezioneMercato:
+    """
+    Restituisce la sezione di mercato per t1, calcolandola solo se non è già disponibile:
+    prima `sezione` (es. calcolata una volta dal batch e passata a ogni processo), poi quelle già calcolate
+    in questo processo, poi la cache su disco. Una sezione è riusata solo se l'impronta coincide.
+    Le serie giornaliere, che non dipendono da t1, sono riusate anche tra sezioni di mesi diversi.
+
+    Arguments:
+        dati {Dataset} -- fogli di input
+        t1 {datetime.datetime} -- data finale del report
+        orizzonti {dict} -- nome dell'orizzonte -> data iniziale (MENSILI, YTD, 1y, 3y)
+
+    Keyword Arguments:
+        cache {CacheFogli | None} -- cache su disco in cui salvare le sezioni calcolate (default: {None})
+        sezione {SezioneMercato | None} -- sezione già calcolata da riusare se compatibile (default: {None})
+
+    Returns:
+        SezioneMercato -- sezione di mercato
+    """
+    impronte = {nome: impronta_foglio(dati, nome) for nome in FOGLI_MERCATO}
+    impronta = impronta_mercato(t1, orizzonti, impronte)
+    if sezione is not None and sezione.impronta == impronta:
+        return sezione
+    if impronta in _sezioni:
+        return _sezioni[impronta]
+
+    dati_indici = serie_giornaliere(dati, impronte['Indici_giornalieri'], cache)
+    # La tabella dei rendimenti non dipende dalle serie giornaliere: resta in cache se cambia solo Indici_giornalieri
+    chiave = hashlib.sha256(f'mercato|{impronta_rendimenti(t1, orizzonti, impronte)}|rendimenti'.encode()).hexdigest()
+    rendimenti = cache.leggi(chiave) if cache is not None else None
+    if rendimenti is not None:
+        sezione = SezioneMercato(impronta, rendimenti, dati_indici)
+    else:
+        indici = {nome: indice(dati, nome, impronte[nome]) for nome in ('Indici', 'Indici_in_euro')}
+        sezione = SezioneMercato.calcola(indici, t1, orizzonti, impronta, dati_indici)
+        if cache is not None:
+            cache.scrivi(chiave, sezione.rendimenti)
+    _sezioni[impronta] = sezione
+    return sezione
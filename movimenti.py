@@ -0,0 +1,165 @@
+"""
+Rendimenti ponderati per il tempo (TWR) e per il denaro (MWR) da controvalori e movimenti di conferimento e prelievo,
+per intermediario e in totale.
+"""
+import numpy as np
+import pandas as pd
+
+# Colonne del foglio Movimenti: data, intermediario e importo (positivo per i conferimenti, negativo per i prelievi)
+DATA, INTERMEDIARIO, IMPORTO = 'DATA', 'INTERMEDIARIO', 'IMPORTO'
+# Colonna del totale aggiunta dalle funzioni che restituiscono un valore per intermediario
+TOTALE = 'Totale'
+
+
+def _giorni(date) -> np.ndarray:
+    """Date come numero di giorni dal 1970, per confronti e differenze sugli array."""
+    return pd.DatetimeIndex(date).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def flussi_periodi(movimenti: pd.DataFrame | None, date, colonne) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Somma dei movimenti di ogni periodo tra due date consecutive, per colonna, e somma dei movimenti pesati per
+    la frazione del periodo in cui sono rimasti investiti (Modified Dietz). Un movimento appartiene al periodo
+    (data precedente, data] e si considera avvenuto a fine giornata. I movimenti fuori dalle date o di intermediari
+    non in `colonne` sono ignorati.
+
+    Arguments:
+        movimenti {pd.DataFrame | None} -- foglio Movimenti, None se non ci sono movimenti
+        date {list-like} -- date dei controvalori, in ordine crescente
+        colonne {list-like} -- intermediari
+
+    Returns:
+        tuple[np.ndarray, np.ndarray] -- movimenti e movimenti pesati, periodi x colonne
+    """
+    giorni = _giorni(date)
+    flussi = np.zeros((len(giorni) - 1, len(colonne)))
+    pesati = np.zeros_like(flussi)
+    if movimenti is None or movimenti.empty or len(giorni) < 2:
+        return flussi, pesati
+    data = _giorni(movimenti[DATA])
+    periodo = np.searchsorted(giorni, data, side='left')
+    colonna = pd.Index(colonne).get_indexer(movimenti[INTERMEDIARIO])
+    validi = (periodo >= 1) & (periodo < len(giorni)) & (colonna >= 0)
+    periodo, colonna, data = periodo[validi], colonna[validi], data[validi]
+    importo = movimenti[IMPORTO].to_numpy(dtype=float)[validi]
+    peso = (giorni[periodo] - data) / (giorni[periodo] - giorni[periodo - 1])
+    np.add.at(flussi, (periodo - 1, colonna), importo)
+    np.add.at(pesati, (periodo - 1, colonna), importo * peso)
+    return flussi, pesati
+
+
+def rendimenti_periodi(iniziali, finali, flussi, pesati) -> np.ndarray:
+    """
+    Rendimento di ogni periodo al netto dei movimenti (Modified Dietz): risultato del periodo diviso per
+    il capitale iniziale più i movimenti pesati. Con valutazioni giornaliere coincide con il rendimento esatto.
+
+    Arguments:
+        iniziali {np.ndarray} -- controvalori a inizio periodo
+        finali {np.ndarray} -- controvalori a fine periodo
+        flussi {np.ndarray} -- movimenti del periodo (flussi_periodi)
+        pesati {np.ndarray} -- movimenti pesati del periodo (flussi_periodi)
+
+    Returns:
+        np.ndarray -- rendimenti, NaN se il capitale investito è nullo
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capitale = np.asarray(iniziali, dtype=float) + pesati
+        return np.where(capitale != 0, (np.asarray(finali, dtype=float) - iniziali - flussi) / capitale, np.nan)
+
+
+def twr(valori: pd.DataFrame, movimenti: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Rendimento ponderato per il tempo cumulato a ogni data, concatenando i rendimenti dei periodi
+    tra due valutazioni consecutive. Il totale concatena i rendimenti della somma dei controvalori e dei movimenti.
+
+    Arguments:
+        valori {pd.DataFrame} -- controvalori, una colonna per intermediario, indicizzati per data in ordine crescente
+
+    Keyword Arguments:
+        movimenti {pd.DataFrame | None} -- foglio Movimenti (default: {None})
+
+    Returns:
+        pd.DataFrame -- rendimento dalla prima data, una colonna per intermediario più TOTALE
+    """
+    flussi, pesati = flussi_periodi(movimenti, valori.index, valori.columns)
+    livelli = valori.to_numpy(dtype=float)
+    # Il totale è una colonna in più: somma dei controvalori e dei movimenti di tutti gli intermediari
+    livelli = np.column_stack([livelli, livelli.sum(axis=1)])
+    flussi = np.column_stack([flussi, flussi.sum(axis=1)])
+    pesati = np.column_stack([pesati, pesati.sum(axis=1)])
+    rendimenti = rendimenti_periodi(livelli[:-1], livelli[1:], flussi, pesati)
+    cumulati = np.vstack([np.zeros((1, livelli.shape[1])), np.cumprod(1 + rendimenti, axis=0) - 1])
+    return pd.DataFrame(cumulati, index=valori.index, columns=[*valori.columns, TOTALE])
+
+
+def irr(importi: np.ndarray, anni: np.ndarray, iterazioni: int = 50, tolleranza: float = 1e-12) -> np.ndarray:
+    """
+    Tasso interno di rendimento annuo di più serie di flussi, risolte insieme con il metodo di Newton.
+    L'incognita è il logaritmo di 1 + tasso, su cui il valore attuale è una somma di esponenziali:
+    con flussi di segno convenzionale bastano poche iterazioni anche con centinaia di flussi.
+    Il punto di partenza è il guadagno complessivo rispetto al capitale versato, distribuito sulla durata.
+
+    Arguments:
+        importi {np.ndarray} -- flussi dal punto di vista dell'investitore, serie x flussi (negativi i versamenti)
+        anni {np.ndarray} -- tempo di ogni flusso in anni dal primo, comune a tutte le serie o serie x flussi
+
+    Keyword Arguments:
+        iterazioni {int} -- numero massimo di iterazioni (default: {50})
+        tolleranza {float} -- variazione del logaritmo sotto cui una serie è risolta (default: {1e-12})
+
+    Returns:
+        np.ndarray -- tasso annuo di ogni serie, NaN se il tasso non esiste o il metodo non converge
+    """
+    importi = np.atleast_2d(np.asarray(importi, dtype=float))
+    anni = np.broadcast_to(np.asarray(anni, dtype=float), importi.shape)
+    versato = -np.where(importi < 0, importi, 0).sum(axis=1)
+    durata = anni.max(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.log1p(np.clip(importi.sum(axis=1) / versato, -0.9, 10)) / np.where(durata > 0, durata, 1)
+        x = np.nan_to_num(x)
+        risolte = np.zeros(len(importi), dtype=bool)
+        for _ in range(iterazioni):
+            sconto = np.exp(-x[:, None] * anni)
+            valore = (importi * sconto).sum(axis=1)
+            derivata = -(importi * anni * sconto).sum(axis=1)
+            passo = np.clip(np.where(derivata != 0, valore / derivata, 0), -1, 1)
+            x = np.where(risolte, x, x - passo)
+            risolte |= np.abs(passo) < tolleranza
+            if risolte.all():
+                break
+    # Il tasso esiste solo se ci sono flussi di entrambi i segni
+    esiste = (importi < 0).any(axis=1) & (importi > 0).any(axis=1)
+    return np.where(risolte & esiste & np.isfinite(x), np.expm1(x), np.nan)
+
+
+def mwr(valori: pd.DataFrame, movimenti: pd.DataFrame | None = None) -> pd.Series:
+    """
+    Rendimento ponderato per il denaro annuo tra la prima e l'ultima data: tasso interno di rendimento
+    del controvalore iniziale, dei movimenti e del controvalore finale. Tutti gli intermediari e il totale
+    condividono le date dei flussi e sono risolti con un'unica chiamata a irr.
+
+    Arguments:
+        valori {pd.DataFrame} -- controvalori, una colonna per intermediario, indicizzati per data in ordine crescente
+
+    Keyword Arguments:
+        movimenti {pd.DataFrame | None} -- foglio Movimenti (default: {None})
+
+    Returns:
+        pd.Series -- tasso annuo per intermediario più TOTALE
+    """
+    giorni = _giorni(valori.index)
+    inizio, fine = giorni[0], giorni[-1]
+    colonne = pd.Index(valori.columns)
+    if movimenti is None:
+        movimenti = pd.DataFrame(columns=[DATA, INTERMEDIARIO, IMPORTO])
+    data = _giorni(movimenti[DATA])
+    colonna = colonne.get_indexer(movimenti[INTERMEDIARIO])
+    validi = (data > inizio) & (data <= fine) & (colonna >= 0)
+    # Flussi: controvalore iniziale, movimenti (solo nella riga del loro intermediario), controvalore finale
+    importi = np.zeros((len(colonne), validi.sum() + 2))
+    importi[:, 0] = -valori.iloc[0].to_numpy(dtype=float)
+    importi[colonna[validi], np.arange(validi.sum()) + 1] = -movimenti[IMPORTO].to_numpy(dtype=float)[validi]
+    importi[:, -1] = valori.iloc[-1].to_numpy(dtype=float)
+    importi = np.vstack([importi, importi.sum(axis=0)])
+    anni = np.concatenate(([inizio], data[validi], [fine])) - inizio
+    return pd.Series(irr(importi, anni / 365.25), index=[*colonne, TOTALE])
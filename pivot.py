@@ -0,0 +1,90 @@
+"""Tabelle pivot dei controvalori del portafoglio."""
+import pandas as pd
+
+# Colonne dei controvalori nel foglio Portfolio
+T1 = 'TOTALE t1'
+T0 = 'TOTALE t0'
+# Etichette dei totali nelle tabelle pivot
+TOTALE_T1 = 'Totale t1'
+TOTALE_T0 = 'Totale t0'
+TOTALE = 'TOTALE'
+
+
+def pivot(df: pd.DataFrame, righe: str, colonne: str, ordine_righe: list | None = None,
+    ordine_colonne: list | None = None, riempimento=0) -> pd.DataFrame:
+    """
+    Somma i controvalori per ogni combinazione di righe e colonne con un'unica aggregazione,
+    compresi i totali per riga e per colonna.
+    I totali sono calcolati su tutto df, anche quando ordine_righe o ordine_colonne ne mostrano solo una parte.
+
+    Arguments:
+        df {pd.DataFrame} -- posizioni, con le colonne TOTALE t1 e TOTALE t0
+        righe {str} -- colonna di df i cui valori diventano le righe della tabella (es. CATEGORIA)
+        colonne {str} -- colonna di df i cui valori diventano le colonne della tabella (es. INTERMEDIARIO)
+
+    Keyword Arguments:
+        ordine_righe {list | None} -- righe da mostrare, in ordine di apparizione in df se None (default: {None})
+        ordine_colonne {list | None} -- colonne da mostrare, in ordine di apparizione in df se None (default: {None})
+        riempimento -- valore delle combinazioni di righe e colonne assenti in df (default: {0})
+
+    Returns:
+        pd.DataFrame -- controvalori in t1 per riga e colonna, con le colonne Totale t1 e Totale t0
+            e la riga TOTALE in fondo
+    """
+    ordine_righe = list(df[righe].unique()) if ordine_righe is None else list(ordine_righe)
+    ordine_colonne = list(df[colonne].unique()) if ordine_colonne is None else list(ordine_colonne)
+    somme = df.groupby([righe, colonne], sort=False)[[T1, T0]].sum()
+    per_riga = somme.groupby(level=0, sort=False).sum()
+    per_colonna = somme[T1].groupby(level=1, sort=False).sum()
+
+    tabella = somme[T1].unstack(colonne) if not somme.empty else pd.DataFrame()
+    tabella = tabella.reindex(index=ordine_righe, columns=ordine_colonne).fillna(riempimento)
+    tabella[TOTALE_T1] = per_riga[T1].reindex(ordine_righe, fill_value=0)
+    tabella[TOTALE_T0] = per_riga[T0].reindex(ordine_righe, fill_value=0)
+    tabella.loc[TOTALE] = [*per_colonna.reindex(ordine_colonne, fill_value=0), df[T1].sum(), df[T0].sum()]
+    return tabella
+
+
+def indice_strumenti(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indicizza le posizioni per (INTERMEDIARIO, PRODOTTO), in ordine di apparizione,
+    così che ogni strumento si recuperi con una ricerca per chiave invece che con una scansione del foglio.
+    Lo stesso prodotto presso intermediari diversi resta distinto; più posizioni dello stesso prodotto
+    presso lo stesso intermediario sono sommate, con il prezzo di carico medio ponderato sulle quantità.
+
+    Arguments:
+        df {pd.DataFrame} -- posizioni del foglio Portfolio
+
+    Returns:
+        pd.DataFrame -- una riga per ogni coppia (INTERMEDIARIO, PRODOTTO)
+    """
+    df = df.assign(_carico=df['prezzo_di_carico'] * df['QUANTITA t1'])
+    indice = df.groupby(['INTERMEDIARIO', 'PRODOTTO'], sort=False).agg({
+        'CATEGORIA': 'first', 'DIVISA': 'first', 'QUANTITA t1': 'sum', 'QUANTITA t0': 'sum', 'prezzo_di_carico': 'first',
+        '_carico': 'sum', 'PREZZO t1': 'first', 'PREZZO t0': 'first', 'CAMBIO t1': 'first', 'CAMBIO t0': 'first',
+        T1: 'sum', T0: 'sum'
+    })
+    medio = indice['_carico'] / indice['QUANTITA t1']
+    indice['prezzo_di_carico'] = medio.where(indice['QUANTITA t1'] != 0, indice['prezzo_di_carico'])
+    return indice.drop(columns='_carico')
+
+
+def variazione_prezzi(df: pd.DataFrame, righe: str = 'PRODOTTO') -> pd.Series:
+    """
+    Variazione mensile dei prezzi in euro, a quantità di t0, per ogni valore di `righe`.
+    Le posizioni liquidate in t1 o non presenti in t0 sono escluse; se non ne resta nessuna il valore è NaN.
+
+    Arguments:
+        df {pd.DataFrame} -- posizioni del foglio Portfolio
+
+    Keyword Arguments:
+        righe {str} -- colonna per cui raggruppare (default: {'PRODOTTO'})
+
+    Returns:
+        pd.Series -- variazione per ogni valore di `righe`, in ordine di apparizione
+    """
+    vive = df.loc[(df[T1] != 0) & (df[T0] != 0)]
+    chiave = vive[righe]
+    ctv_t1 = (vive['PREZZO t1'] * vive['CAMBIO t1'] * vive['QUANTITA t0']).groupby(chiave, sort=False).sum()
+    ctv_t0 = (vive['PREZZO t0'] * vive['CAMBIO t0'] * vive['QUANTITA t0']).groupby(chiave, sort=False).sum()
+    return (ctv_t1 / ctv_t0 - 1).reindex(df[righe].unique())
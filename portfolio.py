@@ -1,6 +1,13 @@
+import argparse
+import copy
 import datetime
+import hashlib
+import inspect
 import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import dateutil
@@ -9,9 +16,9 @@ from openpyxl.chart import AreaChart, BarChart, LineChart, PieChart, Reference
 from openpyxl.chart.label import DataLabel, DataLabelList
 from openpyxl.chart.layout import Layout, ManualLayout
 from openpyxl.chart.marker import DataPoint
+from openpyxl.chart.series import SeriesLabel
 from openpyxl.chart.text import RichText
 from openpyxl.drawing.fill import ColorChoice, PatternFillProperties
-from openpyxl.drawing.image import Image
 from openpyxl.drawing.spreadsheet_drawing import AnchorMarker, OneCellAnchor
 from openpyxl.drawing.text import (CharacterProperties, Paragraph,
                                    ParagraphProperties)
@@ -19,25 +26,210 @@ from openpyxl.drawing.xdr import XDRPositiveSize2D
 from openpyxl.styles import (Alignment, Border, Font,
                              PatternFill, Side)
 from openpyxl.styles.numbers import FORMAT_NUMBER_00 , FORMAT_PERCENTAGE_00
-from openpyxl.utils.dataframe import dataframe_to_rows  # Per l'import di dataframe
 from openpyxl.utils.units import cm_to_EMU, pixels_to_EMU
 from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.page import PageMargins  # Opzioni di stampa
 from openpyxl.worksheet.worksheet import Worksheet
 
+from campionamento import PUNTI_MINIMI, campiona_coppie
+from composizione import costruisci
+from cono import LIVELLI, bande, nomi_bande
+from dataset import CacheFogli, Dataset
+from immagini import LOGO, immagine, salva
+from istantanee import DELTA, Istantanee, performance_mese, performance_totale
+from mercato import FOGLI_MERCATO, SezioneMercato, sezione_mercato
+from pivot import TOTALE, TOTALE_T0, TOTALE_T1, indice_strumenti, pivot, variazione_prezzi
+from profilo import Profilo, misura
+from rischio import ASSOLUTI, FINESTRE, RELATIVI, indicatori
+from stili import (
+    COMPOSIZIONE, COMPOSIZIONE_PESO, CONTATTI, CORPO, CORPO_NOME, DISCLAIMER, INTESTAZIONE, MERCATO_INTESTAZIONE,
+    MERCATO_NOME, MERCATO_SEZIONE, MERCATO_TITOLO, MESE_CORPO, MESE_INTESTAZIONE, MESE_NOME, MESE_TOTALE,
+    MESE_TOTALE_NOME, NEGATIVO, NON_DISPONIBILE, POSITIVO, PREZZI_CORPO, PREZZI_CORPO_CENTRATO, PREZZI_INTESTAZIONE,
+    SOMMA, SOMMA_NOME, TESTO, TITOLO, registra_stili
+)
+from tabelle import impaginazione, scrivi_tabella
+
+
+# Metodi che creano le pagine del report, nell'ordine in cui vanno chiamati
+PAGINE = (
+    'copertina_1', 'indice_2', 'analisi_di_mercato_3', 'analisi_rendimenti_4', 'analisi_indici_5', 'performance_6',
+    'andamento_7', 'analisi_rischio', 'caricamento_dati', 'cono_8', 'cono_9', 'nuovo_bk_10', 'performance_11', 'prezzi_12', 'prezzi_13',
+    'prezzi_14', 'att_in_corso_15', 'valutazione_per_macroclasse_16', 'sintesi_17', 'valuta_18', 'tabella_pivot_azioni',
+    'tabella_pivot_obbligazioni_governative', 'tabella_pivot_obbligazioni_societarie', 'obb_totale_22', 'liquidità_23',
+    'liq_totale_24', 'gestioni_25', 'inv_alt_26', 'asset_allocation_27', 'contatti_28'
+)
+# Fogli di input letti da ogni pagina (Portfolio è comunque letto sempre, per i controvalori iniziali)
+FOGLI_PAGINE = {
+    'analisi_rendimenti_4': FOGLI_MERCATO, 'analisi_indici_5': FOGLI_MERCATO,
+    'andamento_7': ('Benchmark', 'Componenti', 'Portafoglio', 'Portfolio', 'Movimenti'), 'analisi_rischio': ('Benchmark', 'Componenti', 'Portafoglio'),
+    'caricamento_dati': ('Benchmark', 'Componenti', 'Portafoglio'), 'performance_11': ('Portfolio', 'Portafoglio', 'Delta', 'Movimenti'),
+    **dict.fromkeys((
+        'prezzi_12', 'prezzi_13', 'prezzi_14', 'sintesi_17', 'valuta_18', 'tabella_pivot_azioni',
+        'tabella_pivot_obbligazioni_governative', 'tabella_pivot_obbligazioni_societarie', 'obb_totale_22',
+        'liquidità_23', 'liq_totale_24', 'gestioni_25', 'inv_alt_26'
+    ), ('Portfolio',)),
+    'asset_allocation_27': ('Portfolio', 'Gestioni'),
+}
+# Fogli nascosti creati da una pagina e letti dai grafici di altre pagine
+FOGLI_CREATI = {'analisi_indici_5': ('Dati_indici',), 'caricamento_dati': ('Dati_cono', 'Dati_pf', 'Dati_bk')}
+FOGLI_LETTI = {'cono_8': ('Dati_cono', 'Dati_pf', 'Dati_bk'), 'cono_9': ('Dati_cono', 'Dati_pf', 'Dati_bk')}
+# Da incrementare quando cambia un metodo calcola_<pagina> (o un metodo di Report che chiama) o il formato
+# dei risultati salvati in modalità incrementale, per invalidarli
+VERSIONE_CALCOLI = 5
+# Moduli dei calcoli usati dai metodi calcola_<pagina>: il loro codice fa parte della chiave del risultato,
+# così che una modifica (compresa la configurazione, es. rischio.FINESTRE) invalidi i risultati salvati
+MODULI_CALCOLI = (
+    'campionamento', 'composizione', 'cono', 'istantanee', 'mercato', 'movimenti', 'pivot', 'rendimenti', 'rischio'
+)
+# Input dei metodi calcola_<pagina> oltre ai fogli di FOGLI_PAGINE, che fanno parte della chiave del risultato:
+# 'data' se il calcolo dipende da t1 (anche tramite la sezione di mercato), 'configurazione' le costanti di questo
+# modulo che legge, anche tramite i metodi che chiama (es. benchmark), e 'opzioni' gli attributi del report.
+# Una pagina assente dipende solo dai suoi fogli di input
+INPUT_CALCOLI = {
+    'analisi_rendimenti_4': {'data': True},
+    'analisi_indici_5': {'opzioni': ('punti_grafici',)},
+    'analisi_rischio': {'data': True, 'configurazione': ('COMPOSIZIONI',)},
+    'caricamento_dati': {'configurazione': ('COMPOSIZIONI', 'CONI')},
+}
+# Punti per serie dei grafici giornalieri della pagina 5, 0 per tutte le date (nessun campionamento).
+# Il grafico è largo 10 cm: con qualche centinaio di punti (es. 400) il file è più leggero e l'aspetto non cambia
+PUNTI_GRAFICI = 0
+# Benchmark costruiti dai livelli degli indici del foglio Componenti, se il file di input lo contiene
+# (altrimenti si usano le serie del foglio Benchmark): pesi degli indici, periodo di ribilanciamento
+# ('M', 'Q', 'Y' o None) e data in cui il benchmark vale 100
+COMPOSIZIONI = {
+    'benchmark_2022': {
+        'pesi': {
+            'Indice MTS BOT': 0.2, 'Bloomberg Euro Government': 0.1315, 'Bloomberg Euro Corporate Index': 0.0466,
+            'Bloomberg Pan-European High Yield Index': 0.0805, 'Bloomberg Global Aggregate Index': 0.1009,
+            'MSCI Europa': 0.0727, 'MSCI USA': 0.1455, 'MSCI Pacifico': 0.0456, 'MSCI Emerging Market Free': 0.1104,
+            'HFRX Absolute Return': 0.0285, 'Bloomberg Commodity Index': 0.0378,
+        },
+        'ribilanciamento': 'M',
+        'base': '2021-12-31',
+    },
+}
+# Benchmark di cui la pagina 10 mostra la composizione
+NUOVO_BENCHMARK = 'benchmark_2022'
+# Intermediari per cui la pagina 11 non calcola la performance del mese
+ESCLUSI_PERFORMANCE = ('Banca Valsabbina Nespoli', 'Crédit Agricole Artes', 'Crédit Agricole B.N.', 'Altro')
+# Voci della pagina 11 che non derivano dal foglio Portfolio: riprese dal foglio Delta, se il file di input lo contiene
+VOCI_MANUALI = ('Interessi Phoenix',)
+# Coni delle probabilità per pagina: colonna del foglio Benchmark da cui si calcola il cono,
+# colonna del foglio Portafoglio confrontata, data di inizio, valore minimo dell'asse y e colonna del foglio
+# Benchmark con una storia lunga da cui stimare rendimento e volatilità se il benchmark non ha abbastanza storia
+# prima dell'inizio (es. benchmark_2022 parte dall'inizio del cono se manca il foglio Componenti da cui ricostruirlo)
+CONI = {
+    'cono_8': ('benchmark_2016', 'ptf_2016', '2016-01-31', 95, 'benchmark_2007'),
+    'cono_9': ('benchmark_2022', 'ptf_2022', '2021-12-31', 90, 'benchmark_2007'),
+}
+# Pagine che devono essere create prima di un'altra, perché ne creano i fogli nascosti
+PREREQUISITI = {
+    pagina: tuple(dict.fromkeys(
+        creatrice for foglio in letti for creatrice, creati in FOGLI_CREATI.items() if foglio in creati
+    ))
+    for pagina, letti in FOGLI_LETTI.items()
+}
+# Impronte calcolate una volta per processo (codice dei MODULI_CALCOLI)
+_impronte = {}
+
+
+def risolvi_pagine(pagine: list | None = None) -> list[str]:
+    """
+    Pagine da creare, comprese quelle da cui dipendono, nell'ordine di PAGINE.
+    Una pagina si può indicare con il nome del metodo (es. sintesi_17) o con il suo numero (es. 17).
+
+    Keyword Arguments:
+        pagine {list | None} -- pagine richieste, tutte se None (default: {None})
+
+    Returns:
+        list[str] -- metodi da chiamare, in ordine
+    """
+    if pagine is None:
+        return list(PAGINE)
+    numeri = {pagina.rsplit('_', 1)[-1]: pagina for pagina in PAGINE if pagina.rsplit('_', 1)[-1].isdigit()}
+    numeri.update({
+        '19': 'tabella_pivot_azioni', '20': 'tabella_pivot_obbligazioni_governative',
+        '21': 'tabella_pivot_obbligazioni_societarie', '7.1': 'analisi_rischio'
+    })
+    richieste = set()
+    for pagina in map(str, pagine):
+        if pagina not in PAGINE and pagina not in numeri:
+            raise ValueError(f'Pagina sconosciuta: {pagina}')
+        pagina = numeri.get(pagina, pagina)
+        richieste.update((pagina, *PREREQUISITI.get(pagina, ())))
+    return [pagina for pagina in PAGINE if pagina in richieste]
+
+
+def fogli_necessari(pagine: list[str]) -> list[str]:
+    """
+    Fogli di input da leggere per creare le pagine.
+
+    Arguments:
+        pagine {list[str]} -- pagine da creare, già risolte con risolvi_pagine
+
+    Returns:
+        list[str] -- fogli da leggere
+    """
+    fogli = {'Portfolio': None}
+    for pagina in pagine:
+        fogli.update(dict.fromkeys(FOGLI_PAGINE.get(pagina, ())))
+    return list(fogli)
+
+
+def impronta_moduli() -> str:
+    """
+    Impronta del codice dei MODULI_CALCOLI, calcolata una volta per processo.
+
+    Returns:
+        str -- hash sha256 in esadecimale
+    """
+    if 'moduli' not in _impronte:
+        h = hashlib.sha256()
+        for nome in MODULI_CALCOLI:
+            h.update(inspect.getsource(sys.modules[nome]).encode())
+        _impronte['moduli'] = h.hexdigest()
+    return _impronte['moduli']
+
 
 class Report():
     """Crea un report di un portafoglio."""
 
-    def __init__(self, t1, file_portafoglio='artes.xlsx'):
+    def __init__(self, t1, file_portafoglio='artes.xlsx', dati=None, mercato=None, profilo=None, pagine=None, thread=4,
+        incrementale=False, comprimi_logo=True, calcoli=None, salva_istantanee=False, sovrascrivi_istantanee=False,
+        punti_grafici=PUNTI_GRAFICI):
         """
         Initialize the class.
 
         Arguments:
             t1 {str} = data finale
             file_portafoglio {str} = nome del file excel da lavorare
-        """
+            dati {Dataset} = fogli di input già letti, condivisi tra più report (default: letti da file_portafoglio)
+            mercato {SezioneMercato} = sezione di mercato già calcolata, usata se i dati di mercato coincidono (default: calcolata o ripresa dalla cache)
+            profilo {Profilo} = profilo in cui misurare caricamento dei dati, pagine, layout e salvataggio (default: nessuna misura)
+            pagine {list} = pagine da creare, per nome o numero; le pagine da cui dipendono sono aggiunte
+                e si leggono solo i fogli di input necessari (default: tutte)
+            thread {int} = thread in cui eseguire le fasi di calcolo delle pagine mentre le pagine precedenti
+                vengono scritte; con 1, o con un profilo attivo, ogni calcolo è eseguito dalla sua pagina (default: 4)
+            incrementale {bool} = riusa i risultati delle fasi di calcolo salvati in cache, se i fogli di input
+                della pagina non sono cambiati dall'ultima esecuzione con la stessa data (default: False)
+            comprimi_logo {bool} = ricodifica il logo in png compresso; il logo è letto una volta per processo
+                e salvato una volta sola nel report (default: True)
+            calcoli {dict} = risultati delle fasi di calcolo condivisi tra i report dello stesso file di input
+                (es. i mesi di uno storico), per chiave del calcolo (default: nessuna condivisione)
+            salva_istantanee {bool} = salva i totali per intermediario del mese, da cui i report successivi
+                calcolano la performance da inizio anno, se il foglio Portafoglio arriva al mese di t1;
+                sono salvati in <file_portafoglio>.istantanee.csv, accanto al file di input (default: False)
+            sovrascrivi_istantanee {bool} = sostituisce l'istantanea del mese se è già stata salvata (default: False)
+            punti_grafici {int} = punti per serie dei grafici giornalieri della pagina 5, scelti in modo da
+                mantenere la forma delle serie, almeno PUNTI_MINIMI; None o 0 per tutte le date
+                (default: PUNTI_GRAFICI, tutte le date)
+        """
+        if punti_grafici and punti_grafici < PUNTI_MINIMI:
+            raise ValueError(f'punti_grafici deve essere almeno {PUNTI_MINIMI}, oppure None o 0 per tutte le date')
         self.wb = Workbook()
+        registra_stili(self.wb)
+        self.comprimi_logo = comprimi_logo
 
         # Dates
         self.t1 = datetime.datetime.strptime(t1, '%d/%m/%Y')
@@ -60,6 +252,9 @@ class Report():
         directory = Path().cwd()
         self.path = directory
         self.file_portafoglio = self.path.joinpath(file_portafoglio)
+        # Riga di ogni mese ('%m-%Y') e colonna di ogni serie nei fogli nascosti, per foglio
+        self.righe_mese = {}
+        self.colonne_dati = {}
         self.mesi_dict = {
             1: 'Gennaio', 2: 'Febbraio', 3: 'Marzo', 4: 'Aprile', 5: 'Maggio', 6: 'Giugno', 7: 'Luglio', 8: 'Agosto', 
             9: 'Settembre', 10: 'Ottobre', 11: 'Novembre', 12: 'Dicembre'
@@ -69,8 +264,32 @@ class Report():
         # self.engine = create_engine(DATABASE_URL)
         # self.connection = self.engine.connect()
 
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        # Carica i fogli di input delle pagine richieste in un'unica passata
+        # (i fogli già letti in un'esecuzione precedente vengono ripresi dalla cache)
+        self.pagine = risolvi_pagine(pagine)
+        self.profilo = profilo
+        self.cache = CacheFogli(self.path.joinpath('.cache'))
+        self.dati = dati if dati is not None else Dataset(
+            self.file_portafoglio, fogli=fogli_necessari(self.pagine), cache=self.cache, profilo=profilo
+        )
+        # Sezione di mercato delle pagine 4 e 5, risolta alla prima pagina che la usa
+        self.__mercato_condiviso = mercato
+        self.__mercato = None
+        self.__lock_mercato = threading.Lock()
+        # Fasi di calcolo delle pagine avviate in parallelo da genera(), per pagina
+        self.thread = thread
+        self.__calcoli = {}
+        # Fasi di calcolo riusate dalla cache e ricalcolate, in modalità incrementale
+        self.incrementale = incrementale
+        self.calcoli = calcoli
+        # Totali per intermediario dei mesi già elaborati, accanto al file di input
+        self.istantanee = Istantanee(self.file_portafoglio.with_suffix('.istantanee.csv'))
+        self.salva_istantanee = salva_istantanee
+        self.sovrascrivi_istantanee = sovrascrivi_istantanee
+        self.punti_grafici = punti_grafici or None
+        self.calcoli_riusati = []
+        self.calcoli_eseguiti = []
+        portfolio = self.dati['Portfolio']
 
         # Controvalori
         controvalore_t1 = portfolio['TOTALE t1'].sum()
@@ -78,7 +297,116 @@ class Report():
         controvalore_t0_1m = portfolio['TOTALE t0'].sum()
         print(f"Il controvalore del portafoglio nel mese precedente era : {round(controvalore_t0_1m, 2)}.")
 
-    def __logo(self, ws: Worksheet, picture: Path | str = Path(r'.\\img\\logo_B&S.bmp'),
+    @property
+    def mercato(self) -> SezioneMercato:
+        """
+        Rendimenti degli indici e serie dei grafici della sezione di mercato.
+        Dipendono solo dai dati di mercato e da t1: sono calcolati una volta per mese e condivisi
+        tra i report dei clienti (nello stesso processo o tramite la cache su disco).
+        """
+        with self.__lock_mercato: # le pagine 4 e 5 possono chiederla insieme da thread diversi
+            if self.__mercato is None:
+                with misura(self.profilo, 'mercato'):
+                    self.__mercato = sezione_mercato(
+                        self.dati, self.t1, {'MENSILI': self.t0_1m, 'YTD': self.t0_ytd, '1y': self.t0_1Y, '3y': self.t0_3Y},
+                        cache=self.cache, sezione=self.__mercato_condiviso
+                    )
+        return self.__mercato
+
+    def benchmark(self) -> pd.DataFrame:
+        """
+        Serie dei benchmark: il foglio Benchmark, con le serie di COMPOSIZIONI costruite dal foglio Componenti
+        se il file di input lo contiene.
+
+        Returns:
+            pd.DataFrame -- un benchmark per colonna, indicizzati per data
+        """
+        if 'Componenti' not in self.dati:
+            return self.dati['Benchmark']
+        return costruisci(self.dati['Benchmark'], self.dati['Componenti'], COMPOSIZIONI)
+
+    def movimenti(self) -> pd.DataFrame | None:
+        """
+        Conferimenti e prelievi per intermediario: il foglio Movimenti, se il file di input lo contiene.
+
+        Returns:
+            pd.DataFrame | None -- colonne DATA, INTERMEDIARIO e IMPORTO (positivo per i conferimenti), None se manca
+        """
+        return self.dati['Movimenti'] if 'Movimenti' in self.dati else None
+
+    def calcolo(self, pagina: str):
+        """
+        Risultato della fase di calcolo di una pagina (metodo calcola_<pagina>), che legge solo i dati di input
+        e non scrive nel workbook. Se genera() l'ha avviata in un thread ne attende il risultato,
+        altrimenti la esegue subito.
+
+        Arguments:
+            pagina {str} -- nome della pagina
+
+        Returns:
+            risultato del metodo calcola_<pagina>
+        """
+        futuro = self.__calcoli.pop(pagina, None)
+        if futuro is not None:
+            return futuro.result()
+        with misura(self.profilo, f'calcola_{pagina}'):
+            return self.__esegui_calcolo(pagina)
+
+    def __chiave_calcolo(self, pagina: str) -> str:
+        """
+        Chiave in cache del risultato di calcola_<pagina>: dipende da VERSIONE_CALCOLI, dall'impronta dei fogli
+        di input della pagina (FOGLI_PAGINE), dagli altri input dichiarati in INPUT_CALCOLI (data, valore delle
+        costanti di configurazione e opzioni del report) e dal codice dei MODULI_CALCOLI.
+        Così i calcoli che non dipendono dalla data sono riusati tra report di mesi diversi.
+
+        Arguments:
+            pagina {str} -- nome della pagina
+
+        Returns:
+            str -- chiave del risultato
+        """
+        impronte = [(foglio, self.dati.impronte.get(foglio)) for foglio in FOGLI_PAGINE.get(pagina, ())]
+        ingressi = INPUT_CALCOLI.get(pagina, {})
+        data = self.t1 if ingressi.get('data') else None
+        configurazione = [(nome, globals()[nome]) for nome in ingressi.get('configurazione', ())]
+        opzioni = [(opzione, getattr(self, opzione)) for opzione in ingressi.get('opzioni', ())]
+        return hashlib.sha256(
+            f'calcolo|{VERSIONE_CALCOLI}|{pagina}|{data}|{impronte}|{opzioni}|{configurazione!r}|'
+            f'{impronta_moduli()}'.encode()
+        ).hexdigest()
+
+    def __esegui_calcolo(self, pagina: str):
+        """
+        Esegue la fase di calcolo di una pagina. Riusa il risultato se è già stato calcolato da un altro report
+        che condivide self.calcoli o, in modalità incrementale, se è salvato in cache e i fogli di input
+        della pagina non sono cambiati; altrimenti lo calcola e lo salva.
+
+        Arguments:
+            pagina {str} -- nome della pagina
+
+        Returns:
+            risultato del metodo calcola_<pagina>
+        """
+        calcola = getattr(self, f'calcola_{pagina}')
+        if not self.incrementale and self.calcoli is None:
+            return calcola()
+        chiave = self.__chiave_calcolo(pagina)
+        if self.calcoli is not None and chiave in self.calcoli:
+            self.calcoli_riusati.append(pagina)
+            return copy.deepcopy(self.calcoli[chiave]) # le pagine possono modificare il risultato
+        risultato = self.cache.leggi(chiave) if self.incrementale else None
+        if risultato is not None:
+            self.calcoli_riusati.append(pagina)
+        else:
+            risultato = calcola()
+            if self.incrementale:
+                self.cache.scrivi(chiave, risultato)
+            self.calcoli_eseguiti.append(pagina)
+        if self.calcoli is not None:
+            self.calcoli[chiave] = copy.deepcopy(risultato)
+        return risultato
+
+    def __logo(self, ws: Worksheet, picture: Path | str = LOGO,
         col: int = 5, colOff: float = 0.3, row: int = 34, rowOff: float = 0):   
         """
         Aggiunge un'immagine in coordinate precise del foglio, applicando uno spostamento.
@@ -87,13 +415,13 @@ class Report():
             ws {Worksheet} -- foglio in cui incollare l'immagine
 
         Keyword Arguments:
-            picture {Path  |  str} -- percorso in cui si trova l'immagine (default: {Path(r'.\\img\\logo_B&S.bmp')})
+            picture {Path  |  str} -- percorso in cui si trova l'immagine, letta una sola volta (default: {LOGO})
             col {int} -- colonna di partenza in cui incollare l'immagine (default: {5})
             colOff {float} -- spostamento dalla colonna di partenza (default: {0.3})
             row {int} -- riga di partenza in cui incollare l'immagine (default: {34})
             rowOff {float} -- spostamento dalla riga di partenza (default: {0})      
         """
-        logo = Image(picture)
+        logo = immagine(picture, self.comprimi_logo)
         h, w = logo.height, logo.width
         size = XDRPositiveSize2D(pixels_to_EMU(w), pixels_to_EMU(h))
         cellw = lambda x: cm_to_EMU((x * (18.65-1.71))/10)
@@ -113,37 +441,28 @@ class Report():
             min_col {int} -- coordinate dove inserire la text box
             max_col {int} -- coordinate dove inserire la text box
         """        
+        # Bordi del riquadro, costruiti una volta: sinistro e destro di ogni riga,
+        # superiore e inferiore (con gli angoli) della prima e dell'ultima riga
+        bordo = Side(border_style='medium', color='31869B')
+        sinistra, destra = Border(left=bordo), Border(right=bordo)
+        righe_estreme = {
+            max_row: (Border(bottom=bordo, left=bordo), Border(bottom=bordo), Border(bottom=bordo, right=bordo)),
+            min_row: (Border(top=bordo, left=bordo), Border(top=bordo), Border(top=bordo, right=bordo)),
+        }
         for row in ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
             for _ in range(max_col-min_col+1):
-                ws[row[_].coordinate].fill = PatternFill(fill_type='solid', fgColor='FFFFFF')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=12, color='31869B')
-            ws[row[0].coordinate].border = Border(left=Side(border_style='medium', color='31869B'))
-            ws[row[max_col-min_col].coordinate].border = Border(right=Side(border_style='medium', color='31869B'))
-            if row[0].row == min_row:
+                ws[row[_].coordinate].style = TESTO
+            ws[row[0].coordinate].border = sinistra
+            ws[row[max_col-min_col].coordinate].border = destra
+            if row[0].row in righe_estreme:
+                primo, centro, ultimo = righe_estreme[row[0].row]
                 for _ in range(max_col-min_col+1):
                     if row[_].column == min_col:
-                        ws[row[_].coordinate].border = Border(
-                            top=Side(border_style='medium', color='31869B'), 
-                            left=Side(border_style='medium', color='31869B'))
+                        ws[row[_].coordinate].border = primo
                     elif row[_].column == max_col:
-                        ws[row[_].coordinate].border = Border(
-                            top=Side(border_style='medium', color='31869B'), 
-                            right=Side(border_style='medium', color='31869B'))
+                        ws[row[_].coordinate].border = ultimo
                     else:
-                        ws[row[_].coordinate].border = Border(top=Side(border_style='medium', color='31869B'))
-            elif row[0].row == max_row:
-                for _ in range(max_col-min_col+1):
-                    if row[_].column == min_col:
-                        ws[row[_].coordinate].border = Border(
-                            bottom=Side(border_style='medium', color='31869B'), 
-                            left=Side(border_style='medium', color='31869B'))
-                    elif row[_].column == max_col:
-                        ws[row[_].coordinate].border = Border(
-                            bottom=Side(border_style='medium', color='31869B'), 
-                            right=Side(border_style='medium', color='31869B'))
-                    else:
-                        ws[row[_].coordinate].border = Border(
-                            bottom=Side(border_style='medium', color='31869B'))
+                        ws[row[_].coordinate].border = centro
 
     def copertina_1(self):
         """
@@ -154,9 +473,7 @@ class Report():
         ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
         ws.merge_cells('A1:L1')
         ws['A11'] = 'Benchmark & Style'
-        ws['A11'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A11'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A11'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A11'].style = TITOLO
         ws.merge_cells('A11:L14')
         ws['E17'] = 'ARTES'
         ws['E17'].alignment = Alignment(horizontal='center', vertical='center')
@@ -169,7 +486,7 @@ class Report():
         ws['A33'].fill = PatternFill(fill_type='solid', fgColor='31869B')
         ws.merge_cells('A33:L33')
         # Logo
-        logo = Image(Path(r'.\\img\\logo_B&S.bmp'))
+        logo = immagine(LOGO, self.comprimi_logo)
         ws.add_image(logo, 'F27')
         logo.height = 75.59
         logo.width = 128.88188976377952755905511811024
@@ -183,13 +500,14 @@ class Report():
         self.wb.active = ws
         ws.merge_cells('A1:L4')
         ws['A1'] = 'Indice'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws['B8'] = '1. Analisi Di Mercato'
         ws['B8'].font = Font(name='Times New Roman', size=18, bold=True, color='31869B')
         ws['B11'] = '2. Performance'
         ws['B11'].font = Font(name='Times New Roman', size=18, bold=True, color='31869B')
+        if 'analisi_rischio' in self.pagine:
+            ws['C12'] = '7.1 Analisi Del Rischio'
+            ws['C12'].font = Font(name='Times New Roman', size=12, bold=True, color='31869B')
         ws['B14'] = '3. Valutazione Per Macroclasse'
         ws['B14'].font = Font(name='Times New Roman', size=18, bold=True, color='31869B')
         ws['B17'] = '4. Contatti'
@@ -206,61 +524,37 @@ class Report():
         ws = self.wb['3.an_mkt']
         self.wb.active = ws
         ws['A11'] = '1. Analisi Di Mercato'
-        ws['A11'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A11'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A11'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A11'].style = TITOLO
         ws.merge_cells('A11:L14')
         # Logo
         self.__logo(ws)
 
+    def calcola_analisi_rendimenti_4(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della quarta pagina: rendimenti di indici e tassi di cambio,
+        condivisi tra i report dello stesso mese.
+
+        Returns:
+            pd.DataFrame -- rendimenti per indice e orizzonte
+        """
+        return self.mercato.rendimenti
+
     def analisi_rendimenti_4(self):
         """
         Crea la quarta pagina.
         Aggiunge fogli Indici e fogli Indici_in_euro.
         """
-        # Carica indici e tassi di cambio
-        indici_tassi = pd.read_excel(self.file_portafoglio, sheet_name='Indici', header=[0, 1], parse_dates=True, index_col=0)
-        indici_tassi.columns = indici_tassi.columns.droplevel(-1)
-        # print(indici_tassi)
-        # Carica indici in euro
-        indici_in_euro = pd.read_excel(self.file_portafoglio, sheet_name='Indici_in_euro', header=[0, 1], parse_dates=True, index_col=0)
-        indici_in_euro.columns = indici_in_euro.columns.droplevel(-1)
-        # print(indici_in_euro)
-        # Crea dizionario dove inserire i rendimenti degli indici e dei tassi
-        indici_perf = {
-            'S&P 500' : [], 'NIKKEI' : [], 'NASDAQ' : [], 'FTSE 100' : [], 'FTSE MIB' : [], 'DAX' : [],
-            'DOW JONES INDUSTRIAL AVERAGE' : [], 'EURO STOXX 50' : [], 'HANG SENG' : [], 'MSCI WORLD' : [],
-            'MSCI EMERGING MARKETS' : [], 'HFRX EWSI' : [], 'WTI CRUDE OIL FUTURE' : [], 'LONDON GOLD MARKET FIXING LTD' : [],
-            'COMMODITY RESEARCH BUREAU' : [], 'LYXOR ETF EURO CASH' : [], 'LYXOR ETF EURO CORP BOND' : [],
-            'BARCLAYS EUROAGG CORP TR' : [], 'JPM GBI EMU 1_10' : [], 'JPM GBI EMU 3_5' : [], 'JPM GBI EMU 1_3' : [], 
-            'USDEUR' : [], 'GBPEUR' : [], 'CHFEUR' : [], 'AUDEUR' : [], 'NOKEUR' : []
-        }
-        for column in indici_tassi.columns.values:
-            monthly = (indici_tassi.loc[self.t1, column] - indici_tassi.loc[self.t0_1m, column]) / (indici_tassi.loc[self.t0_1m, column])
-            ytd = (indici_tassi.loc[self.t1, column] - indici_tassi.loc[self.t0_ytd, column]) / (indici_tassi.loc[self.t0_ytd, column])
-            one_year = (indici_tassi.loc[self.t1, column] - indici_tassi.loc[self.t0_1Y, column]) / (indici_tassi.loc[self.t0_1Y, column])
-            three_years = (indici_tassi.loc[self.t1, column] - indici_tassi.loc[self.t0_3Y, column]) / (indici_tassi.loc[self.t0_3Y, column])
-            indici_perf[column] = [monthly, ytd, one_year, three_years]
-        for column in indici_in_euro.columns.values:
-            ytd_eur = (indici_in_euro.loc[self.t1, column] - indici_in_euro.loc[self.t0_ytd, column]) / (indici_in_euro.loc[self.t0_ytd, column])
-            indici_perf[column].append(ytd_eur)
-        # print(indici_perf)
+        indici_perf = self.calcolo('analisi_rendimenti_4')
 
         ws = self.wb.create_sheet('4.an_mkt_rend')
         ws = self.wb['4.an_mkt_rend']
         self.wb.active = ws
         ws.merge_cells('A1:O4')
         ws['A1'] = 'Analisi Di Mercato'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.row_dimensions[5].height = 3
         ws['A6'] = 'Performance ' + self.mesi_dict[self.t1.month]
-        ws['A6'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A6'].font = Font(name='Times New Roman', size=10, bold=True, color='FFFFFF')
-        ws['A6'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        ws['A6'].border = Border(top=Side(border_style='medium', color='000000'), bottom=Side(border_style='medium', color='000000'), right=Side(border_style='medium', color='000000'), left=Side(border_style='medium', color='000000'))
-        ws['A7'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A6'].style = MERCATO_TITOLO
         ws.merge_cells('A6:I6')
 
         # Colonne tabella
@@ -268,12 +562,9 @@ class Report():
         for column in ws.iter_cols(min_row=7, max_row=7, min_col=1, max_col=9):
             ws[column[0].coordinate].value = header_4[0]
             del header_4[0]
-            ws[column[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True, color='FFFFFF')
-            ws[column[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[column[0].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[column[0].coordinate].border = Border(top=Side(border_style='medium', color='000000'), bottom=Side(border_style='medium', color='000000'))
-            ws.cell(row=column[0].row, column=1).border = Border(left=Side(border_style='medium', color='000000'))
-            ws.cell(row=column[0].row, column=9).border = Border(right=Side(border_style='medium', color='000000'))
+            ws[column[0].coordinate].style = MERCATO_INTESTAZIONE
+        ws['A7'].border = Border(left=Side(border_style='medium', color='000000'))
+        ws['I7'].border = Border(right=Side(border_style='medium', color='000000'))
 
         # Corpo tabella
         index_4 = [
@@ -289,83 +580,19 @@ class Report():
             del index_4[0]
             ws.row_dimensions[row[0].row].height = 13
             if ws[row[0].coordinate].value == 'AZIONARI' or ws[row[0].coordinate].value == 'HEDGE FUND' or ws[row[0].coordinate].value == 'COMMODITIES'	or ws[row[0].coordinate].value == 'OBBLIGAZIONARI GOVERNATIVE' or ws[row[0].coordinate].value == 'OBBLIGAZIONARI CORPORATE' or ws[row[0].coordinate].value == 'VALUTE' or ws[row[0].coordinate].value == 'le valute sono espresse come quantità di euro per un\'unità di valuta estera':
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=8, bold=True, color='006666')
-                ws[row[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='92CDDC')
-                ws[row[0].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                ws[row[0].coordinate].border = Border(top=Side(border_style='medium', color='000000'), left=Side(border_style='medium', color='000000'), bottom=Side(border_style='medium', color='000000'), right=Side(border_style='medium', color='000000'))
+                ws[row[0].coordinate].style = MERCATO_SEZIONE
                 ws.merge_cells(start_row=row[0].row, end_row=row[0].row, start_column=1, end_column=9)
             else:
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=8, bold=True, color='FFFFFF')
-                ws[row[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-                ws[row[0].coordinate].alignment = Alignment(vertical='center')
-                ws[row[0].coordinate].border = Border(left=Side(border_style='thin', color='000000'), bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
+                ws[row[0].coordinate].style = MERCATO_NOME
                 ws.merge_cells(start_row=row[0].row, end_row=row[0].row, start_column=1, end_column=4)
-            if ws[row[0].coordinate].value in indici_perf.keys():
+            if ws[row[0].coordinate].value in indici_perf.index:
                 if row[0].row < 34: # Riempi la tabella tranne valute (00B050 + FF0000 -)
-                    ws[row[4].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][0] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][0] > 0:
-                        ws[row[4].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[4].coordinate].font = Font(color='FF0000')
-                    ws[row[4].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[4].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[5].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][4] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][4] > 0:
-                        ws[row[5].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[5].coordinate].font = Font(color='FF0000')
-                    ws[row[5].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[5].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[6].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][1] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][1] > 0:
-                        ws[row[6].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[6].coordinate].font = Font(color='FF0000')
-                    ws[row[6].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[6].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[7].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][2] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][2] > 0:
-                        ws[row[7].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[7].coordinate].font = Font(color='FF0000')
-                    ws[row[7].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[7].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[8].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][3] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][3] > 0:
-                        ws[row[8].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[8].coordinate].font = Font(color='FF0000')
-                    ws[row[8].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[8].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
+                    colonne = {4: 'MENSILI', 5: 'YTD €', 6: 'YTD', 7: '1y', 8: '3y'}
                 else: # Riempi valute
-                    ws[row[4].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][0] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][0] > 0:
-                        ws[row[4].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[4].coordinate].font = Font(color='FF0000')
-                    ws[row[4].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[4].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[5].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][1] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][1] > 0:
-                        ws[row[5].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[5].coordinate].font = Font(color='FF0000')
-                    ws[row[5].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[5].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[7].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][2] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][2] > 0:
-                        ws[row[7].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[7].coordinate].font = Font(color='FF0000')
-                    ws[row[7].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[7].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
-                    ws[row[8].coordinate].value = "{0:.2f}%".format(round(indici_perf[row[0].value][3] * 100, 2)).replace('.', ',')
-                    if indici_perf[row[0].value][3] > 0:
-                        ws[row[8].coordinate].font = Font(color='00B050')
-                    else:
-                        ws[row[8].coordinate].font = Font(color='FF0000')
-                    ws[row[8].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-                    ws[row[8].coordinate].border = Border(bottom=Side(border_style='thin', color='000000'), right=Side(border_style='thin', color='000000'))
+                    colonne = {4: 'MENSILI', 5: 'YTD', 7: '1y', 8: '3y'}
+                for colonna, orizzonte in colonne.items():
+                    self.__rendimento(ws[row[colonna].coordinate], indici_perf.at[row[0].value, orizzonte])
+                if row[0].row >= 34:
                     ws.merge_cells(start_row=row[5].row, end_row=row[5].row, start_column=row[5].column, end_column=row[6].column)
         
         # Textbox
@@ -374,40 +601,46 @@ class Report():
         # Logo
         self.__logo(ws, col=6, colOff=0.8, row=43, rowOff=-0.2)
 
+    @staticmethod
+    def __rendimento(cella, valore: float):
+        """
+        Scrive una variazione percentuale come testo con la virgola decimale, verde se positiva e rossa altrimenti;
+        'n.d.' se non è calcolabile (NaN, es. manca la quotazione a una data).
+
+        Arguments:
+            cella {Cell} -- cella da scrivere
+            valore {float} -- variazione
+        """
+        if pd.isna(valore):
+            cella.value = 'n.d.'
+            cella.style = NON_DISPONIBILE
+            return
+        cella.value = "{0:.2f}%".format(round(valore * 100, 2)).replace('.', ',')
+        cella.style = POSITIVO if valore > 0 else NEGATIVO
+
+    def calcola_analisi_indici_5(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della quinta pagina: serie giornaliere dei grafici, condivise tra i report dello stesso mese,
+        ridotte a self.punti_grafici righe prima di scriverle nel foglio Dati_indici.
+
+        Returns:
+            pd.DataFrame -- serie giornaliere, con le date come mese ('%m-%Y')
+        """
+        return campiona_coppie(self.mercato.dati_indici, self.punti_grafici)
+
     def analisi_indici_5(self):
         """
         Crea la quinta pagina.
         Aggiunge fogli Indici_giornalieri.
         """
-        # Carica indici giornalieri
-        indici_giornalieri = pd.read_excel(
-            self.file_portafoglio, 
-            sheet_name='Indici_giornalieri', 
-            names=['Date', 'S&P 500', 'Date.1', 'USDEUR', 'Date.2', 'VIX', 'Date.3', 'EURO STOXX 50']
-        )
-        indici_giornalieri['Date'] = pd.to_datetime(indici_giornalieri['Date'], format = '%Y-%m-%d %H:%M:%S').dt.strftime('%m-%Y')
-        indici_giornalieri['Date.1'] = pd.to_datetime(indici_giornalieri['Date.1'], format = '%Y-%m-%d %H:%M:%S').dt.strftime('%m-%Y')
-        indici_giornalieri['Date.2'] = pd.to_datetime(indici_giornalieri['Date.2'], format = '%Y-%m-%d %H:%M:%S').dt.strftime('%m-%Y')
-        indici_giornalieri['Date.3'] = pd.to_datetime(indici_giornalieri['Date.3'], format = '%Y-%m-%d %H:%M:%S').dt.strftime('%m-%Y')
-        # print(indici_giornalieri)
-        
         # Aggiungi foglio dati per creare i grafici
-        ws_dati_indici = self.wb.create_sheet('Dati_indici')
-        ws_dati_indici = self.wb['Dati_indici']
-        self.wb.active = ws_dati_indici
-        # Carica gli indici giornalieri
-        for r in dataframe_to_rows(indici_giornalieri, index=True, header=True):
-            ws_dati_indici.append(r)
-        ws_dati_indici.delete_rows(2)
-        ws_dati_indici.sheet_state = 'hidden'
+        ws_dati_indici = self.__foglio_dati('Dati_indici', self.calcolo('analisi_indici_5'))
 
         ws = self.wb.create_sheet('5.an_mkt_perf')
         ws = self.wb['5.an_mkt_perf']
         self.wb.active = ws
         ws['A1'] = '1. Analisi Di Mercato'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
 
         # Aggiunta primo grafico
@@ -491,9 +724,7 @@ class Report():
         self.wb.active = ws
         # Corpo
         ws['A11'] = '2. Performance'
-        ws['A11'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A11'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A11'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A11'].style = TITOLO
         ws.merge_cells('A11:L14')
 
         # Logo
@@ -504,17 +735,20 @@ class Report():
         Crea la settima pagina.
         """
         # Carica performance benchmark
-        benchmark = pd.read_excel(self.file_portafoglio, sheet_name='Benchmark', index_col=0, header=0)
+        benchmark = self.benchmark()
         perf_bk_2007 = (float(benchmark.loc[self.t1, 'benchmark_2007']) - 100) / 100
         perf_bk_ytd = (float(benchmark.loc[self.t1, 'benchmark_2007']) - float(benchmark.loc[self.t0_ytd, 'benchmark_2007'])) / float(benchmark.loc[self.t0_ytd, 'benchmark_2007'])
         perf_month = (float(benchmark.loc[self.t1, 'benchmark_2007']) - float(benchmark.loc[self.t0_1m, 'benchmark_2007'])) / float(benchmark.loc[self.t0_1m, 'benchmark_2007'])
         # Carica portafoglio
-        ptf = pd.read_excel(self.file_portafoglio, sheet_name='Portafoglio', index_col=0, header=0)
+        ptf = self.dati['Portafoglio']
         # print(ptf['31/10/2015':'31/12/2021'])
         perf_ptf_2007 = (float(ptf.loc[self.t1, 'ptf_2007']) - 100) / 100
         perf_ptf_ytd = (float(ptf.loc[self.t1, 'ptf_2007']) - ptf.loc[self.t0_ytd, 'ptf_2007']) / ptf.loc[self.t0_ytd, 'ptf_2007']
         perf_ptf_month = (float(ptf.loc[self.t1, 'ptf_2007']) - ptf.loc[self.t0_1m, 'ptf_2007']) / ptf.loc[self.t0_1m, 'ptf_2007']
-
+        # Rendimenti ponderati per il tempo e per il denaro, nella tabella sotto ai grafici e non nelle barre del Ptf:
+        # sono calcolati dai controvalori degli intermediari della pagina 11 (senza gli intermediari esclusi
+        # e al lordo della commissione)
+        totale = self.__performance_totale()
 
         ws = self.wb.create_sheet('7.andamento')
         ws = self.wb['7.andamento']
@@ -522,9 +756,7 @@ class Report():
 
         # Titolo
         ws['A1'] = 'Andamento Del Portafoglio'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
 
         # Aggiunta primo grafico
@@ -620,71 +852,204 @@ class Report():
         # Corpo
         ws['B27'] = '* il rendimento del P. in Strumenti è al netto della commissione di consulenza, degli eventuali prelievi e conferimenti'
         ws['B27'].font = Font(name='Times New Roman', size=11, bold=False, color='31869B')
+        ws['B28'] = '** intermediari della pagina 11, al lordo della commissione e al netto di prelievi e conferimenti'
+        ws['B28'].font = Font(name='Times New Roman', size=11, bold=False, color='31869B')
+
+        # Tabella dei rendimenti ponderati per il tempo e per il denaro, n.d. senza il foglio Movimenti
+        for colonna, valore in ((2, ''), (3, ''), (4, ''), (5, 'Mensile'), (6, 'YTD')):
+            ws.cell(row=29, column=colonna, value=valore).style = INTESTAZIONE
+        ws.merge_cells('B29:D29')
+        righe = (
+            ('Ptf ponderato per il tempo (TWR) **', totale['mese'], totale['ytd']),
+            ('Ptf ponderato per il denaro (MWR) **', totale['mwr_mese'], totale['mwr_ytd']),
+        )
+        for riga, (nome, *valori) in enumerate(righe, start=30):
+            for colonna in (2, 3, 4):
+                ws.cell(row=riga, column=colonna).style = CORPO_NOME
+            ws.cell(row=riga, column=2, value=nome)
+            ws.merge_cells(start_row=riga, end_row=riga, start_column=2, end_column=4)
+            for colonna, valore in enumerate(valori, start=5):
+                cella = ws.cell(row=riga, column=colonna, value='n.d.' if pd.isna(valore) else valore)
+                cella.style = CORPO
+                cella.number_format = FORMAT_PERCENTAGE_00
 
         # Logo
         self.__logo(ws)
 
+    def calcola_analisi_rischio(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Fase di calcolo della pagina del rischio: indicatori di ptf_2007 e, rispetto a ptf_2007, di ogni benchmark
+        sulle finestre di FINESTRE che terminano a t1.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame] -- indicatori del portafoglio (una riga per finestra)
+                e indicatori relativi di ogni benchmark (una riga per benchmark, una colonna per indicatore e finestra)
+        """
+        serie = pd.concat([self.dati['Portafoglio'][['ptf_2007']], self.benchmark()], axis=1, join='inner')
+        tabella = indicatori(serie, 'ptf_2007', self.t1)
+        portafoglio = tabella.loc['ptf_2007'].unstack().reindex(index=list(FINESTRE), columns=list(ASSOLUTI))
+        colonne = [(finestra, indicatore) for indicatore in RELATIVI for finestra in FINESTRE]
+        benchmark = tabella.drop(index='ptf_2007').loc[:, colonne]
+        benchmark.columns = [f'{indicatore} {finestra}' for finestra, indicatore in colonne]
+        return portafoglio, benchmark
+
+    def analisi_rischio(self):
+        """
+        Crea la pagina degli indicatori di rischio, dopo la settima: volatilità, max drawdown e Sharpe del portafoglio,
+        tracking error, information ratio e beta rispetto a ogni benchmark.
+        """
+        portafoglio, benchmark = self.calcolo('analisi_rischio')
+
+        ws = self.wb.create_sheet('7.1.rischio')
+        self.wb.active = ws
+        ws['A6'] = f"Rendimenti mensili di ptf_2007 fino al {self.t1.strftime('%d/%m/%Y')}, indicatori annualizzati"
+        ws['A6'].font = Font(name='Calibri', size=11, bold=True, italic=True, color='31869B')
+        formati = {
+            colonna: FORMAT_PERCENTAGE_00 if colonna.startswith(('Volatilità', 'Max drawdown', 'Tracking error')) else FORMAT_NUMBER_00
+            for colonna in [*portafoglio.columns, *benchmark.columns]
+        }
+        scrivi_tabella(ws, 'Analisi Del Rischio', portafoglio, formati=formati, totali=False)
+        min_row = 8 + 2 + len(portafoglio) + 2
+        scrivi_tabella(ws, None, benchmark, formati=formati, min_row=min_row, totali=False)
+
+        # Logo
+        self.__logo(ws, row=max(34, min_row + 2 + len(benchmark) + 1))
+
+    def __foglio_dati(self, nome: str, df: pd.DataFrame) -> Worksheet:
+        """
+        Crea un foglio nascosto con i dati da cui leggono i grafici: intestazione nella prima riga,
+        indice nella colonna A e dati dalla seconda riga.
+        Le righe sono prodotte direttamente dalle colonne del DataFrame, già nella disposizione finale;
+        i valori mancanti restano celle vuote.
+        Salva in self.righe_mese la riga di ogni valore dell'indice e in self.colonne_dati la colonna di ogni serie.
+
+        Arguments:
+            nome {str} -- nome del foglio
+            df {pd.DataFrame} -- dati da scrivere
+
+        Returns:
+            Worksheet -- foglio creato
+        """
+        ws = self.wb.create_sheet(nome)
+        self.wb.active = ws
+        indice = df.index.tolist()
+        colonne = [serie.astype(object).where(serie.notna(), None).tolist() if serie.hasnans else serie.tolist() for _, serie in df.items()]
+        ws.append([None, *df.columns])
+        for riga in zip(indice, *colonne):
+            ws.append(riga)
+        ws.sheet_state = 'hidden'
+        self.righe_mese[nome] = {valore: riga for riga, valore in enumerate(indice, start=2)}
+        self.colonne_dati[nome] = {colonna: numero for numero, colonna in enumerate(df.columns, start=2)}
+        return ws
+
+    def calcola_caricamento_dati(self) -> tuple[dict, dict]:
+        """
+        Fase di calcolo dei fogli nascosti dei coni: bande dei coni delle probabilità calcolate dal foglio Benchmark,
+        rendimento del portafoglio e dei benchmark, indicizzati per mese ('%m-%Y').
+        Rendimento e volatilità sono stimati dalla storia del benchmark o, se è troppo corta, da quella della serie
+        di riserva di CONI. Un cono che non si può calcolare comunque non blocca gli altri:
+        la sua pagina mostra il motivo al posto del grafico.
+
+        Returns:
+            tuple[dict, dict] -- nome del foglio nascosto -> dati da scrivere e pagina del cono -> errore
+        """
+        benchmark = self.benchmark()
+        coni, errori = [], {}
+        for pagina, (colonna, _, inizio, _, riserva) in CONI.items():
+            try:
+                coni.append(bande(benchmark[colonna], inizio, LIVELLI, None if riserva is None else benchmark[riserva]))
+            except ValueError as errore:
+                errori[pagina] = str(errore)
+        fogli = {'Dati_cono': pd.concat(coni, axis=1).reindex(benchmark.index) if coni else pd.DataFrame(index=benchmark.index)}
+        fogli['Dati_pf'] = self.dati['Portafoglio']
+        fogli['Dati_bk'] = benchmark
+        for df in fogli.values():
+            df.index = pd.to_datetime(df.index, format='%Y-%m-%d %H:%M:%S').strftime('%m-%Y')
+        return fogli, errori
+
     def caricamento_dati(self):
         """
         Aggiunta fogli Cono, Portafoglio e Benchmark, poi nascosti.
+        Per ogni foglio salva in self.righe_mese la riga di ciascun mese ('%m-%Y')
+        e in self.errori_coni i coni che non si possono calcolare.
         """
-        # Carica dati per i coni
-        coni = pd.read_excel(self.file_portafoglio, sheet_name='Cono', index_col=0, header=0)
-        coni.index = pd.to_datetime(coni.index, format='%Y-%m-%d %H:%M:%S').strftime('%m-%Y')
-        # Carica gli scenari per i coni
-        ws_dati_cono = self.wb.create_sheet('Dati_cono')
-        ws_dati_cono = self.wb['Dati_cono']
-        self.wb.active = ws_dati_cono
-        for r in dataframe_to_rows(coni, index=True, header=True):
-            ws_dati_cono.append(r)
-        ws_dati_cono.delete_rows(2)
-        ws_dati_cono.sheet_state = 'hidden'
-
-        # Carica rendimento portafoglio
-        perf_pf = pd.read_excel(self.file_portafoglio, sheet_name='Portafoglio', index_col=0, header=0)
-        perf_pf.index = pd.to_datetime(perf_pf.index, format='%Y-%m-%d %H:%M:%S').strftime('%m-%Y')
-        # Carica perf ptf
-        ws_dati_pf = self.wb.create_sheet('Dati_pf')
-        ws_dati_pf = self.wb['Dati_pf']
-        self.wb.active = ws_dati_pf
-        for r in dataframe_to_rows(perf_pf, index=True, header=True):
-            ws_dati_pf.append(r)
-        ws_dati_pf.delete_rows(2)
-        ws_dati_pf.sheet_state = 'hidden'
+        fogli, self.errori_coni = self.calcolo('caricamento_dati')
+        for foglio, df in fogli.items():
+            self.__foglio_dati(foglio, df)
 
-        # Carica performance benchmark
-        perf_bk = pd.read_excel(self.file_portafoglio, sheet_name='Benchmark', index_col=0, header=0)
-        perf_bk.index = pd.to_datetime(perf_bk.index, format='%Y-%m-%d %H:%M:%S').strftime('%m-%Y')
-        # Carica perf bk
-        ws_dati_bk = self.wb.create_sheet('Dati_bk')
-        ws_dati_bk = self.wb['Dati_bk']
-        self.wb.active = ws_dati_bk
-        for r in dataframe_to_rows(perf_bk, index=True, header=True):
-            ws_dati_bk.append(r)
-        ws_dati_bk.delete_rows(2)
-        ws_dati_bk.sheet_state = 'hidden'
+    def __grafico_cono(self, ws: Worksheet, pagina: str):
+        """
+        Aggiunge il grafico del cono delle probabilità di una pagina: bande del cono, benchmark e portafoglio
+        dalla data di inizio del cono a t1, con il valore finale di ogni serie.
+
+        Arguments:
+            ws {Worksheet} -- foglio della pagina
+            pagina {str} -- pagina, chiave di CONI
+        """
+        if pagina in self.errori_coni:
+            ws['A8'] = f'Cono non disponibile: {self.errori_coni[pagina]}.'
+            ws['A8'].font = Font(name='Times New Roman', size=12, color='FF0000')
+            return
+        benchmark, portafoglio, inizio, minimo, _ = CONI[pagina]
+        ws_dati_cono, ws_dati_bk, ws_dati_pf = (self.wb[nome] for nome in ('Dati_cono', 'Dati_bk', 'Dati_pf'))
+        # Righe dei mesi nei fogli nascosti, indicizzate da caricamento_dati
+        inizio = pd.Timestamp(inizio).strftime('%m-%Y')
+        mese_t1 = self.t1.strftime('%m-%Y')
+        righe_cono, righe_bk, righe_pf = (self.righe_mese[nome] for nome in ('Dati_cono', 'Dati_bk', 'Dati_pf'))
+        ultimo = righe_cono[mese_t1] - righe_cono[inizio] # posizione di t1 nelle serie
+        chart = LineChart()
+
+        # Bande del cono, dalla più bassa alla più alta
+        colori = ('0000FF', 'FF00FF', '000080')
+        for n, nome in enumerate(nomi_bande(benchmark, LIVELLI)):
+            colonna = self.colonne_dati['Dati_cono'][nome]
+            data = Reference(ws_dati_cono, min_col=colonna, min_row=righe_cono[inizio], max_row=righe_cono[mese_t1])
+            chart.add_data(data, titles_from_data=False)
+            s = chart.series[-1]
+            s.tx = SeriesLabel(v=f'Cono {nome.removeprefix(benchmark).strip()}')
+            s.graphicalProperties.line.solidFill = colori[n % len(colori)]
+            s.graphicalProperties.line.width = 12700
+            s.dLbls = DataLabelList()
+            s.dLbls.dLbl.append(DataLabel(dLblPos='t', idx=ultimo, numFmt='0.00', showVal=True))
+
+        # Benchmark e portafoglio: la riga precedente al primo mese fa da titolo della serie
+        for ws_dati, righe, foglio, colonna, colore, posizione in (
+            (ws_dati_bk, righe_bk, 'Dati_bk', benchmark, '177245', 'b'),
+            (ws_dati_pf, righe_pf, 'Dati_pf', portafoglio, 'FF0000', 't'),
+        ):
+            data = Reference(
+                ws_dati, min_col=self.colonne_dati[foglio][colonna], min_row=righe[inizio]-1, max_row=righe[mese_t1]
+            )
+            chart.add_data(data, titles_from_data='False')
+            s = chart.series[-1]
+            s.graphicalProperties.line.solidFill = colore
+            s.graphicalProperties.line.width = 25400
+            s.dLbls = DataLabelList()
+            s.dLbls.dLbl.append(DataLabel(dLblPos=posizione, idx=righe[mese_t1]-righe[inizio], numFmt='0.00', showVal=True))
+
+        dates = Reference(ws_dati_cono, min_col=1, max_col=1, min_row=righe_cono[inizio], max_row=righe_cono[mese_t1])
+        chart.set_categories(dates)
+        chart.legend.layout = Layout(manualLayout=ManualLayout(h=1))
+        size = XDRPositiveSize2D(pixels_to_EMU(812.598), pixels_to_EMU(453.54))
+        cellw = lambda x: cm_to_EMU((x * (18.65-1.71))/10)
+        coloffset2 = cellw(0.1)
+        maker = AnchorMarker(col=0, colOff=coloffset2, row=6, rowOff=0)
+        ancoraggio = OneCellAnchor(_from=maker, ext=size)
+        ws.add_chart(chart)
+        chart.anchor = ancoraggio
+        chart.y_axis.scaling.min = minimo # valore minimo asse y
 
     def cono_8(self):
         """
         Crea l'ottava pagina.
-        Riattiva fogli ws_dati_bk, ws_dati_cono e ws_dati_pf.
         """
-        # Riattiva scenari coni
-        ws_dati_cono = self.wb['Dati_cono']
-        # Riattiva performance ptf
-        ws_dati_pf = self.wb['Dati_pf']
-        # Riattiva performance bk
-        ws_dati_bk = self.wb['Dati_bk']
-
         ws = self.wb.create_sheet('8.cono_1')
         ws = self.wb['8.cono_1']
         self.wb.active = ws
 
         # Titolo
         ws['A1'] = 'Cono Delle Probabilità'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
 
         # Corpo
@@ -694,72 +1059,7 @@ class Report():
         ws.merge_cells('E6:H6')
 
         # Aggiunta grafico
-        chart = LineChart()
-        riga_mese_t1 = lambda x : next(x[row[0].coordinate].row for row in x.iter_rows(min_col=0, max_col=0) if x[row[0].coordinate].value == self.t1.strftime('%m-%Y'))
-        ws_dati_cono_max_row = riga_mese_t1(ws_dati_cono)
-        # for row in ws_dati_cono.iter_rows(min_col=0, max_col=0):
-        #     if ws_dati_cono[row[0].coordinate].value == self.t1.strftime('%m-%Y'):
-        #         print(f"La riga del mese t1 è : {ws_dati_cono[row[0].coordinate].row}.")
-        #         ws_dati_cono_max_row = ws_dati_cono[row[0].coordinate].row
-        data = Reference(ws_dati_cono, min_col=7, max_col=9, min_row=109, max_row=ws_dati_cono_max_row) # hard coding
-        chart.add_data(data, titles_from_data='False')
-        # for row in ws_dati_bk.iter_rows(min_col=0, max_col=0):
-        #     if ws_dati_bk[row[0].coordinate].value == self.t1.strftime('%m-%Y'):
-        #         print(f"La riga del mese t1 è : {ws_dati_bk[row[0].coordinate].row}.")
-        #         ws_dati_bk_max_row = ws_dati_bk[row[0].coordinate].row
-        ws_dati_bk_max_row = riga_mese_t1(ws_dati_bk)
-        data = Reference(ws_dati_bk, min_col=26, min_row=111, max_row=ws_dati_bk_max_row) # hard coding
-        chart.add_data(data, titles_from_data='False')
-        # for row in ws_dati_pf.iter_rows(min_col=0, max_col=0):
-        #     if ws_dati_pf[row[0].coordinate].value == self.t1.strftime('%m-%Y'):
-        #         print(f"La riga del mese t1 è : {ws_dati_pf[row[0].coordinate].row}.")
-        #         ws_dati_pf_max_row = ws_dati_pf[row[0].coordinate].row
-        ws_dati_pf_max_row = riga_mese_t1(ws_dati_pf)
-        data = Reference(ws_dati_pf, min_col=5, min_row=109, max_row=ws_dati_pf_max_row) # hard coding
-        chart.add_data(data, titles_from_data='False')
-
-        s0 = chart.series[0]
-        s0.graphicalProperties.line.solidFill = '0000FF'
-        s0.graphicalProperties.line.width = 12700
-        s0.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_cono_max_row-110, numFmt='0.00', showVal=True)
-        s0.dLbls.dLbl.append(dl)
-        s1 = chart.series[1]
-        s1.graphicalProperties.line.solidFill = 'FF00FF'
-        s1.graphicalProperties.line.width = 12700
-        s1.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_cono_max_row-110, numFmt='0.00', showVal=True)
-        s1.dLbls.dLbl.append(dl)
-        s2 = chart.series[2]
-        s2.graphicalProperties.line.solidFill = '000080'
-        s2.graphicalProperties.line.width = 12700
-        s2.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_cono_max_row-110, numFmt='0.00', showVal=True)
-        s2.dLbls.dLbl.append(dl)
-        s3 = chart.series[3]
-        s3.graphicalProperties.line.solidFill = '177245'
-        s3.graphicalProperties.line.width = 25400
-        s3.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='b', idx=ws_dati_bk_max_row-112, numFmt='0.00', showVal=True)
-        s3.dLbls.dLbl.append(dl)
-        s4 = chart.series[4]
-        s4.graphicalProperties.line.solidFill = 'FF0000'
-        s4.graphicalProperties.line.width = 25400
-        s4.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_pf_max_row-110, numFmt='0.00', showVal=True)
-        s4.dLbls.dLbl.append(dl)
-
-        dates = Reference(ws_dati_cono, min_col=1, max_col=1, min_row=110, max_row=ws_dati_cono_max_row)
-        chart.set_categories(dates)
-        chart.legend.layout = Layout(manualLayout=ManualLayout(h=1))
-        size = XDRPositiveSize2D(pixels_to_EMU(812.598), pixels_to_EMU(453.54))
-        cellw = lambda x: cm_to_EMU((x * (18.65-1.71))/10)
-        coloffset2 = cellw(0.1)
-        maker = AnchorMarker(col=0, colOff=coloffset2, row=6, rowOff=0)
-        ancoraggio = OneCellAnchor(_from=maker, ext=size)
-        ws.add_chart(chart)
-        chart.anchor = ancoraggio
-        chart.y_axis.scaling.min = 95 # valore minimo asse y
+        self.__grafico_cono(ws, 'cono_8')
         ws.row_dimensions[5].height = 11.25
 
         # Logo
@@ -768,24 +1068,14 @@ class Report():
     def cono_9(self):
         """
         Crea la nona pagina.
-        Riattiva fogli ws_dati_bk, ws_dati_cono e ws_dati_pf.
         """
-        # Riattiva scenari coni
-        ws_dati_cono = self.wb['Dati_cono']
-        # Riattiva performance ptf
-        ws_dati_pf = self.wb['Dati_pf']
-        # Riattiva performance bk
-        ws_dati_bk = self.wb['Dati_bk']
-
         ws = self.wb.create_sheet('9.cono_2')
         ws = self.wb['9.cono_2']
         self.wb.active = ws
 
         # Titolo
         ws['A1'] = 'Cono Delle Probabilità'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
 
         # Corpo
@@ -795,72 +1085,7 @@ class Report():
         ws.merge_cells('E6:H6')
 
         # Aggiunta grafico
-        chart = LineChart()
-        riga_mese_t1 = lambda x : next(x[row[0].coordinate].row for row in x.iter_rows(min_col=0, max_col=0) if x[row[0].coordinate].value == self.t1.strftime('%m-%Y'))
-        ws_dati_cono_max_row = riga_mese_t1(ws_dati_cono)
-        # for row in ws_dati_cono.iter_rows(min_col=0, max_col=0):
-        #     if ws_dati_cono[row[0].coordinate].value == self.t1.strftime('%m-%Y'):
-        #         print(f"La riga del mese t1 è : {ws_dati_cono[row[0].coordinate].row}.")
-        #         ws_dati_cono_max_row = ws_dati_cono[row[0].coordinate].row
-        data = Reference(ws_dati_cono, min_col=11, max_col=13, min_row=180, max_row=ws_dati_cono_max_row) # hard coding
-        chart.add_data(data, titles_from_data='False')
-        # for row in ws_dati_bk.iter_rows(min_col=0, max_col=0):
-        #     if ws_dati_bk[row[0].coordinate].value == self.t1.strftime('%m-%Y'):
-        #         print(f"La riga del mese t1 è : {ws_dati_bk[row[0].coordinate].row}.")
-        #         ws_dati_bk_max_row = ws_dati_bk[row[0].coordinate].row
-        ws_dati_bk_max_row = riga_mese_t1(ws_dati_bk)
-        data = Reference(ws_dati_bk, min_col=27, min_row=182, max_row=ws_dati_bk_max_row) # hard coding
-        chart.add_data(data, titles_from_data='False')
-        # for row in ws_dati_pf.iter_rows(min_col=0, max_col=0):
-        #     if ws_dati_pf[row[0].coordinate].value == self.t1.strftime('%m-%Y'):
-        #         print(f"La riga del mese t1 è : {ws_dati_pf[row[0].coordinate].row}.")
-        #         ws_dati_pf_max_row = ws_dati_pf[row[0].coordinate].row
-        ws_dati_pf_max_row = riga_mese_t1(ws_dati_pf)
-        data = Reference(ws_dati_pf, min_col=6, min_row=180, max_row=ws_dati_pf_max_row) # hard coding
-        chart.add_data(data, titles_from_data='False')
-
-        s0 = chart.series[0]
-        s0.graphicalProperties.line.solidFill = '0000FF'
-        s0.graphicalProperties.line.width = 12700
-        s0.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_cono_max_row-181, numFmt='0.00', showVal=True)
-        s0.dLbls.dLbl.append(dl)
-        s1 = chart.series[1]
-        s1.graphicalProperties.line.solidFill = 'FF00FF'
-        s1.graphicalProperties.line.width = 12700
-        s1.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_cono_max_row-181, numFmt='0.00', showVal=True)
-        s1.dLbls.dLbl.append(dl)
-        s2 = chart.series[2]
-        s2.graphicalProperties.line.solidFill = '000080'
-        s2.graphicalProperties.line.width = 12700
-        s2.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_cono_max_row-181, numFmt='0.00', showVal=True)
-        s2.dLbls.dLbl.append(dl)
-        s3 = chart.series[3]
-        s3.graphicalProperties.line.solidFill = '177245'
-        s3.graphicalProperties.line.width = 25400
-        s3.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='b', idx=ws_dati_bk_max_row-183, numFmt='0.00', showVal=True)
-        s3.dLbls.dLbl.append(dl)
-        s4 = chart.series[4]
-        s4.graphicalProperties.line.solidFill = 'FF0000'
-        s4.graphicalProperties.line.width = 25400
-        s4.dLbls = DataLabelList()
-        dl = DataLabel(dLblPos='t', idx=ws_dati_pf_max_row-181, numFmt='0.00', showVal=True)
-        s4.dLbls.dLbl.append(dl)
-
-        dates = Reference(ws_dati_cono, min_col=1, max_col=1, min_row=181, max_row=ws_dati_cono_max_row)
-        chart.set_categories(dates)
-        chart.legend.layout = Layout(manualLayout=ManualLayout(h=1))
-        size = XDRPositiveSize2D(pixels_to_EMU(812.598), pixels_to_EMU(453.54))
-        cellw = lambda x: cm_to_EMU((x * (18.65-1.71))/10)
-        coloffset2 = cellw(0.1)
-        maker = AnchorMarker(col=0, colOff=coloffset2, row=6, rowOff=0)
-        ancoraggio = OneCellAnchor(_from=maker, ext=size)
-        ws.add_chart(chart)
-        chart.anchor = ancoraggio
-        chart.y_axis.scaling.min = 90 # valore minimo asse y
+        self.__grafico_cono(ws, 'cono_9')
         ws.row_dimensions[5].height = 11.25
 
         # Logo
@@ -875,29 +1100,22 @@ class Report():
         self.wb.active = ws
         # Titolo
         ws['A1'] = 'Nuovo Benchmark'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
-        # Corpo
-        body_10_1 = [
-            'Indice MTS BOT', 'Bloomberg Euro Government', 'Bloomberg Euro Corporate Index', 'Bloomberg Pan-European High Yield Index',
-            'Bloomberg Global Aggregate Index', 'MSCI Europa', 'MSCI USA', 'MSCI Pacifico', 'MSCI Emerging Market Free', 
-            'HFRX Absolute Return', 'Bloomberg Commodity Index'
-        ]
-        body_10_2 = ['20,00%', '13,15%', '4,66%', '8,05%', '10,09%', '7,27%', '14,55%', '4,56%', '11,04%', '2,85%', '3,78%']
+        # Corpo: composizione del benchmark, dalla stessa configurazione usata per costruirlo
+        composizione = COMPOSIZIONI[NUOVO_BENCHMARK]
+        body_10_1 = list(composizione['pesi'])
+        body_10_2 = [f'{peso:.2%}'.replace('.', ',') for peso in composizione['pesi'].values()]
         for row in ws.iter_rows(min_row=8, max_row=8+len(body_10_1)-1, min_col=4, max_col=9):
             ws[row[0].coordinate].value = body_10_1[0]
             del body_10_1[0]
-            ws[row[0].coordinate].font = Font(name='Calibri', size=11, bold=True, italic=True, color='000000') 
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='mediumDashDot', color='31869B'))
+            ws[row[0].coordinate].style = COMPOSIZIONE
             ws.merge_cells(start_row=row[0].row, end_row=row[0].row, start_column=row[0].column, end_column=row[4].column)
             ws[row[5].coordinate].value = body_10_2[0]
             del body_10_2[0]
-            ws[row[5].coordinate].font = Font(name='Calibri', size=11, bold=True, italic=True, color='000000') 
-            ws[row[5].coordinate].alignment = Alignment(horizontal='right')
-            ws[row[5].coordinate].border = Border(bottom=Side(border_style='mediumDashDot', color='31869B'))
-        ws['C21'] = '           Benchmark costruito seguendo la composizione del portafoglio al 31/12/2021'
+            ws[row[5].coordinate].style = COMPOSIZIONE_PESO
+        base = pd.Timestamp(composizione['base']).strftime('%d/%m/%Y')
+        ws['C21'] = f'           Benchmark costruito seguendo la composizione del portafoglio al {base}'
         ws['C21'].font = Font(name='Calibri', size=11, bold=True, italic=True, color='31869B') 
         # Logo
         self.__logo(ws)
@@ -906,11 +1124,15 @@ class Report():
         """
         Crea l'undicesima pagina.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
-        # Carica performance posizioni --- dipende da portfolio
-        delta = pd.read_excel(self.file_portafoglio, sheet_name='Delta', index_col=0, header=0)
-        # print(delta)
+        # Performance del mese per intermediario, dal foglio Portfolio e dalle istantanee dei mesi precedenti
+        delta = performance_mese(
+            self.dati['Portfolio'], self.t1, self.istantanee.leggi(), ESCLUSI_PERFORMANCE, self.movimenti(),
+            self.dati['Delta'] if 'Delta' in self.dati else None
+        )
+        if self.salva_istantanee:
+            self.__salva_istantanea(delta)
+        if 'Delta' in self.dati:
+            delta = pd.concat([delta, self.dati['Delta'].reindex(list(VOCI_MANUALI)).dropna(how='all')])
         ws = self.wb.create_sheet('11.perf_mese')
         ws = self.wb['11.perf_mese']
         self.wb.active = ws
@@ -918,9 +1140,7 @@ class Report():
         min_col = 1
         # Titolo
         ws['A1'] = 'Performance Del Mese'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
         min_row += 5
         # Colonne
@@ -929,19 +1149,16 @@ class Report():
         for column in ws.iter_cols(min_col=min_col, max_col=min_col+len_header_11-1, min_row=min_row, max_row=min_row):
             ws[column[0].coordinate].value = header_11[0]
             del header_11[0]
-            ws[column[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[column[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[column[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
+            ws[column[0].coordinate].style = MESE_INTESTAZIONE
+        # Totale complessivo: Δ% e Δ% YTD ponderati per il tempo, seguiti da quelli ponderati per il denaro,
+        # n.d. senza il foglio Movimenti
+        totale = self.__performance_totale()
+        totali = {
+            'Totale Complessivo': (delta[DELTA].sum(), totale['mese'], totale['ytd']),
+            'Totale ponderato per il denaro': (None, totale['mwr_mese'], totale['mwr_ytd']),
+        }
         # Indice
-        intermediari = portfolio.loc[:, 'INTERMEDIARIO'].unique()
-        intermediari = list(intermediari)
-        intermediari.insert(len(intermediari), 'Interessi Phoenix')
-        intermediari.insert(len(intermediari), 'Totale Complessivo')
-        # Rimuovi gli intermediari per cui non calcolo la performance
-        intermediari.remove('Banca Valsabbina Nespoli')
-        intermediari.remove('Crédit Agricole Artes')
-        intermediari.remove('Crédit Agricole B.N.')
-        intermediari.remove('Altro')
+        intermediari = [*delta.index, *totali]
         len_int = len(intermediari)
         # Corpo tabella
         for row in ws.iter_rows(min_col=min_col, max_col=min_col+len_header_11-1, min_row=min_row+1, max_row=min_row+1+len_int-1):
@@ -953,45 +1170,25 @@ class Report():
             ws.column_dimensions[row[2].column_letter].width = 10.5
             ws.column_dimensions[row[3].column_letter].width = 10.5
             ws.row_dimensions[row[0].row].height = 25.50
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-            ws[row[0].coordinate].border = Border(left=Side(border_style='dashed', color='31869B'), bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'))
+            nome = ws[row[0].coordinate].value
+            totale = nome in totali
+            ws[row[0].coordinate].style = MESE_TOTALE_NOME if totale else MESE_NOME
+            if totale:
+                ws[row[1].coordinate].style = MESE_TOTALE_NOME
             ws.merge_cells(start_column=row[0].column, end_column=row[1].column, start_row=row[0].row, end_row=row[0].row)
-            # Corpo tabella
-            ws[row[2].coordinate].border = Border(right=Side(border_style='dashed', color='31869B'), bottom=Side(border_style='dashed', color='31869B'))
-            ws[row[2].coordinate].number_format = '€ #,0'
-            ws[row[2].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[2].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[row[3].coordinate].border = Border(right=Side(border_style='dashed', color='31869B'), bottom=Side(border_style='dashed', color='31869B'))
-            ws[row[3].coordinate].number_format = '€ #,0'
-            ws[row[3].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[3].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[row[4].coordinate].border = Border(right=Side(border_style='dashed', color='31869B'), bottom=Side(border_style='dashed', color='31869B'))
-            ws[row[4].coordinate].number_format = '€ #,0'
-            ws[row[4].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[4].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[row[5].coordinate].border = Border(right=Side(border_style='dashed', color='31869B'), bottom=Side(border_style='dashed', color='31869B'))
-            ws[row[5].coordinate].number_format = FORMAT_PERCENTAGE_00
-            ws[row[5].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[5].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[row[6].coordinate].border = Border(right=Side(border_style='dashed', color='31869B'), bottom=Side(border_style='dashed', color='31869B'))
-            ws[row[6].coordinate].number_format = FORMAT_PERCENTAGE_00
-            ws[row[6].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[6].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            
-            if ws[row[0].coordinate].row != 7+len_int-1:
-                ws[row[2].coordinate].value = delta.loc[ws[row[0].coordinate].value, 'Totale mese passato']
-                ws[row[3].coordinate].value = delta.loc[ws[row[0].coordinate].value, 'Totale mese corrente']
-                ws[row[4].coordinate].value = delta.loc[ws[row[0].coordinate].value, 'Δ']
-                ws[row[5].coordinate].value = delta.loc[ws[row[0].coordinate].value, 'Δ%']
-                ws[row[6].coordinate].value = delta.loc[ws[row[0].coordinate].value, 'Δ% YTD']
+            # Corpo tabella: importi nelle colonne C-E, variazioni percentuali nelle colonne F-G
+            for cella, formato in zip(row[2:7], ['€ #,0'] * 3 + [FORMAT_PERCENTAGE_00] * 2):
+                ws[cella.coordinate].style = MESE_TOTALE if totale else MESE_CORPO
+                ws[cella.coordinate].number_format = formato
+
+            if not totale:
+                for cella, valore in zip(row[2:7], delta.loc[nome]):
+                    ws[cella.coordinate].value = None if pd.isna(valore) else valore # NaN: istantanee mancanti
             else:
-                for _ in range(0, len_header_11):
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                    ws[row[_].coordinate].border = Border(top=Side(border_style='medium', color='31869B'), right=Side(border_style='medium', color='31869B'), left=Side(border_style='medium', color='31869B'), bottom=Side(border_style='medium', color='31869B'))
-                    ws[row[4].coordinate].value = 0
-                    for __ in range(1, len_int): # Somma per tutti i valori nella colonna delta
-                        ws[row[4].coordinate].value = ws[row[4].coordinate].value + ws[row[4].coordinate].offset(row=-__).value
+                risultato, *rendimenti = totali[nome]
+                ws[row[4].coordinate].value = risultato # Somma per tutti i valori nella colonna delta
+                for cella, valore in zip(row[5:7], rendimenti):
+                    ws[cella.coordinate].value = 'n.d.' if pd.isna(valore) else valore
 
         # Textbox
         self.__textbox(ws, min_row, min_row + len_int, 8, 12)
@@ -999,6 +1196,37 @@ class Report():
         # Logo
         self.__logo(ws, colOff=0, row=min_row + len_int + 8)
 
+    def __performance_totale(self) -> dict:
+        """
+        Rendimenti del totale degli intermediari della pagina 11 al netto dei movimenti (performance_totale),
+        tutti NaN se manca il foglio Movimenti.
+
+        Returns:
+            dict -- 'mese', 'ytd', 'mwr_mese' e 'mwr_ytd'
+        """
+        if self.movimenti() is None:
+            return dict.fromkeys(('mese', 'ytd', 'mwr_mese', 'mwr_ytd'), float('nan'))
+        return performance_totale(
+            self.dati['Portfolio'], self.t1, self.istantanee.leggi(), ESCLUSI_PERFORMANCE, self.movimenti()
+        )
+
+    def __salva_istantanea(self, delta: pd.DataFrame):
+        """
+        Salva i totali per intermediario del mese di t1, solo se i dati sono di quel mese (l'ultima data del foglio
+        Portafoglio) e, salvo sovrascrivi_istantanee, se il mese non è già stato salvato.
+
+        Arguments:
+            delta {pd.DataFrame} -- performance del mese per intermediario (performance_mese)
+        """
+        mese = self.t1.strftime('%Y-%m')
+        ultimo = pd.Timestamp(pd.to_datetime(self.dati['Portafoglio'].index).max())
+        if ultimo.strftime('%Y-%m') != mese:
+            print(f"Istantanea del {mese} non salvata: il foglio Portafoglio arriva al {ultimo.strftime('%m/%Y')}.")
+        elif self.istantanee.salva(mese, delta, self.sovrascrivi_istantanee):
+            print(f"Istantanea del {mese} salvata in {self.istantanee.percorso}.")
+        else:
+            print(f"Istantanea del {mese} già salvata, non sovrascritta (--sovrascrivi-istantanee per aggiornarla).")
+
     def tabella_prezzi(self, ws: Worksheet, min_row: int, intermediario: str, strumenti: pd.DataFrame) -> int:
         """Crea una tabella dei prezzi degli strumenti di un intermediario
 
@@ -1016,9 +1244,7 @@ class Report():
         max_col = 12
         # Titolo
         ws.cell(row=min_row, column=min_col, value=intermediario) 
-        ws.cell(row=min_row, column=min_col).alignment = Alignment(horizontal='center', vertical='center')
-        ws.cell(row=min_row, column=min_col).font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws.cell(row=min_row, column=min_col).fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws.cell(row=min_row, column=min_col).style = TITOLO
         ws.merge_cells(start_row=min_row, start_column=min_col, end_row=min_row+3, end_column=max_col)
         min_row += 5
         # Creazione tabella
@@ -1026,9 +1252,7 @@ class Report():
         for column in ws.iter_cols(min_col=min_col, max_col=min_col + len(header) - 1, min_row=min_row, max_row=min_row):
             ws[column[0].coordinate].value = header[0]
             del header[0]
-            ws[column[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF', bold=True)
-            ws[column[0].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[column[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
+            ws[column[0].coordinate].style = PREZZI_INTESTAZIONE
         mid_col = min_col
         ws.merge_cells(start_row=min_row, start_column=mid_col, end_row=min_row+1, end_column=mid_col+4)
         mid_col += 5
@@ -1046,35 +1270,32 @@ class Report():
         mid_col += 1
         ws.merge_cells(start_row=min_row, start_column=mid_col, end_row=min_row+1, end_column=mid_col+1)
         min_row += 2
-        # Corpo tabella
-        prodotti = strumenti['PRODOTTO'].to_list()
-        for row in ws.iter_rows(min_row=min_row, max_row=strumenti.shape[0] + min_row - 1, min_col=1, max_col=12):
-            ws[row[0].coordinate].value = prodotti[0]
-            del prodotti[0]
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=10)
-            ws[row[5].coordinate].value = (strumenti.loc[strumenti['PRODOTTO']==ws[row[0].coordinate].value, 'DIVISA']).values[0]
-            ws[row[5].coordinate].font = Font(name='Times New Roman', size=10)
-            ws[row[5].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[6].coordinate].value = (strumenti.loc[strumenti['PRODOTTO']==ws[row[0].coordinate].value, 'QUANTITA t1']).values[0]
-            ws[row[6].coordinate].font = Font(name='Times New Roman', size=10)
+        # Corpo tabella: una riga per ogni coppia (intermediario, prodotto)
+        indice = indice_strumenti(strumenti)
+        righe = ws.iter_rows(min_row=min_row, max_row=len(indice) + min_row - 1, min_col=1, max_col=12)
+        for row, ((_, prodotto), strumento) in zip(righe, indice.iterrows()):
+            ws[row[0].coordinate].value = prodotto
+            ws[row[0].coordinate].style = PREZZI_CORPO
+            ws[row[5].coordinate].value = strumento['DIVISA']
+            ws[row[5].coordinate].style = PREZZI_CORPO_CENTRATO
+            ws[row[6].coordinate].value = strumento['QUANTITA t1']
+            ws[row[6].coordinate].style = PREZZI_CORPO
             ws[row[6].coordinate].number_format = '#,##0.00'
-            ws[row[7].coordinate].value = (strumenti.loc[strumenti['PRODOTTO']==ws[row[0].coordinate].value, 'prezzo_di_carico']).values[0]
-            ws[row[7].coordinate].font = Font(name='Times New Roman', size=10)
+            ws[row[7].coordinate].value = strumento['prezzo_di_carico']
+            ws[row[7].coordinate].style = PREZZI_CORPO
             ws[row[7].coordinate].number_format = FORMAT_NUMBER_00
-            ws[row[8].coordinate].value = (strumenti.loc[strumenti['PRODOTTO']==ws[row[0].coordinate].value, 'PREZZO t1']).values[0]
-            ws[row[8].coordinate].font = Font(name='Times New Roman', size=10)
+            ws[row[8].coordinate].value = strumento['PREZZO t1']
+            ws[row[8].coordinate].style = PREZZI_CORPO
             ws[row[8].coordinate].number_format = FORMAT_NUMBER_00
             ws[row[9].coordinate].value = (ws[row[8].coordinate].value / ws[row[7].coordinate].value) - 1
-            ws[row[9].coordinate].font = Font(name='Times New Roman', size=10)
-            ws[row[9].coordinate].alignment = Alignment(horizontal='center')
+            ws[row[9].coordinate].style = PREZZI_CORPO_CENTRATO
             ws[row[9].coordinate].number_format = FORMAT_PERCENTAGE_00
-            ws[row[10].coordinate].value = (strumenti.loc[strumenti['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t1']).values[0]
-            ws[row[10].coordinate].font = Font(name='Times New Roman', size=10)
-            ws[row[10].coordinate].alignment = Alignment(horizontal='center')
+            ws[row[10].coordinate].value = strumento['TOTALE t1']
+            ws[row[10].coordinate].style = PREZZI_CORPO_CENTRATO
             ws[row[10].coordinate].number_format = '€ #,##0.00'
             ws.merge_cells(start_row=row[0].row, end_row=row[0].row, start_column=row[0].column, end_column=row[4].column)
             ws.merge_cells(start_row=row[0].row, end_row=row[0].row, start_column=row[10].column, end_column=row[11].column)
-        min_row += strumenti.shape[0]
+        min_row += len(indice)
         return min_row + 2
 
     def prezzi_12(self):
@@ -1083,7 +1304,7 @@ class Report():
         Strumenti di Banca Patrimoni e Banca Valsabbina Artes
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
         # Crea foglio
         ws = self.wb.create_sheet('12.prezzi')
         ws = self.wb['12.prezzi']
@@ -1113,7 +1334,7 @@ class Report():
         Strumenti di Corner.
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
         # Crea foglio
         ws = self.wb.create_sheet('13.prezzi')
         ws = self.wb['13.prezzi']
@@ -1136,7 +1357,7 @@ class Report():
         Strumenti di Mediobanca e Mediolanum
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
         # Crea foglio
         ws = self.wb.create_sheet('14.prezzi')
         ws = self.wb['14.prezzi']
@@ -1169,9 +1390,7 @@ class Report():
         self.wb.active = ws
 
         ws['A1'] = 'Attività Svolte Ed In Corso'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
 
         # Text box
@@ -1195,12 +1414,25 @@ class Report():
 
         self.__logo(ws)
 
+    def calcola_sintesi_17(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della diciassettesima pagina: controvalori per categoria e intermediario.
+
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        # Controvalori per categoria e intermediario, con i totali
+        tabella = pivot(portfolio, 'CATEGORIA', 'INTERMEDIARIO')
+        return tabella
+
     def sintesi_17(self):
         """
         Crea la diciasettesima pagina.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        tabella = self.calcolo('sintesi_17')
 
         ws = self.wb.create_sheet('17.sintesi')
         ws = self.wb['17.sintesi']
@@ -1216,9 +1448,7 @@ class Report():
 
         # Titolo
         ws['A1'] = 'Sintesi'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         if len(list(portfolio['INTERMEDIARIO'].unique())) == 1:
             lunghezza_titolo_17 = 12
             min_col = 4
@@ -1248,10 +1478,7 @@ class Report():
         for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_17 - 1):
             ws[col[0].coordinate].value = header_17[0]
             del header_17[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
+            ws[col[0].coordinate].style = INTESTAZIONE
             ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
             ws.row_dimensions[col[0].row].height = 20
             ws.row_dimensions[col[1].row].height = 20
@@ -1278,16 +1505,12 @@ class Report():
                 #ws[row[0].coordinate].value = tipo_strumento_dict[tipo_strumento[0]]
                 ws[row[0].coordinate].value = tipo_strumento[0] # carica i tipi di strumenti nell'indice
                 del tipo_strumento[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[0].coordinate].style = CORPO_NOME
                 ws.row_dimensions[row[0].row].height = 19
-                #print(ws[row[1].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) # mostra sempre l'intermediario
+                valori = tabella.loc[ws[row[0].coordinate].value]
                 for _ in range(1, num_intermediari+1):
-                    ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['CATEGORIA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['CATEGORIA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                    ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                    ws[row[_].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                    ws[row[_].coordinate].value = valori.iat[_-1] if valori.iat[_-1] != 0 else ''
+                    ws[row[_].coordinate].style = CORPO
                     ws[row[_].coordinate].number_format = '#,0'
                     # somma=[]
                     # somma.append(ws[row[_].coordinate].value)
@@ -1307,15 +1530,11 @@ class Report():
                     # if float(ws[row[_].coordinate].value) != ''
                 #ws[row[num_intermediari+2].coordinate].value = '=SUM('+str(ws[row[1].coordinate])+':'+str(ws[row[num_intermediari].coordinate])+')'
                 # Somma per strumenti
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[portfolio['CATEGORIA']==ws[row[0].coordinate].value, 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+1].coordinate].value = valori[TOTALE_T1]
+                ws[row[num_intermediari+1].coordinate].style = CORPO
                 ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[portfolio['CATEGORIA']==ws[row[0].coordinate].value, 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+2].coordinate].value = valori[TOTALE_T0]
+                ws[row[num_intermediari+2].coordinate].style = CORPO
                 ws[row[num_intermediari+2].coordinate].number_format = '#,0'
 
                 ws[row[0].coordinate].value = tipo_strumento_dict[ws[row[0].coordinate].value] # aggiorna valori dell'indice con i nomi nel dizionario
@@ -1325,28 +1544,36 @@ class Report():
         # Somma per intermediari
         for row in ws.iter_rows(min_row=10 + len_tipo_strumento, max_row=10 + len_tipo_strumento, min_col=min_col, max_col=min_col + len_header_17):
             ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+            ws[row[0].coordinate].style = SOMMA_NOME
             ws.row_dimensions[row[0].row].height = 19
             #print(ws.cell(row=row[1].row, column=row[1].column).offset(row=-len_tipo_strumento))
             for _ in range(1,len_header_17-2):
-                ws[row[_].coordinate].value = portfolio.loc[portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_tipo_strumento-2).value, 'TOTALE t1'].sum()
-                # assert ws[row[_].coordinate].value == 'SUM(B10:B17)'
-            ws[row[len_header_17-2].coordinate].value = portfolio.loc[:, 'TOTALE t1'].sum()
-            ws[row[len_header_17-1].coordinate].value = portfolio.loc[:, 'TOTALE t0'].sum()
+                ws[row[_].coordinate].value = tabella.loc[TOTALE].iat[_-1]
+            ws[row[len_header_17-2].coordinate].value = tabella.at[TOTALE, TOTALE_T1]
+            ws[row[len_header_17-1].coordinate].value = tabella.at[TOTALE, TOTALE_T0]
             for _ in range(1,len_header_17):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+                ws[row[_].coordinate].style = SOMMA
                 ws[row[_].coordinate].number_format = '#,0'
 
+    def calcola_valuta_18(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della diciottesima pagina: controvalori per divisa e intermediario.
+
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        # Controvalori per divisa e intermediario, con i totali
+        tabella = pivot(portfolio, 'DIVISA', 'INTERMEDIARIO')
+        return tabella
+
     def valuta_18(self):
         """
         Crea la diciottesima pagina.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        tabella = self.calcolo('valuta_18')
 
         ws = self.wb.create_sheet('18.valuta')
         ws = self.wb['18.valuta']
@@ -1360,9 +1587,7 @@ class Report():
 
         # Titolo
         ws['A1'] = 'Valuta'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         if len(list(portfolio['INTERMEDIARIO'].unique())) == 1:
             lunghezza_titolo_18 = 12
             min_col = 4
@@ -1392,10 +1617,7 @@ class Report():
         for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_18 - 1):
             ws[col[0].coordinate].value = header_18[0]
             del header_18[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
+            ws[col[0].coordinate].style = INTESTAZIONE
             ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
             ws.row_dimensions[col[0].row].height = 20
             ws.row_dimensions[col[1].row].height = 20
@@ -1412,26 +1634,19 @@ class Report():
             if row[0].row > 9:
                 ws[row[0].coordinate].value = tipo_divisa[0]
                 del tipo_divisa[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[0].coordinate].style = CORPO_NOME
                 ws.row_dimensions[row[0].row].height = 19
+                valori = tabella.loc[ws[row[0].coordinate].value]
                 for _ in range(1, num_intermediari+1):
-                    ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['DIVISA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['DIVISA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                    ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                    ws[row[_].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                    ws[row[_].coordinate].value = valori.iat[_-1] if valori.iat[_-1] != 0 else ''
+                    ws[row[_].coordinate].style = CORPO
                     ws[row[_].coordinate].number_format = '#,0'
 
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[portfolio['DIVISA']==ws[row[0].coordinate].value, 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+1].coordinate].value = valori[TOTALE_T1]
+                ws[row[num_intermediari+1].coordinate].style = CORPO
                 ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[portfolio['DIVISA']==ws[row[0].coordinate].value, 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+2].coordinate].value = valori[TOTALE_T0]
+                ws[row[num_intermediari+2].coordinate].style = CORPO
                 ws[row[num_intermediari+2].coordinate].number_format = '#,0'
 
                 #ws[row[0].coordinate].value = tipo_divisa_dict[ws[row[0].coordinate].value] # aggiorna valori dell'indice con i nomi nel dizionario
@@ -1442,610 +1657,181 @@ class Report():
         # Somma per intermediari
         for row in ws.iter_rows(min_row=10 + len_tipo_divisa, max_row=10 + len_tipo_divisa, min_col=min_col, max_col=min_col + len_header_18):
             ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+            ws[row[0].coordinate].style = SOMMA_NOME
             ws.row_dimensions[row[0].row].height = 19
             for _ in range(1,len_header_18-2):
-                ws[row[_].coordinate].value = portfolio.loc[portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_tipo_divisa-2).value, 'TOTALE t1'].sum()
-            ws[row[len_header_18-2].coordinate].value = portfolio.loc[:, 'TOTALE t1'].sum()
-            ws[row[len_header_18-1].coordinate].value = portfolio.loc[:, 'TOTALE t0'].sum()
+                ws[row[_].coordinate].value = tabella.loc[TOTALE].iat[_-1]
+            ws[row[len_header_18-2].coordinate].value = tabella.at[TOTALE, TOTALE_T1]
+            ws[row[len_header_18-1].coordinate].value = tabella.at[TOTALE, TOTALE_T0]
             for _ in range(1,len_header_18):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+                ws[row[_].coordinate].style = SOMMA
                 ws[row[_].coordinate].number_format = '#,0'
 
-    def tabella_pivot_azioni(self):
-        """
-        Crea la tabella pivot delle azioni.
+    def __tabella_pivot(self, foglio: str, titolo: str, tabella: pd.DataFrame, formati: dict | None = None,
+        margine: float = 2.5, nascondi_zeri: bool = False):
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        Crea una pagina con la tabella per intermediario di una classe di strumenti.
 
-        ws = self.wb.create_sheet('19.azioni')
-        ws = self.wb['19.azioni']
+        Arguments:
+            foglio {str} -- nome del foglio
+            titolo {str} -- titolo della pagina
+            tabella {pd.DataFrame} -- tabella costruita con pivot(), con eventuali colonne aggiuntive dopo i totali
+
+        Keyword Arguments:
+            formati {dict | None} -- formato numerico delle colonne diverse da '#,0' (default: {None})
+            margine {float} -- spazio aggiunto alla larghezza della colonna dei nomi (default: {2.5})
+            nascondi_zeri {bool} -- lascia vuote le celle degli intermediari con controvalore nullo (default: {False})
+        """
+        ws = self.wb.create_sheet(foglio)
         self.wb.active = ws
+        intermediari = tabella.columns.get_loc(TOTALE_T1)
+        if nascondi_zeri:
+            corpo = tabella.iloc[:-1, :intermediari]
+            tabella = tabella.astype(object)
+            tabella.iloc[:-1, :intermediari] = corpo.where(corpo != 0, '')
+        tabella = tabella.rename(columns={
+            TOTALE_T1: 'Totale ' + self.mesi_dict[self.t1.month], TOTALE_T0: 'Totale ' + self.mesi_dict[self.t0_1m.month]
+        })
+        min_col, larghezza_titolo = impaginazione(intermediari, len(tabella.columns) + 1)
+        scrivi_tabella(
+            ws, titolo, tabella, min_col=min_col, larghezza_titolo=larghezza_titolo, formati=formati, margine=margine
+        )
 
-        # Inizializza variabili
-        min_row = 1
+    def calcola_tabella_pivot_azioni(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della tabella delle azioni: controvalori per prodotto e intermediario e variazione dei prezzi.
+
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
         ptf_equity = portfolio.loc[portfolio['CATEGORIA']=='EQUITY']
-        banks = ptf_equity['INTERMEDIARIO'].unique()
-        count_banks = banks.size
-        dict_equity = ptf_equity.to_dict('list')
-        
-        # Creazione tabella #
-        
-        # Colonne
-        header = banks.tolist()
-        header.insert(0, '')
-        header.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
 
-        # Titolo
-        ws['A1'] = 'Azioni'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        match count_banks:
-            case 1:
-                lunghezza_titolo = 12
-                min_col = 4
-            case 2:
-                lunghezza_titolo = 12
-                min_col = 4
-            case 3:
-                lunghezza_titolo = 12
-                min_col = 3
-            case 4:
-                lunghezza_titolo = 12
-                min_col = 3
-            case 5:
-                lunghezza_titolo = 12
-                min_col = 2
-            case 6:
-                lunghezza_titolo = 12
-                min_col = 2
-            case 7:
-                lunghezza_titolo = 12
-                min_col = 1
-            case _:
-                lunghezza_titolo = len(header)
-                min_col = 1
-        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=lunghezza_titolo)
-        min_row += 7
+        # una riga per prodotto, anche se detenuto presso più intermediari
+        tabella = pivot(ptf_equity, 'PRODOTTO', 'INTERMEDIARIO', riempimento='')
+        # delta mensile dei prezzi degli strumenti in euro,
+        # tranne quando il prodotto è stato liquidato in t1 o non esisteva in t0
+        delta = variazione_prezzi(ptf_equity)
+        tabella['Delta'] = delta.astype(object).where(delta.notna(), '/')
+        # delta mensile complessivo
+        ptf_equity_not_null = ptf_equity.loc[(ptf_equity['TOTALE t1']!=0) & (ptf_equity['TOTALE t0']!=0)]
+        tabella.at[TOTALE, 'Delta'] = (
+            # somma dei controvalori t1 ottenuti con quantità vecchie
+            (
+                # prezzi nuovi in euro
+                (ptf_equity_not_null['PREZZO t1'] * ptf_equity_not_null['CAMBIO t1'])
+                # moltiplicati per le quantità vecchie
+                *
+                ptf_equity_not_null['QUANTITA t0']
+            ).sum()
+            # divisi per la somma dei controvalori t0 con quantità vecchie
+            /
+            (
+                # prezzi vecchi in euro
+                (ptf_equity_not_null['PREZZO t0'] * ptf_equity_not_null['CAMBIO t0'])
+                # moltiplicati per le quantità vecchie
+                *
+                ptf_equity_not_null['QUANTITA t0']
+            ).sum()
+        ) - 1
+        return tabella
 
-        # Intestazione
-        for col in ws.iter_cols(min_row=min_row, max_row=min_row + 1, min_col=min_col, max_col=min_col + len(header) - 1):
-            ws[col[0].coordinate].value = header[col[0].column-min_col]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(
-                right=Side(border_style='thin', color='31869B'),
-                left=Side(border_style='thin', color='31869B')
-            )
-            ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
-            ws.row_dimensions[col[0].row].height = 20
-            ws.row_dimensions[col[1].row].height = 20
-            ws.column_dimensions[col[0].column_letter].width = 12
-        min_row += 2
-
-        # Corpo
-        count_equity = len(dict_equity['PRODOTTO'])
-        columns_length = []
-        for row in ws.iter_rows(min_row=min_row, max_row=min_row + count_equity - 1, min_col=min_col, max_col=min_col + len(header)):
-            # nome strumento
-            ws[row[0].coordinate].value = dict_equity['PRODOTTO'][row[0].row-min_row]
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-            ws[row[0].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            # controvalore strumento aggiunto per riga
-            for _ in range(1, count_banks+1):
-                row_offset = -2-(row[0].row-min_row)
-                ctv_t1 = ptf_equity.loc[
-                    (ptf_equity['INTERMEDIARIO']==ws[row[_].offset(column=0, row=row_offset).coordinate].value) &
-                    (ptf_equity['PRODOTTO']==ws[row[0].coordinate].value),
-                    'TOTALE t1'
-                ]
-                if not ctv_t1.empty:
-                    ws[row[_].coordinate].value = ctv_t1.values[0]
-                else:
-                    ws[row[_].coordinate].value = ''
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[_].coordinate].border = Border(
-                    bottom=Side(border_style='dashed', color='31869B'),
-                    right=Side(border_style='dashed', color='31869B'),
-                    left=Side(border_style='dashed', color='31869B')
-                )
-                ws[row[_].coordinate].number_format = '#,0'
-            # totale t1
-            ws[row[count_banks+1].coordinate].value = dict_equity['TOTALE t1'][row[0].row-min_row]
-            ws[row[count_banks+1].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+1].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+1].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+1].coordinate].number_format = '#,0'
-            # totale t0
-            ws[row[count_banks+2].coordinate].value = dict_equity['TOTALE t0'][row[0].row-min_row]
-            ws[row[count_banks+2].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+2].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+2].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+2].coordinate].number_format = '#,0'
-            # calcolo del delta mensile dei prezzi degli strumenti in euro,
-            # tranne quando il prodotto è stato liquidato in t1 o non esisteva in t0
-            if ws[row[count_banks+1].coordinate].value != 0 and ws[row[count_banks+2].coordinate].value != 0:
-                ws[row[count_banks+3].coordinate].value = (
-                    (
-                        (dict_equity['PREZZO t1'][row[0].row-min_row] * dict_equity['CAMBIO t1'][row[0].row-min_row])
-                        - (dict_equity['PREZZO t0'][row[0].row-min_row]* dict_equity['CAMBIO t0'][row[0].row-min_row])
-                    )
-                    /
-                    (dict_equity['PREZZO t0'][row[0].row-min_row] * dict_equity['CAMBIO t0'][row[0].row-min_row])
-                )
-            else:
-                ws[row[count_banks+3].coordinate].value = '/'
-            ws[row[count_banks+3].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+3].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+3].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+3].coordinate].number_format = FORMAT_PERCENTAGE_00
+    def tabella_pivot_azioni(self):
+        """
+        Crea la tabella pivot delle azioni.
+        """
+        tabella = self.calcolo('tabella_pivot_azioni')
 
-            columns_length.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
-            ws.column_dimensions[row[0].column_letter].width = max(columns_length) + 2.5 # modifica larghezza colonna
+        self.__tabella_pivot('19.azioni', 'Azioni', tabella, formati={'Delta': FORMAT_PERCENTAGE_00})
 
-        # Somma per intermediari
-        for row in ws.iter_rows(min_row=min_row + count_equity, max_row=min_row + count_equity, min_col=min_col, max_col=min_col + len(header)):
-            ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(
-                bottom=Side(border_style='thin', color='31869B'),
-                right=Side(border_style='thin', color='31869B'),
-                left=Side(border_style='thin', color='31869B'),
-                top=Side(border_style='thin', color='31869B')
-            )
-            for _ in range(1, len(header)-3):
-                ws[row[_].coordinate].value = ptf_equity.loc[
-                    ptf_equity['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-count_equity-2).value,
-                    'TOTALE t1'
-                ].sum()
-            ws[row[len(header)-3].coordinate].value = ptf_equity['TOTALE t1'].sum()
-            ws[row[len(header)-2].coordinate].value = ptf_equity['TOTALE t0'].sum()
-            # delta mensile complessivo
-            ptf_equity_not_null = ptf_equity.loc[(ptf_equity['TOTALE t1']!=0) & (ptf_equity['TOTALE t0']!=0)]
-
-            ws[row[len(header)-1].coordinate].value = (
-                # somma dei controvalori t1 ottenuti con quantità vecchie
-                (
-                    # prezzi nuovi in euro
-                    (ptf_equity_not_null['PREZZO t1'] * ptf_equity_not_null['CAMBIO t1'])
-                    # moltiplicati per le quantità vecchie
-                    *
-                    ptf_equity_not_null['QUANTITA t0']
-                ).sum()
-                # divisi per la somma dei controvalori t0 con quantità vecchie
-                /
-                (
-                    # prezzi vecchi in euro
-                    (ptf_equity_not_null['PREZZO t0'] * ptf_equity_not_null['CAMBIO t0'])
-                    # moltiplicati per le quantità vecchie
-                    *
-                    ptf_equity_not_null['QUANTITA t0']
-                ).sum()
-            ) - 1
-
-            for _ in range(1, len(header)):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(
-                    bottom=Side(border_style='thin', color='31869B'),
-                    right=Side(border_style='thin', color='31869B'),
-                    left=Side(border_style='thin', color='31869B'),
-                    top=Side(border_style='thin', color='31869B'))
-                ws[row[_].coordinate].number_format = '#,0'
-            ws[row[len(header)-1].coordinate].number_format = FORMAT_PERCENTAGE_00
 
-    def tabella_pivot_obbligazioni_governative(self):
+    def calcola_tabella_pivot_obbligazioni_governative(self) -> pd.DataFrame:
         """
-        Crea la tabella pivot delle obbligazioni governative.
+        Fase di calcolo della tabella delle obbligazioni governative: controvalori per prodotto e intermediario e variazione dei prezzi.
+
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        ptf_gov_bond = portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND']
 
-        ws = self.wb.create_sheet('20.obb_gov')
-        ws = self.wb['20.obb_gov']
-        self.wb.active = ws
+        # una riga per prodotto, anche se detenuto presso più intermediari
+        tabella = pivot(ptf_gov_bond, 'PRODOTTO', 'INTERMEDIARIO', riempimento='')
+        # delta mensile dei prezzi degli strumenti in euro,
+        # tranne quando il prodotto è stato liquidato in t1 o non esisteva in t0
+        delta = variazione_prezzi(ptf_gov_bond)
+        tabella['Delta'] = delta.astype(object).where(delta.notna(), '/')
+        # delta mensile complessivo delle posizioni presenti sia in t0 che in t1
+        tabella.at[TOTALE, 'Delta'] = (
+            ptf_gov_bond.loc[ptf_gov_bond['TOTALE t0']!=0, 'TOTALE t1'].sum() - ptf_gov_bond.loc[ptf_gov_bond['TOTALE t1']!=0, 'TOTALE t0'].sum()
+        ) / ptf_gov_bond.loc[ptf_gov_bond['TOTALE t1']!=0, 'TOTALE t0'].sum()
+        return tabella
 
-        # Inizializza variabili
-        min_row = 1
-        ptf_gov_bond = portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND']
-        banks = ptf_gov_bond['INTERMEDIARIO'].unique()
-        count_banks = banks.size
-        dict_gov_bond = ptf_gov_bond.to_dict('list')
+    def tabella_pivot_obbligazioni_governative(self):
+        """
+        Crea la tabella pivot delle obbligazioni governative.
+        """
+        tabella = self.calcolo('tabella_pivot_obbligazioni_governative')
 
-        # Creazione tabella #
-        
-        # Colonne
-        header = banks.tolist()
-        header.insert(0, '')
-        header.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
-
-        # Creazione tabella # TODO da togliere
-        header_20 = list(portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND','INTERMEDIARIO'].unique())
-        header_20.insert(0, '')
-        header_20.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
-        len_header_20 = len(header_20)
-
-        ws['A1'] = 'Obbligazioni Governative'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        match count_banks:
-            case 1:
-                lunghezza_titolo = 12
-                min_col = 4
-            case 2:
-                lunghezza_titolo = 12
-                min_col = 4
-            case 3:
-                lunghezza_titolo = 12
-                min_col = 3
-            case 4:
-                lunghezza_titolo = 12
-                min_col = 3
-            case 5:
-                lunghezza_titolo = 12
-                min_col = 2
-            case 6:
-                lunghezza_titolo = 12
-                min_col = 2
-            case 7:
-                lunghezza_titolo = 12
-                min_col = 1
-            case _:
-                lunghezza_titolo = len(header)
-                min_col = 1
-        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=lunghezza_titolo)
-        min_row += 7
+        self.__tabella_pivot('20.obb_gov', 'Obbligazioni Governative', tabella, formati={'Delta': FORMAT_PERCENTAGE_00})
 
-        # Intestazione
-        for col in ws.iter_cols(min_row=min_row, max_row=min_row + 1, min_col=min_col, max_col=min_col + len(header) - 1):
-            ws[col[0].coordinate].value = header[col[0].column-min_col]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(
-                right=Side(border_style='thin', color='31869B'),
-                left=Side(border_style='thin', color='31869B')
-            )
-            ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
-            ws.row_dimensions[col[0].row].height = 20
-            ws.row_dimensions[col[1].row].height = 20
-            ws.column_dimensions[col[0].column_letter].width = 12
-        min_row += 2
 
-        # Corpo
-        count_gov_bond = len(dict_gov_bond['PRODOTTO'])
-        columns_length = []
-        nome_obbgov = list(portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND','PRODOTTO'])
-        len_nome_obbgov = len(nome_obbgov)
-        num_intermediari = len(portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND', 'INTERMEDIARIO'].unique())
-        for row in ws.iter_rows(min_row=min_row, max_row=min_row + count_gov_bond - 1, min_col=min_col, max_col=min_col + len(header)):
-            # nome strumento
-            ws[row[0].coordinate].value = dict_gov_bond['PRODOTTO'][row[0].row-min_row]
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-            ws[row[0].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            # controvalore strumento aggiunto per riga
-            for _ in range(1, count_banks+1):
-                row_offset = -2-(row[0].row-min_row)
-                ctv_t1 = ptf_gov_bond.loc[
-                    (ptf_gov_bond['INTERMEDIARIO']==ws[row[_].offset(column=0, row=row_offset).coordinate].value) &
-                    (ptf_gov_bond['PRODOTTO']==ws[row[0].coordinate].value),
-                    'TOTALE t1'
-                ]
-                if not ctv_t1.empty:
-                    ws[row[_].coordinate].value = ctv_t1.values[0]
-                else:
-                    ws[row[_].coordinate].value = ''
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[_].coordinate].border = Border(
-                    bottom=Side(border_style='dashed', color='31869B'),
-                    right=Side(border_style='dashed', color='31869B'),
-                    left=Side(border_style='dashed', color='31869B')
-                )
-                ws[row[_].coordinate].number_format = '#,0'
-            # totale t1
-            ws[row[count_banks+1].coordinate].value = dict_gov_bond['TOTALE t1'][row[0].row-min_row]
-            ws[row[count_banks+1].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+1].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+1].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+1].coordinate].number_format = '#,0'
-            # totale t0
-            ws[row[count_banks+2].coordinate].value = dict_gov_bond['TOTALE t0'][row[0].row-min_row]
-            ws[row[count_banks+2].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+2].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+2].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+2].coordinate].number_format = '#,0'
-            # calcolo del delta mensile dei prezzi degli strumenti in euro,
-            # tranne quando il prodotto è stato liquidato in t1 o non esisteva in t0
-            if ws[row[count_banks+1].coordinate].value != 0 and ws[row[count_banks+2].coordinate].value != 0:
-                ws[row[count_banks+3].coordinate].value = (
-                    (
-                        (dict_gov_bond['PREZZO t1'][row[0].row-min_row] * dict_gov_bond['CAMBIO t1'][row[0].row-min_row])
-                        - (dict_gov_bond['PREZZO t0'][row[0].row-min_row]* dict_gov_bond['CAMBIO t0'][row[0].row-min_row])
-                    )
-                    /
-                    (dict_gov_bond['PREZZO t0'][row[0].row-min_row] * dict_gov_bond['CAMBIO t0'][row[0].row-min_row])
-                )
-            else:
-                ws[row[count_banks+3].coordinate].value = '/'
-            ws[row[count_banks+3].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+3].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+3].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+3].coordinate].number_format = FORMAT_PERCENTAGE_00
+    def calcola_tabella_pivot_obbligazioni_societarie(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della tabella delle obbligazioni societarie: controvalori per prodotto e intermediario e variazione dei prezzi.
 
-            columns_length.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
-            ws.column_dimensions[row[0].column_letter].width = max(columns_length) + 2.5 # modifica larghezza colonna FALLO ALLA FINE
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        ptf_corp_bond = portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND']
 
-        # Somma per intermediari
-        for row in ws.iter_rows(min_row=min_row + count_gov_bond, max_row=min_row + count_gov_bond, min_col=min_col, max_col=min_col + len(header)):
-            ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(
-                bottom=Side(border_style='thin', color='31869B'),
-                right=Side(border_style='thin', color='31869B'),
-                left=Side(border_style='thin', color='31869B'),
-                top=Side(border_style='thin', color='31869B')
-            )
-            for _ in range(1, len(header)-3):
-                # TODO: da qui!
-                ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_nome_obbgov-2).value) & (portfolio['CATEGORIA']=='GOVERNMENT_BOND'), 'TOTALE t1'].sum()
-            ws[row[len_header_20-3].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND', 'TOTALE t1'].sum()
-            ws[row[len_header_20-2].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND', 'TOTALE t0'].sum()
-            ws[row[len_header_20-1].coordinate].value = (portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') & (portfolio['TOTALE t0']!=0), 'TOTALE t1'].sum() - portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()) / portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()
-            
-            for _ in range(1, len(header)):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(
-                    bottom=Side(border_style='thin', color='31869B'),
-                    right=Side(border_style='thin', color='31869B'),
-                    left=Side(border_style='thin', color='31869B'),
-                    top=Side(border_style='thin', color='31869B')
-                )
-                ws[row[_].coordinate].number_format = '#,0'
-            ws[row[len(header)-1].coordinate].number_format = FORMAT_PERCENTAGE_00
+        # una riga per prodotto, anche se detenuto presso più intermediari
+        tabella = pivot(ptf_corp_bond, 'PRODOTTO', 'INTERMEDIARIO', riempimento='')
+        # delta mensile dei prezzi degli strumenti in euro,
+        # tranne quando il prodotto è stato liquidato in t1 o non esisteva in t0
+        delta = variazione_prezzi(ptf_corp_bond)
+        tabella['Delta'] = delta.astype(object).where(delta.notna(), '/')
+        # delta mensile complessivo delle posizioni presenti sia in t0 che in t1
+        tabella.at[TOTALE, 'Delta'] = (
+            ptf_corp_bond.loc[ptf_corp_bond['TOTALE t0']!=0, 'TOTALE t1'].sum() - ptf_corp_bond.loc[ptf_corp_bond['TOTALE t1']!=0, 'TOTALE t0'].sum()
+        ) / ptf_corp_bond.loc[ptf_corp_bond['TOTALE t1']!=0, 'TOTALE t0'].sum()
+        return tabella
 
     def tabella_pivot_obbligazioni_societarie(self):
         """
         Crea la tabella pivot delle obbligazioni societarie.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
-
-        ws = self.wb.create_sheet('21.obb_cor')
-        ws = self.wb['21.obb_cor']
-        self.wb.active = ws
+        tabella = self.calcolo('tabella_pivot_obbligazioni_societarie')
 
-        # Inizializza variabili
-        min_row = 1
-        ptf_corp_bond = portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND']
-        banks = ptf_corp_bond['INTERMEDIARIO'].unique()
-        count_banks = banks.size
-        dict_corp_bond = ptf_corp_bond.to_dict('list')
-
-        # Creazione tabella #
-        
-        # Colonne
-        header = banks.tolist()
-        header.insert(0, '')
-        header.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
-
-        # Creazione tabella # TODO da togliere
-        header_21 = list(portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND','INTERMEDIARIO'].unique())
-        header_21.insert(0, '')
-        header_21.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
-        len_header_21 = len(header_21)
-
-        ws['A1'] = 'Obbligazioni Corporate'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        match count_banks:
-            case 1:
-                lunghezza_titolo = 12
-                min_col = 4
-            case 2:
-                lunghezza_titolo = 12
-                min_col = 4
-            case 3:
-                lunghezza_titolo = 12
-                min_col = 3
-            case 4:
-                lunghezza_titolo = 12
-                min_col = 3
-            case 5:
-                lunghezza_titolo = 12
-                min_col = 2
-            case 6:
-                lunghezza_titolo = 12
-                min_col = 2
-            case 7:
-                lunghezza_titolo = 12
-                min_col = 1
-            case _:
-                lunghezza_titolo = len(header)
-                min_col = 1
-        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=lunghezza_titolo)
-        min_row += 7
+        self.__tabella_pivot('21.obb_cor', 'Obbligazioni Corporate', tabella, formati={'Delta': FORMAT_PERCENTAGE_00})
 
-        # Intestazione
-        for col in ws.iter_cols(min_row=min_row, max_row=min_row + 1, min_col=min_col, max_col=min_col + len(header) - 1):
-            ws[col[0].coordinate].value = header[col[0].column-min_col]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(
-                right=Side(border_style='thin', color='31869B'),
-                left=Side(border_style='thin', color='31869B')
-            )
-            ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
-            ws.row_dimensions[col[0].row].height = 20
-            ws.row_dimensions[col[1].row].height = 20
-            ws.column_dimensions[col[0].column_letter].width = 12
-        min_row += 2
 
-        # Corpo
-        count_corp_bond = len(dict_corp_bond['PRODOTTO'])
-        columns_length = []
-        nome_obbcorp = list(portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND','PRODOTTO'])
-        len_nome_obbcorp = len(nome_obbcorp)
-        num_intermediari = len(portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND', 'INTERMEDIARIO'].unique())
-        for row in ws.iter_rows(min_row=min_row, max_row=min_row + count_corp_bond - 1, min_col=min_col, max_col=min_col + len(header)):
-            # nome strumento
-            ws[row[0].coordinate].value = dict_corp_bond['PRODOTTO'][row[0].row-min_row]
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-            ws[row[0].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            # controvalore strumento aggiunto per riga
-            for _ in range(1, count_banks+1):
-                row_offset = -2-(row[0].row-min_row)
-                ctv_t1 = ptf_corp_bond.loc[
-                    (ptf_corp_bond['INTERMEDIARIO']==ws[row[_].offset(column=0, row=row_offset).coordinate].value) &
-                    (ptf_corp_bond['PRODOTTO']==ws[row[0].coordinate].value),
-                    'TOTALE t1'
-                ]
-                if not ctv_t1.empty:
-                    ws[row[_].coordinate].value = ctv_t1.values[0]
-                else:
-                    ws[row[_].coordinate].value = ''
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[_].coordinate].border = Border(
-                    bottom=Side(border_style='dashed', color='31869B'),
-                    right=Side(border_style='dashed', color='31869B'),
-                    left=Side(border_style='dashed', color='31869B')
-                )
-                ws[row[_].coordinate].number_format = '#,0'
-            # totale t1
-            ws[row[count_banks+1].coordinate].value = dict_corp_bond['TOTALE t1'][row[0].row-min_row]
-            ws[row[count_banks+1].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+1].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+1].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+1].coordinate].number_format = '#,0'
-            # totale t0
-            ws[row[count_banks+2].coordinate].value = dict_corp_bond['TOTALE t0'][row[0].row-min_row]
-            ws[row[count_banks+2].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+2].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+2].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+2].coordinate].number_format = '#,0'
-            # calcolo del delta mensile dei prezzi degli strumenti in euro,
-            # tranne quando il prodotto è stato liquidato in t1 o non esisteva in t0
-            if ws[row[count_banks+1].coordinate].value != 0 and ws[row[count_banks+2].coordinate].value != 0:
-                ws[row[count_banks+3].coordinate].value = (
-                    (
-                        (dict_corp_bond['PREZZO t1'][row[0].row-min_row] * dict_corp_bond['CAMBIO t1'][row[0].row-min_row])
-                        - (dict_corp_bond['PREZZO t0'][row[0].row-min_row]* dict_corp_bond['CAMBIO t0'][row[0].row-min_row])
-                    )
-                    /
-                    (dict_corp_bond['PREZZO t0'][row[0].row-min_row] * dict_corp_bond['CAMBIO t0'][row[0].row-min_row])
-                )
-            else:
-                ws[row[count_banks+3].coordinate].value = '/'
-            ws[row[count_banks+3].coordinate].alignment = Alignment(horizontal='center')
-            ws[row[count_banks+3].coordinate].font = Font(name='Times New Roman', size=9)
-            ws[row[count_banks+3].coordinate].border = Border(
-                bottom=Side(border_style='dashed', color='31869B'),
-                right=Side(border_style='dashed', color='31869B'),
-                left=Side(border_style='dashed', color='31869B')
-            )
-            ws[row[count_banks+3].coordinate].number_format = FORMAT_PERCENTAGE_00
-
-            columns_length.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
-            ws.column_dimensions[row[0].column_letter].width = max(columns_length) + 2.5 # modifica larghezza colonna FALLO ALLA FINE
+    def calcola_obb_totale_22(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della ventiduesima pagina: controvalori per intermediario e tipo di obbligazioni.
 
-        # Somma per intermediari
-        for row in ws.iter_rows(min_row=min_row + count_corp_bond, max_row=min_row + count_corp_bond, min_col=min_col, max_col=min_col + len(header)):
-            ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(
-                bottom=Side(border_style='thin', color='31869B'),
-                right=Side(border_style='thin', color='31869B'),
-                left=Side(border_style='thin', color='31869B'),
-                top=Side(border_style='thin', color='31869B')
-            )
-            for _ in range(1, len(header)-3):
-                # TODO: da qui!
-                ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_nome_obbcorp-2).value) & (portfolio['CATEGORIA']=='CORPORATE_BOND'), 'TOTALE t1'].sum()
-            ws[row[len_header_21-3].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND', 'TOTALE t1'].sum()
-            ws[row[len_header_21-2].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND', 'TOTALE t0'].sum()
-            ws[row[len_header_21-1].coordinate].value = (portfolio.loc[(portfolio['CATEGORIA']=='CORPORATE_BOND') & (portfolio['TOTALE t0']!=0), 'TOTALE t1'].sum() - portfolio.loc[(portfolio['CATEGORIA']=='CORPORATE_BOND') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()) / portfolio.loc[(portfolio['CATEGORIA']=='CORPORATE_BOND') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()
-            
-            for _ in range(1, len(header)):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(
-                    bottom=Side(border_style='thin', color='31869B'),
-                    right=Side(border_style='thin', color='31869B'),
-                    left=Side(border_style='thin', color='31869B'),
-                    top=Side(border_style='thin', color='31869B')
-                )
-                ws[row[_].coordinate].number_format = '#,0'
-            ws[row[len(header)-1].coordinate].number_format = FORMAT_PERCENTAGE_00
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        # Controvalori per intermediario e tipo di obbligazioni, con i totali
+        tabella = pivot(
+            portfolio.loc[portfolio['CATEGORIA'].isin(['GOVERNMENT_BOND', 'CORPORATE_BOND'])], 'INTERMEDIARIO', 'CATEGORIA',
+            ordine_colonne=['GOVERNMENT_BOND', 'CORPORATE_BOND']
+        )
+        return tabella
 
     def obb_totale_22(self):
         """
         Crea la ventiduesima pagina.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        tabella = self.calcolo('obb_totale_22')
 
         # 22.Obb. totale
         ws = self.wb.create_sheet('22.obb_tot')
@@ -2058,9 +1844,7 @@ class Report():
 
         # Titolo
         ws['A1'] = 'Riepilogo Obbligazioni'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=12)
         min_col = 4
 
@@ -2068,10 +1852,7 @@ class Report():
         for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_22 -1):
             ws[col[0].coordinate].value = header_22[0]
             del header_22[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
+            ws[col[0].coordinate].style = INTESTAZIONE
             ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
             ws.row_dimensions[col[0].row].height = 20
             ws.row_dimensions[col[1].row].height = 20
@@ -2087,30 +1868,21 @@ class Report():
             if row[0].row > 9:
                 ws[row[0].coordinate].value = int_obb[0]
                 del int_obb[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-
-                ws[row[1].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                ws[row[1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[0].coordinate].style = CORPO_NOME
+
+                valori = tabella.loc[ws[row[0].coordinate].value]
+                ws[row[1].coordinate].value = valori['GOVERNMENT_BOND'] if valori['GOVERNMENT_BOND'] != 0 else ''
+                ws[row[1].coordinate].style = CORPO
                 ws[row[1].coordinate].number_format = '#,0'
-                ws[row[2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CORPORATE_BOND') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['CATEGORIA']=='CORPORATE_BOND') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                ws[row[2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[2].coordinate].value = valori['CORPORATE_BOND'] if valori['CORPORATE_BOND'] != 0 else ''
+                ws[row[2].coordinate].style = CORPO
                 ws[row[2].coordinate].number_format = '#,0'
 
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value) & ((portfolio['CATEGORIA']=='GOVERNMENT_BOND') | (portfolio['CATEGORIA']=='CORPORATE_BOND')), 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+1].coordinate].value = valori[TOTALE_T1]
+                ws[row[num_intermediari+1].coordinate].style = CORPO
                 ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value) & ((portfolio['CATEGORIA']=='GOVERNMENT_BOND') | (portfolio['CATEGORIA']=='CORPORATE_BOND')), 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+2].coordinate].value = valori[TOTALE_T0]
+                ws[row[num_intermediari+2].coordinate].style = CORPO
                 ws[row[num_intermediari+2].coordinate].number_format = '#,0'
 
                 lunghezza_colonna_22.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
@@ -2119,138 +1891,64 @@ class Report():
         # Somma per strumento
         for row in ws.iter_rows(min_row=10 + len_int_obb, max_row=10 + len_int_obb, min_col=min_col, max_col=min_col + len_header_22):
             ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+            ws[row[0].coordinate].style = SOMMA_NOME
             
-            ws[row[1].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='GOVERNMENT_BOND', 'TOTALE t1'].sum()
-            ws[row[2].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='CORPORATE_BOND', 'TOTALE t1'].sum()
+            ws[row[1].coordinate].value = tabella.at[TOTALE, 'GOVERNMENT_BOND']
+            ws[row[2].coordinate].value = tabella.at[TOTALE, 'CORPORATE_BOND']
             
-            ws[row[len_header_22-2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') | (portfolio['CATEGORIA']=='CORPORATE_BOND'), 'TOTALE t1'].sum()
-            ws[row[len_header_22-1].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='GOVERNMENT_BOND') | (portfolio['CATEGORIA']=='CORPORATE_BOND'), 'TOTALE t0'].sum()
+            ws[row[len_header_22-2].coordinate].value = tabella.at[TOTALE, TOTALE_T1]
+            ws[row[len_header_22-1].coordinate].value = tabella.at[TOTALE, TOTALE_T0]
 
             for _ in range(1,len_header_22):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+                ws[row[_].coordinate].style = SOMMA
                 ws[row[_].coordinate].number_format = '#,0'
 
-    def liquidità_23(self):
+    def calcola_liquidità_23(self) -> pd.DataFrame:
         """
-        Crea la ventitreesima pagina.
+        Fase di calcolo della ventitreesima pagina: liquidità per prodotto e intermediario.
+
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        liquidità = portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR')]
 
-        ws = self.wb.create_sheet('23.liq')
-        ws = self.wb['23.liq']
-        self.wb.active = ws
-
-        # Creazione tabella
-        header_23 = list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())
-        header_23.insert(0, '')
-        header_23.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month]))
-        len_header_23 = len(header_23)
+        # una riga per prodotto, anche se detenuto presso più intermediari
+        tabella = pivot(liquidità, 'PRODOTTO', 'INTERMEDIARIO')
+        return tabella
 
-        # Titolo
-        ws['A1'] = 'Liquidità'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        if len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 1:
-            lunghezza_titolo_23 = 12
-            min_col = 4
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 2:
-            lunghezza_titolo_23 = 12
-            min_col = 4
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 3:
-            lunghezza_titolo_23 = 12
-            min_col = 3
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 4:
-            lunghezza_titolo_23 = 12
-            min_col = 3
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 5:
-            lunghezza_titolo_23 = 12
-            min_col = 2
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 6:
-            lunghezza_titolo_23 = 12
-            min_col = 2
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'INTERMEDIARIO'].unique())) == 7:
-            lunghezza_titolo_23 = 12
-            min_col = 1
-        else:
-            lunghezza_titolo_23 = len_header_23
-            min_col = 1
-        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=lunghezza_titolo_23)
-
-        # Intestazione
-        for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_23 - 1):
-            ws[col[0].coordinate].value = header_23[0]
-            del header_23[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
-            ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
-            ws.row_dimensions[col[0].row].height = 20
-            ws.row_dimensions[col[1].row].height = 20
-            ws.column_dimensions[col[0].column_letter].width = 12
+    def liquidità_23(self):
+        """
+        Crea la ventitreesima pagina.
+        """
+        tabella = self.calcolo('liquidità_23')
 
-        # Indice e riempimento tabella
-        nome_liq = list(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'),'PRODOTTO'])
-        len_nome_liq = len(nome_liq)
-        num_intermediari = len(portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'), 'INTERMEDIARIO'].unique())
-        lunghezza_colonna_23 = []
-        for row in ws.iter_rows(min_row=8, max_row=10 + len_nome_liq -1, min_col=min_col, max_col=min_col + len_header_23):
-            if row[0].row > 9:
-                ws[row[0].coordinate].value = nome_liq[0]
-                del nome_liq[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                for _ in range(1, num_intermediari+1):
-                    ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['PRODOTTO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['PRODOTTO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                    ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                    ws[row[_].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                    ws[row[_].coordinate].number_format = '#,0'
+        self.__tabella_pivot('23.liq', 'Liquidità', tabella, nascondi_zeri=True)
 
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[portfolio['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[portfolio['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+2].coordinate].number_format = '#,0'
 
-                lunghezza_colonna_23.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
-                ws.column_dimensions[row[0].column_letter].width = max(lunghezza_colonna_23) + 2.5 # modifica larghezza colonna
+    def calcola_liq_totale_24(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della ventiquattresima pagina: controvalori per intermediario e tipo di liquidità.
 
-        # Somma per intermediari
-        for row in ws.iter_rows(min_row=10 + len_nome_liq, max_row=10 + len_nome_liq, min_col=min_col, max_col=min_col + len_header_23):
-            ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
-            for _ in range(1,len_header_23-2):
-                ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_nome_liq-2).value) & ((portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR')), 'TOTALE t1'].sum()
-            ws[row[len_header_23-2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'), 'TOTALE t1'].sum()
-            ws[row[len_header_23-1].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'), 'TOTALE t0'].sum()
-            for _ in range(1,len_header_23):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
-                ws[row[_].coordinate].number_format = '#,0'
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        # Controvalori per intermediario e tipo di liquidità, con i totali
+        tabella = pivot(
+            portfolio.loc[portfolio['CATEGORIA'].isin(['CASH', 'CASH_FOREIGN_CURR'])], 'INTERMEDIARIO', 'CATEGORIA',
+            ordine_colonne=['CASH', 'CASH_FOREIGN_CURR']
+        )
+        return tabella
 
     def liq_totale_24(self):
         """
         Crea la ventiquattresima pagina.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        tabella = self.calcolo('liq_totale_24')
 
         ws = self.wb.create_sheet('24.liq_tot')
         ws = self.wb['24.liq_tot']
@@ -2262,9 +1960,7 @@ class Report():
 
         # Titolo
         ws['A1'] = 'Riepilogo Liquidità'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=12)
         min_col = 4
 
@@ -2272,10 +1968,7 @@ class Report():
         for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_24 -1):
             ws[col[0].coordinate].value = header_24[0]
             del header_24[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
+            ws[col[0].coordinate].style = INTESTAZIONE
             ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
             ws.row_dimensions[col[0].row].height = 20
             ws.row_dimensions[col[1].row].height = 20
@@ -2290,30 +1983,21 @@ class Report():
             if row[0].row > 9:
                 ws[row[0].coordinate].value = int_liq[0]
                 del int_liq[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-
-                ws[row[1].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CASH') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['CATEGORIA']=='CASH') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                ws[row[1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[0].coordinate].style = CORPO_NOME
+
+                valori = tabella.loc[ws[row[0].coordinate].value]
+                ws[row[1].coordinate].value = valori['CASH'] if valori['CASH'] != 0 else ''
+                ws[row[1].coordinate].style = CORPO
                 ws[row[1].coordinate].number_format = '#,0'
-                ws[row[2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CASH_FOREIGN_CURR') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['CATEGORIA']=='CASH_FOREIGN_CURR') & (portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                ws[row[2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[2].coordinate].value = valori['CASH_FOREIGN_CURR'] if valori['CASH_FOREIGN_CURR'] != 0 else ''
+                ws[row[2].coordinate].style = CORPO
                 ws[row[2].coordinate].number_format = '#,0'
 
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value) & ((portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR')), 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+1].coordinate].value = valori[TOTALE_T1]
+                ws[row[num_intermediari+1].coordinate].style = CORPO
                 ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[0].coordinate].value) & ((portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR')), 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+2].coordinate].value = valori[TOTALE_T0]
+                ws[row[num_intermediari+2].coordinate].style = CORPO
                 ws[row[num_intermediari+2].coordinate].number_format = '#,0'
 
                 lunghezza_colonna_24.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
@@ -2322,267 +2006,125 @@ class Report():
         # Somma per strumento
         for row in ws.iter_rows(min_row=10 + len_int_liq, max_row=10 + len_int_liq, min_col=min_col, max_col=min_col + len_header_24):
             ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+            ws[row[0].coordinate].style = SOMMA_NOME
             
-            ws[row[1].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='CASH', 'TOTALE t1'].sum()
-            ws[row[2].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='CASH_FOREIGN_CURR', 'TOTALE t1'].sum()
+            ws[row[1].coordinate].value = tabella.at[TOTALE, 'CASH']
+            ws[row[2].coordinate].value = tabella.at[TOTALE, 'CASH_FOREIGN_CURR']
             
-            ws[row[len_header_24-2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'), 'TOTALE t1'].sum()
-            ws[row[len_header_24-1].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='CASH') | (portfolio['CATEGORIA']=='CASH_FOREIGN_CURR'), 'TOTALE t0'].sum()
+            ws[row[len_header_24-2].coordinate].value = tabella.at[TOTALE, TOTALE_T1]
+            ws[row[len_header_24-1].coordinate].value = tabella.at[TOTALE, TOTALE_T0]
 
             for _ in range(1,len_header_24):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+                ws[row[_].coordinate].style = SOMMA
                 ws[row[_].coordinate].number_format = '#,0'
 
-    def gestioni_25(self):
+    def calcola_gestioni_25(self) -> pd.DataFrame:
         """
-        Crea la venticinquesima pagina.
+        Fase di calcolo della venticinquesima pagina: gestioni per prodotto e intermediario e variazione mensile.
+
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
+        portfolio = self.dati['Portfolio']
+        gestioni = portfolio.loc[portfolio['CATEGORIA']=='GP']
+
+        # una riga per prodotto, anche se detenuto presso più intermediari
+        tabella = pivot(gestioni, 'PRODOTTO', 'INTERMEDIARIO')
+        # delta mensile, tranne quando la gestione è stata chiusa in t1 o non esisteva in t0
+        ctv_t1, ctv_t0 = tabella[TOTALE_T1], tabella[TOTALE_T0]
+        tabella['Delta'] = ((ctv_t1 - ctv_t0) / ctv_t0).astype(object).where((ctv_t1 != 0) & (ctv_t0 != 0), '/')
+        # delta mensile complessivo delle gestioni presenti sia in t0 che in t1
+        tabella.at[TOTALE, 'Delta'] = (
+            gestioni.loc[gestioni['TOTALE t0']!=0, 'TOTALE t1'].sum() - gestioni.loc[gestioni['TOTALE t1']!=0, 'TOTALE t0'].sum()
+        ) / gestioni.loc[gestioni['TOTALE t1']!=0, 'TOTALE t0'].sum()
+        return tabella
 
-        # 25.Gestione
-        ws = self.wb.create_sheet('25.ges')
-        ws = self.wb['25.ges']
-        self.wb.active = ws
+    def gestioni_25(self):
+        """
+        Crea la venticinquesima pagina.
+        """
+        tabella = self.calcolo('gestioni_25')
 
-        # Creazione tabella
-        header_25 = list(portfolio.loc[portfolio['CATEGORIA']=='GP', 'INTERMEDIARIO'].unique())
-        header_25.insert(0, '')
-        header_25.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
-        len_header_25 = len(header_25)
+        self.__tabella_pivot(
+            '25.ges', 'Gestioni', tabella, formati={'Delta': FORMAT_PERCENTAGE_00}, margine=3.5, nascondi_zeri=True
+        )
 
-        # Titolo
-        ws['A1'] = 'Gestioni'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        if len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 1:
-            lunghezza_titolo_25 = 12
-            min_col = 4
-        elif len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 2:
-            lunghezza_titolo_25 = 12
-            min_col = 4
-        elif len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 3:
-            lunghezza_titolo_25 = 12
-            min_col = 3
-        elif len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 4:
-            lunghezza_titolo_25 = 12
-            min_col = 3
-        elif len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 5:
-            lunghezza_titolo_25 = 12
-            min_col = 2
-        elif len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 6:
-            lunghezza_titolo_25 = 12
-            min_col = 2
-        elif len(list(portfolio.loc[portfolio['CATEGORIA']=='GP','INTERMEDIARIO'].unique())) == 7:
-            lunghezza_titolo_25 = 12
-            min_col = 1
-        else:
-            lunghezza_titolo_25 = len_header_25
-            min_col = 1
-        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=lunghezza_titolo_25)
 
-        # Intestazione
-        for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_25 - 1):
-            ws[col[0].coordinate].value = header_25[0]
-            del header_25[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
-            ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
-            ws.row_dimensions[col[0].row].height = 20
-            ws.row_dimensions[col[1].row].height = 20
-            ws.column_dimensions[col[0].column_letter].width = 12
-
-        # Indice e riempimento tabella
-        nome_ges = list(portfolio.loc[portfolio['CATEGORIA']=='GP','PRODOTTO'])
-        len_nome_ges = len(nome_ges)
-        num_intermediari = len(portfolio.loc[portfolio['CATEGORIA']=='GP', 'INTERMEDIARIO'].unique())
-        lunghezza_colonna_25 = []
-        for row in ws.iter_rows(min_row=8, max_row=10 + len_nome_ges -1, min_col=min_col, max_col=min_col + len_header_25):
-            if row[0].row > 9:
-                ws[row[0].coordinate].value = nome_ges[0] 
-                del nome_ges[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                for _ in range(1, num_intermediari+1):
-                    ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['PRODOTTO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['PRODOTTO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                    ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                    ws[row[_].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                    ws[row[_].coordinate].number_format = '#,0'
+    def calcola_inv_alt_26(self) -> pd.DataFrame:
+        """
+        Fase di calcolo della ventiseiesima pagina: investimenti alternativi per prodotto e intermediario e variazione mensile.
 
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[portfolio['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[portfolio['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+2].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+3].coordinate].value = (ws[row[num_intermediari+1].coordinate].value -  ws[row[num_intermediari+2].coordinate].value) / (ws[row[num_intermediari+2].coordinate].value) if ws[row[num_intermediari+2].coordinate].value != 0 and ws[row[num_intermediari+1].coordinate].value != 0 else '/'
-                ws[row[num_intermediari+3].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+3].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+3].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+3].coordinate].number_format = FORMAT_PERCENTAGE_00
-
-                lunghezza_colonna_25.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
-                ws.column_dimensions[row[0].column_letter].width = max(lunghezza_colonna_25) + 3.5 # modifica larghezza colonna 
-            
-        # Somma per intermediari
-        for row in ws.iter_rows(min_row=10 + len_nome_ges, max_row=10 + len_nome_ges, min_col=min_col, max_col=min_col + len_header_25):
-            ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
-            for _ in range(1,len_header_25-2):
-                ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_nome_ges-2).value) & ((portfolio['CATEGORIA']=='GP')), 'TOTALE t1'].sum()
-            ws[row[len_header_25-3].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='GP', 'TOTALE t1'].sum()
-            ws[row[len_header_25-2].coordinate].value = portfolio.loc[portfolio['CATEGORIA']=='GP', 'TOTALE t0'].sum()
-            ws[row[len_header_25-1].coordinate].value = (portfolio.loc[(portfolio['CATEGORIA']=='GP') & (portfolio['TOTALE t0']!=0), 'TOTALE t1'].sum() - portfolio.loc[(portfolio['CATEGORIA']=='GP') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()) / portfolio.loc[(portfolio['CATEGORIA']=='GP') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()
-            for _ in range(1,len_header_25):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
-                ws[row[_].coordinate].number_format = '#,0'
-            ws[row[len_header_25-1].coordinate].number_format = FORMAT_PERCENTAGE_00
+        Returns:
+            pd.DataFrame -- tabella della pagina, con la riga TOTALE in fondo
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        inv_alt = portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET')]
+
+        # una riga per prodotto, anche se detenuto presso più intermediari
+        tabella = pivot(inv_alt, 'PRODOTTO', 'INTERMEDIARIO')
+        # delta mensile, tranne quando lo strumento è stato liquidato in t1 o non esisteva in t0
+        ctv_t1, ctv_t0 = tabella[TOTALE_T1], tabella[TOTALE_T0]
+        tabella['Delta'] = ((ctv_t1 - ctv_t0) / ctv_t0).astype(object).where((ctv_t1 != 0) & (ctv_t0 != 0), '/')
+        # delta mensile complessivo
+        tabella.at[TOTALE, 'Delta'] = (portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET') & (portfolio['TOTALE t0']!=0), 'TOTALE t1'].sum() - portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()) / portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()
+        return tabella
 
     def inv_alt_26(self):
         """
         Crea la ventiseiesima pagina.
         """
-        # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
-
-
-        # 26.Inv.Alt
-        ws = self.wb.create_sheet('26.invalt')
-        ws = self.wb['26.invalt']
-        self.wb.active = ws
-
-        # Creazione tabella
-        header_26 = list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'), 'INTERMEDIARIO'].unique())
-        header_26.insert(0, '')
-        header_26.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month], 'Delta'))
-        len_header_26 = len(header_26)
-
-        # Titolo
-        ws['A1'] = 'Inv. Alt. e Hedge Fund'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
-        if len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 1:
-            lunghezza_titolo_26 = 12
-            min_col = 4
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 2:
-            lunghezza_titolo_26 = 12
-            min_col = 4
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 3:
-            lunghezza_titolo_26 = 12
-            min_col = 3
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 4:
-            lunghezza_titolo_26 = 12
-            min_col = 3
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 5:
-            lunghezza_titolo_26 = 12
-            min_col = 2
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 6:
-            lunghezza_titolo_26 = 12
-            min_col = 2
-        elif len(list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'INTERMEDIARIO'].unique())) == 7:
-            lunghezza_titolo_26 = 12
-            min_col = 1
-        else:
-            lunghezza_titolo_26 = len_header_26
-            min_col = 1
-        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=lunghezza_titolo_26)
+        tabella = self.calcolo('inv_alt_26')
 
-        # Intestazione
-        for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_26 - 1):
-            ws[col[0].coordinate].value = header_26[0]
-            del header_26[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
-            ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
-            ws.row_dimensions[col[0].row].height = 20
-            ws.row_dimensions[col[1].row].height = 20
-            ws.column_dimensions[col[0].column_letter].width = 12
-
-        # Indice e riempimento tabella
-        nome_invalt = list(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'),'PRODOTTO'])
-        len_nome_invalt = len(nome_invalt)
-        num_intermediari = len(portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'), 'INTERMEDIARIO'].unique())
-        lunghezza_colonna_26 = []
-        for row in ws.iter_rows(min_row=8, max_row=10 + len_nome_invalt -1, min_col=min_col, max_col=min_col + len_header_26):
-            if row[0].row > 9:
-                ws[row[0].coordinate].value = nome_invalt[0] 
-                del nome_invalt[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                for _ in range(1, num_intermediari+1):
-                    ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['PRODOTTO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['PRODOTTO']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                    ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                    ws[row[_].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                    ws[row[_].coordinate].number_format = '#,0'
+        self.__tabella_pivot('26.invalt', 'Inv. Alt. e Hedge Fund', tabella, formati={'Delta': FORMAT_PERCENTAGE_00}, nascondi_zeri=True)
 
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[portfolio['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+1].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[portfolio['PRODOTTO']==ws[row[0].coordinate].value, 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+2].coordinate].number_format = '#,0'
-                ws[row[num_intermediari+3].coordinate].value = (ws[row[num_intermediari+1].coordinate].value -  ws[row[num_intermediari+2].coordinate].value) / (ws[row[num_intermediari+2].coordinate].value) if ws[row[num_intermediari+2].coordinate].value != 0 and ws[row[num_intermediari+1].coordinate].value != 0 else '/'
-                ws[row[num_intermediari+3].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+3].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+3].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
-                ws[row[num_intermediari+3].coordinate].number_format = FORMAT_PERCENTAGE_00
 
-                lunghezza_colonna_26.append(len(ws.cell(row=row[0].row, column=row[0].column).value)) # ottieni la lunghezza della colonna
-                ws.column_dimensions[row[0].column_letter].width = max(lunghezza_colonna_26) + 2.5 # modifica larghezza colonna
+    def calcola_asset_allocation_27(self) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Fase di calcolo della ventisettesima pagina: asset allocation per categoria e intermediario,
+        con le gestioni scomposte secondo il foglio Gestioni.
 
-        # Somma per intermediari
-        for row in ws.iter_rows(min_row=10 + len_nome_invalt, max_row=10 + len_nome_invalt, min_col=min_col, max_col=min_col + len_header_26):
-            ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
-            for _ in range(1,len_header_26-2):
-                ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_nome_invalt-2).value) & ((portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET')), 'TOTALE t1'].sum()
-            ws[row[len_header_26-3].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'), 'TOTALE t1'].sum()
-            ws[row[len_header_26-2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET'), 'TOTALE t0'].sum()
-            ws[row[len_header_26-1].coordinate].value = (portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET') & (portfolio['TOTALE t0']!=0), 'TOTALE t1'].sum() - portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()) / portfolio.loc[(portfolio['CATEGORIA']=='HEDGE_FUND') | (portfolio['CATEGORIA']=='ALTERNATIVE_ASSET') & (portfolio['TOTALE t1']!=0), 'TOTALE t0'].sum()
-            for _ in range(1,len_header_26):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
-                ws[row[_].coordinate].number_format = '#,0'
-            ws[row[len_header_26-1].coordinate].number_format = FORMAT_PERCENTAGE_00
+        Returns:
+            tuple[pd.DataFrame, pd.Series] -- tabella per categoria e intermediario e totali per intermediario
+        """
+        # Carica portafoglio
+        portfolio = self.dati['Portfolio']
+        # Carica asset-allocation gestioni
+        ass_allocation = self.dati['Gestioni']
+        # Cerca le posizioni contenenti almeno una gestione patrimoniale
+        posizioni_con_gestioni = list(portfolio.loc[portfolio['CATEGORIA']=='GP', 'INTERMEDIARIO'].unique())
+        # tipo_strumento_nogp = list(portfolio.loc[portfolio['CATEGORIA']!='GP', 'CATEGORIA'].unique())
+        # Con la rimozione dell'hedge fund da JPM, non esistono più prodotti di quel tipo, se non all'interno
+        # delle gestioni patrimoniali. Con la riga di codice sopra, non vengono intercettati
+        # Chiedi al professor Maspero di poter togliere dall'asset allocation gli hedge fund.
+        # Devo specificarli tutti a mano
+        tipo_strumento_nogp = [
+            'CASH', 'EQUITY', 'CASH_FOREIGN_CURR', 'CORPORATE_BOND', 'GOVERNMENT_BOND', 
+            'ALTERNATIVE_ASSET', 'HEDGE_FUND'
+        ]
+        # Controvalori per categoria e intermediario: le posizioni con gestioni sono scomposte secondo il foglio Gestioni
+        colonne = ['INTERMEDIARIO', 'CATEGORIA', 'TOTALE t1', 'TOTALE t0']
+        composizione = pd.concat([
+            portfolio.loc[~portfolio['INTERMEDIARIO'].isin(posizioni_con_gestioni), colonne],
+            ass_allocation.loc[ass_allocation['INTERMEDIARIO'].isin(posizioni_con_gestioni), colonne]
+        ])
+        tabella = pivot(
+            composizione, 'CATEGORIA', 'INTERMEDIARIO', ordine_righe=tipo_strumento_nogp,
+            ordine_colonne=portfolio['INTERMEDIARIO'].unique()
+        )
+        # Il totale per intermediario resta quello del portafoglio, gestioni comprese
+        totali = pivot(portfolio, 'CATEGORIA', 'INTERMEDIARIO').loc[TOTALE]
+        return tabella, totali
 
     def asset_allocation_27(self):
         """
         Crea la ventisettesima pagina.
         """
         # Carica portafoglio
-        portfolio = pd.read_excel(self.file_portafoglio, sheet_name='Portfolio', header=1)
-        # Carica asset-allocation gestioni
-        ass_allocation = pd.read_excel(self.file_portafoglio, sheet_name='Gestioni', header=0)
+        portfolio = self.dati['Portfolio']
+        # Controvalori per categoria (righe) e intermediario (colonne) e totali per intermediario
+        tabella, totali = self.calcolo('asset_allocation_27')
 
         # 27.Sintesi
         ws = self.wb.create_sheet('27.ass_all')
@@ -2594,18 +2136,10 @@ class Report():
         header_27.insert(0, '')
         header_27.extend(('Totale '+ self.mesi_dict[self.t1.month], 'Totale '+ self.mesi_dict[self.t0_1m.month]))
         len_header_27 = len(header_27)
-        # Cerca le posizioni contenenti almeno una gestione patrimoniale
-        posizioni_con_gestioni = []
-        for intermediario in header_27:
-            if 'GP' in portfolio.loc[portfolio['INTERMEDIARIO']==intermediario, 'CATEGORIA'].unique():
-                posizioni_con_gestioni.append(intermediario)
-        #print(posizioni_con_gestioni)
 
         # Titolo
         ws['A1'] = 'Asset Allocation'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         if len(list(portfolio['INTERMEDIARIO'].unique())) == 1:
             lunghezza_titolo_27 = 12
             min_col = 4
@@ -2635,24 +2169,13 @@ class Report():
         for col in ws.iter_cols(min_row=8, max_row=9, min_col=min_col, max_col=min_col + len_header_27 - 1):
             ws[col[0].coordinate].value = header_27[0]
             del header_27[0]
-            ws[col[0].coordinate].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            ws[col[0].coordinate].font = Font(name='Times New Roman', size=10, color='FFFFFF')
-            ws[col[0].coordinate].fill = PatternFill(fill_type='solid', fgColor='31869B')
-            ws[col[0].coordinate].border = Border(right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'))
+            ws[col[0].coordinate].style = INTESTAZIONE
             ws.merge_cells(start_row=col[0].row, end_row=col[1].row, start_column=col[0].column, end_column=col[0].column)
             ws.row_dimensions[col[0].row].height = 20
             ws.row_dimensions[col[1].row].height = 20
             ws.column_dimensions[col[0].column_letter].width = 12
 
-        # tipo_strumento_nogp = list(portfolio.loc[portfolio['CATEGORIA']!='GP', 'CATEGORIA'].unique())
-        # Con la rimozione dell'hedge fund da JPM, non esistono più prodotti di quel tipo, se non all'interno
-        # delle gestioni patrimoniali. Con la riga di codice sopra, non vengono intercettati
-        # Chiedi al professor Maspero di poter togliere dall'asset allocation gli hedge fund.
-        # Devo specificarli tutti a mano
-        tipo_strumento_nogp = [
-            'CASH', 'EQUITY', 'CASH_FOREIGN_CURR', 'CORPORATE_BOND', 'GOVERNMENT_BOND', 
-            'ALTERNATIVE_ASSET', 'HEDGE_FUND'
-        ]
+        tipo_strumento_nogp = list(tabella.index.drop(TOTALE))
         len_tipo_strumento_nogp = len(tipo_strumento_nogp)
         num_intermediari = len(portfolio['INTERMEDIARIO'].unique())
         lunghezza_colonna_27 = []
@@ -2665,32 +2188,21 @@ class Report():
             if row[0].row > 9:
                 ws[row[0].coordinate].value = tipo_strumento_nogp[0] # carica i tipi di strumenti nell'indice
                 del tipo_strumento_nogp[0]
-                ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-                ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, color='000000')
-                ws[row[0].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[0].coordinate].style = CORPO_NOME
                 ws.row_dimensions[row[0].row].height = 19
 
+                valori = tabella.loc[ws[row[0].coordinate].value]
                 for _ in range(1, num_intermediari+1):
-                    ws[row[_].coordinate].value = portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['CATEGORIA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if portfolio.loc[(portfolio['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (portfolio['CATEGORIA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                    ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                    ws[row[_].coordinate].font = Font(name='Times New Roman', size=9)
-                    ws[row[_].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                    ws[row[_].coordinate].value = valori.iat[_-1] if valori.iat[_-1] != 0 else ''
+                    ws[row[_].coordinate].style = CORPO
                     ws[row[_].coordinate].number_format = '#,0'
 
-                for _ in range(1, num_intermediari+1):
-                    if ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value in posizioni_con_gestioni:
-                        ws[row[_].coordinate].value = ass_allocation.loc[(ass_allocation['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (ass_allocation['CATEGORIA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() if ass_allocation.loc[(ass_allocation['INTERMEDIARIO']==ws[row[_].offset(column=0, row=-2-(row[0].row-10)).coordinate].value) & (ass_allocation['CATEGORIA']==ws[row[0].coordinate].value), 'TOTALE t1'].sum() != 0 else ''
-                
-                ws[row[num_intermediari+1].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']==ws[row[0].coordinate].value) & (~portfolio['INTERMEDIARIO'].isin(posizioni_con_gestioni)), 'TOTALE t1'].sum() + ass_allocation.loc[(ass_allocation['CATEGORIA']==ws[row[0].coordinate].value) & (ass_allocation['INTERMEDIARIO'].isin(posizioni_con_gestioni)), 'TOTALE t1'].sum()
-                ws[row[num_intermediari+1].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+1].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+1].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+1].coordinate].value = valori[TOTALE_T1]
+                ws[row[num_intermediari+1].coordinate].style = CORPO
                 ws[row[num_intermediari+1].coordinate].number_format = '#,0'
                 # TODO : controlla la somma dei valori nella colonna totale mese t0 usando valori veri.
-                ws[row[num_intermediari+2].coordinate].value = portfolio.loc[(portfolio['CATEGORIA']==ws[row[0].coordinate].value) & (~portfolio['INTERMEDIARIO'].isin(posizioni_con_gestioni)), 'TOTALE t0'].sum() + ass_allocation.loc[(ass_allocation['CATEGORIA']==ws[row[0].coordinate].value) & (ass_allocation['INTERMEDIARIO'].isin(posizioni_con_gestioni)), 'TOTALE t0'].sum()
-                ws[row[num_intermediari+2].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[num_intermediari+2].coordinate].font = Font(name='Times New Roman', size=9)
-                ws[row[num_intermediari+2].coordinate].border = Border(bottom=Side(border_style='dashed', color='31869B'), right=Side(border_style='dashed', color='31869B'), left=Side(border_style='dashed', color='31869B'))
+                ws[row[num_intermediari+2].coordinate].value = valori[TOTALE_T0]
+                ws[row[num_intermediari+2].coordinate].style = CORPO
                 ws[row[num_intermediari+2].coordinate].number_format = '#,0'
 
                 ws[row[0].coordinate].value = tipo_strumento_dict[ws[row[0].coordinate].value] # aggiorna valori dell'indice con i nomi nel dizionario
@@ -2700,18 +2212,14 @@ class Report():
         # Somma per intermediari
         for row in ws.iter_rows(min_row=10 + len_tipo_strumento_nogp, max_row=10 + len_tipo_strumento_nogp, min_col=min_col, max_col=min_col + len_header_27):
             ws[row[0].coordinate].value = 'TOTALE'
-            ws[row[0].coordinate].alignment = Alignment(horizontal='left', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-            ws[row[0].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+            ws[row[0].coordinate].style = SOMMA_NOME
             ws.row_dimensions[row[0].row].height = 19
             for _ in range(1,len_header_27-2):
-                ws[row[_].coordinate].value = portfolio.loc[portfolio['INTERMEDIARIO']==ws.cell(row=row[_].row, column=row[_].column).offset(row=-len_tipo_strumento_nogp-2).value, 'TOTALE t1'].sum()
-            ws[row[len_header_27-2].coordinate].value = portfolio.loc[:, 'TOTALE t1'].sum()
-            ws[row[len_header_27-1].coordinate].value = portfolio.loc[:, 'TOTALE t0'].sum()
+                ws[row[_].coordinate].value = totali.iat[_-1]
+            ws[row[len_header_27-2].coordinate].value = totali[TOTALE_T1]
+            ws[row[len_header_27-1].coordinate].value = totali[TOTALE_T0]
             for _ in range(1,len_header_27):
-                ws[row[_].coordinate].alignment = Alignment(horizontal='center')
-                ws[row[_].coordinate].font = Font(name='Times New Roman', size=9, bold=True)
-                ws[row[_].coordinate].border = Border(bottom=Side(border_style='thin', color='31869B'), right=Side(border_style='thin', color='31869B'), left=Side(border_style='thin', color='31869B'), top=Side(border_style='thin', color='31869B'))
+                ws[row[_].coordinate].style = SOMMA
                 ws[row[_].coordinate].number_format = '#,0'
 
         chart = PieChart()
@@ -2745,33 +2253,26 @@ class Report():
         self.wb.active = ws
 
         ws['A1'] = '4. Contatti'
-        ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A1'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A1'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A1'].style = TITOLO
         ws.merge_cells('A1:L4')
 
         header_28 = ['Benchmark & Style S.r.l.', 'Via San Siro, 33', '20149 Milano', '="+390258328666"', 'info@benchmarkandstyle.com']
         for row in ws.iter_rows(min_row=6, max_row=10, min_col=1, max_col=12):
             ws[row[0].coordinate].value = header_28[0]
             del header_28[0]
-            ws[row[0].coordinate].alignment = Alignment(horizontal='center', vertical='center')
-            ws[row[0].coordinate].font = Font(name='Times New Roman', size=11, bold=True, color='31869B')
+            ws[row[0].coordinate].style = CONTATTI
             ws.merge_cells(start_row=row[0].row, end_row=row[0].row, start_column=1, end_column=12)
 
         ws['A13'] = 'Disclaimer'
-        ws['A13'].alignment = Alignment(horizontal='center', vertical='center')
-        ws['A13'].font = Font(name='Times New Roman', size=48, bold=True, color='FFFFFF')
-        ws['A13'].fill = PatternFill(fill_type='solid', fgColor='31869B')
+        ws['A13'].style = TITOLO
         ws.merge_cells('A13:L16')
 
         ws['A18'] = 'Il presente rendiconto ha una funzione meramente informativa ed è stato redatto sulla base dei dati forniti dai singoli gestori cui è affidato il patrimonio del cliente. I dati sono stati rielaborati al fine di fornire una visione d\'insieme e progressiva dei rendimenti mensili del patrimonio e delle singole gestioni confrontati ai relativi benchmarks. Tale rielaborazione rende più semplice comprendere i contributi dei singoli gestori e delle varie classi d\'attivo alla performance del patrimonio nel periodo considerato nonchè di monitorare periodicamente la performance stessa e i rischi assunti a livello consolidato e dei singoli portafogli.'
-        ws['A18'].alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-        ws['A18'].font = Font(name='Times New Roman', size=11, bold=True, italic=True, color='31869B')
+        ws['A18'].style = DISCLAIMER
         ws.merge_cells('A18:L24')
 
         ws['A25'] = 'Il presente rendiconto non rappresenta in alcun caso una raccomandazione e/o sollecitazione all\'acquisto o alla vendita di titoli, fondi, strumenti finanziari derivati, valute o altro e gli eventuali contenuti in esso non potranno in nessun caso essere ritenuti responsabili delle future performance del patrimonio del cliente neppure con riferimento alle previsioni formulate circa la prevedibile evoluzione dei mercati finanziari e/o di singoli comparti di essi.'
-        ws['A25'].alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-        ws['A25'].font = Font(name='Times New Roman', size=11, bold=True, italic=True, color='31869B')
+        ws['A25'].style = DISCLAIMER
         ws.merge_cells('A25:L28')
 
         self.__logo(ws)
@@ -2792,50 +2293,107 @@ class Report():
                 sheet.sheet_properties.pageSetUpPr.fitToPage = True 
                 sheet.page_setup.fitToHeight = 1
                 sheet.page_setup.fitToWidth = 1
-                numero_pagina_regex = re.compile(r'\d*') # regex per trovare il numero del foglio
+                numero_pagina_regex = re.compile(r'\d*(?:\.\d+)?') # regex per trovare il numero del foglio (es. 7 o 7.1)
                 numero_pagina_search = numero_pagina_regex.search(str(sheet.title))
                 numero_pagina = numero_pagina_search.group()
                 sheet.oddFooter.right.text = numero_pagina # assegna il numero del foglio al piè di pagina destro
 
-    def salva_file(self):
+    def salva_file(self, file_report: Path | str | None = None):
         """Salva il file excel.
+
+        Keyword Arguments:
+            file_report {Path | str | None} -- percorso del report (default: {report.xlsx nella cartella di lavoro})
         """
-        self.wb.save(self.path.joinpath('report.xlsx'))
+        salva(self.wb, file_report if file_report is not None else self.path.joinpath('report.xlsx'))
 
+    def genera(self, file_report: Path | str | None = None):
+        """Crea le pagine richieste nell'ordine di PAGINE, imposta il layout e salva il file.
+
+        Keyword Arguments:
+            file_report {Path | str | None} -- percorso del report (default: {report.xlsx nella cartella di lavoro})
+        """
+        if 'copertina_1' not in self.pagine: # il foglio vuoto del workbook diventa la copertina
+            self.wb.remove(self.wb.active)
+        # Le fasi di calcolo partono tutte subito, nell'ordine delle pagine, e procedono mentre
+        # le pagine vengono scritte una alla volta nel workbook, nell'ordine finale dei fogli
+        parallelo = self.thread > 1 and self.profilo is None
+        with ThreadPoolExecutor(max_workers=self.thread if parallelo else 1) as pool:
+            if parallelo:
+                self.__calcoli = {
+                    pagina: pool.submit(self.__esegui_calcolo, pagina)
+                    for pagina in self.pagine if hasattr(self, f'calcola_{pagina}')
+                }
+            try:
+                for pagina in self.pagine:
+                    with misura(self.profilo, pagina, self.wb):
+                        getattr(self, pagina)()
+            finally:
+                for futuro in self.__calcoli.values(): # calcoli non usati perché una pagina è fallita
+                    futuro.cancel()
+                self.__calcoli = {}
+        with misura(self.profilo, 'layout', self.wb):
+            self.layout()
+        with misura(self.profilo, 'salva_file', self.wb):
+            self.salva_file(file_report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crea il report di un portafoglio.')
+    parser.add_argument('input', nargs='?', default='artes.xlsx', help='file excel da lavorare (default: artes.xlsx)')
+    parser.add_argument('-o', '--output', default=None, help='percorso del report (default: report.xlsx nella cartella di lavoro)')
+    parser.add_argument('--t1', required=True, help='data finale del report (gg/mm/aaaa)')
+    parser.add_argument(
+        '--pages', nargs='+', default=None, metavar='PAGINA',
+        help='pagine da creare, per nome (sintesi_17) o numero (17); le pagine da cui dipendono sono aggiunte'
+    )
+    parser.add_argument(
+        '--profile', nargs='?', const='profilo.json', default=None, metavar='FILE',
+        help='misura ogni fase, stampa il riepilogo e salva le misure in FILE (default: profilo.json)'
+    )
+    parser.add_argument('--thread', type=int, default=4, help='thread per le fasi di calcolo delle pagine (default: 4)')
+    parser.add_argument(
+        '--incrementale', action='store_true',
+        help="ricalcola solo le pagine i cui fogli di input sono cambiati dall'ultima esecuzione"
+    )
+    parser.add_argument(
+        '--istantanee', action='store_true',
+        help="salva l'istantanea della pagina 11 del mese di t1 (totali per intermediario, da cui i report successivi "
+            "calcolano la performance da inizio anno) in <input>.istantanee.csv, accanto al file di input"
+    )
+    parser.add_argument(
+        '--sovrascrivi-istantanee', action='store_true',
+        help="come --istantanee, sostituendo l'istantanea del mese di t1 se è già stata salvata"
+    )
+    parser.add_argument(
+        '--punti-grafici', type=int, default=PUNTI_GRAFICI, metavar='N',
+        help='punti per serie dei grafici giornalieri della pagina 5, scelti mantenendo la forma delle serie '
+            f'(es. 400 per alleggerire il file); 0 per tutte le date (default: {PUNTI_GRAFICI})'
+    )
+    args = parser.parse_args()
+    try:
+        pagine = risolvi_pagine(args.pages) if args.pages else None
+    except ValueError as errore:
+        parser.error(f'{errore}. Pagine disponibili: {", ".join(PAGINE)}')
+    if args.punti_grafici and args.punti_grafici < PUNTI_MINIMI:
+        parser.error(f'--punti-grafici deve essere almeno {PUNTI_MINIMI}, oppure 0 per tutte le date')
 
-if __name__ == "__main__":
     start = time.time() # TODO: sostituisci tutte le chiamate al foglio Portfolio con Portfolio (2)
-    _ = Report(t1='31/12/2024')
-    _.copertina_1()
-    _.indice_2()
-    _.analisi_di_mercato_3()
-    _.analisi_rendimenti_4()
-    _.analisi_indici_5()
-    _.performance_6()
-    _.andamento_7()
-    _.caricamento_dati()
-    _.cono_8()
-    _.cono_9()
-    _.nuovo_bk_10()
-    _.performance_11()
-    _.prezzi_12()
-    _.prezzi_13()
-    _.prezzi_14()
-    _.att_in_corso_15()
-    _.valutazione_per_macroclasse_16()
-    _.sintesi_17()
-    _.valuta_18()
-    _.tabella_pivot_azioni()
-    _.tabella_pivot_obbligazioni_governative()
-    _.tabella_pivot_obbligazioni_societarie()
-    _.obb_totale_22()
-    _.liquidità_23()
-    _.liq_totale_24()
-    _.gestioni_25()
-    _.inv_alt_26()
-    _.asset_allocation_27()
-    _.contatti_28()
-    _.layout()
-    _.salva_file()
+    profilo = Profilo() if args.profile else None
+    _ = Report(
+        t1=args.t1, file_portafoglio=args.input, profilo=profilo, pagine=pagine, thread=args.thread,
+        incrementale=args.incrementale, salva_istantanee=args.istantanee or args.sovrascrivi_istantanee,
+        sovrascrivi_istantanee=args.sovrascrivi_istantanee,
+        punti_grafici=args.punti_grafici or None
+    )
+    _.genera(args.output)
     end = time.time()
-    print("Elapsed time : ", round(end - start, 2), 'seconds')
\ No newline at end of file
+    if args.incrementale:
+        print(f"Calcoli riusati : {len(_.calcoli_riusati)}, ricalcolati : {', '.join(_.calcoli_eseguiti) or 'nessuno'}.")
+    if profilo is not None:
+        profilo.salva(args.profile)
+        profilo.stampa()
+    print("Elapsed time : ", round(end - start, 2), 'seconds')
+
+
+if __name__ == "__main__":
+    main()
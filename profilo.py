@@ -0,0 +1,122 @@
+"""Misure di tempo, memoria e contenuto scritto per ogni fase della creazione del report."""
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from openpyxl.workbook.workbook import Workbook
+
+
+def contenuto(wb: Workbook | None) -> tuple[int, int, int]:
+    """
+    Celle, unioni di celle e stili presenti nel workbook.
+    Gli stili sono i font, riempimenti, bordi, allineamenti, protezioni e formati numerici distinti
+    registrati nel workbook, più gli stili con nome.
+
+    Arguments:
+        wb {Workbook | None} -- workbook del report, None per le fasi che non scrivono (es. caricamento dei dati)
+
+    Returns:
+        tuple[int, int, int] -- celle, unioni e stili
+    """
+    if wb is None:
+        return 0, 0, 0
+    celle = sum(len(ws._cells) for ws in wb.worksheets)
+    unioni = sum(len(ws.merged_cells.ranges) for ws in wb.worksheets)
+    stili = (wb._fonts, wb._fills, wb._borders, wb._alignments, wb._protections, wb._number_formats, wb._named_styles)
+    return celle, unioni, sum(len(elenco) for elenco in stili)
+
+
+class Profilo():
+    """
+    Raccoglie le misure delle fasi del report: tempo reale, tempo di CPU, picco di memoria allocata
+    (tracemalloc) e celle, unioni e stili aggiunti al workbook.
+    Le fasi possono essere annidate: il picco di memoria di una fase comprende quello delle fasi interne.
+    """
+
+    def __init__(self, memoria: bool = True):
+        """
+        Keyword Arguments:
+            memoria {bool} -- misura il picco di memoria; tracemalloc rallenta l'esecuzione,
+                quindi per confrontare i tempi conviene disattivarlo (default: {True})
+        """
+        self.fasi = []
+        self.memoria = memoria
+        self.__picchi = [] # picco già raggiunto dalle fasi aperte, dalla più esterna
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def misura(self, fase: str, wb: Workbook | None = None):
+        """
+        Misura il blocco di codice eseguito all'interno del with.
+
+        Arguments:
+            fase {str} -- nome della fase (es. il nome della pagina)
+
+        Keyword Arguments:
+            wb {Workbook | None} -- workbook in cui la fase scrive, per contare celle, unioni e stili (default: {None})
+        """
+        corrente, picco = tracemalloc.get_traced_memory() # (0, 0) se tracemalloc non è attivo
+        if self.__picchi:
+            self.__picchi[-1] = max(self.__picchi[-1], picco)
+        tracemalloc.reset_peak()
+        self.__picchi.append(corrente)
+        prima = contenuto(wb)
+        inizio, inizio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            secondi, cpu = time.perf_counter() - inizio, time.process_time() - inizio_cpu
+            dopo = contenuto(wb)
+            picco = max(self.__picchi.pop(), tracemalloc.get_traced_memory()[1])
+            if self.__picchi: # il picco della fase interna vale anche per quella che la contiene
+                self.__picchi[-1] = max(self.__picchi[-1], picco)
+            self.fasi.append({
+                'fase': fase, 'secondi': round(secondi, 4), 'cpu': round(cpu, 4),
+                'memoria_picco': picco - corrente, 'celle': dopo[0] - prima[0],
+                'unioni': dopo[1] - prima[1], 'stili': dopo[2] - prima[2],
+            })
+
+    def salva(self, percorso: Path | str):
+        """
+        Salva le misure in formato JSON, nell'ordine in cui le fasi sono terminate.
+
+        Arguments:
+            percorso {Path | str} -- file in cui salvare le misure
+        """
+        Path(percorso).write_text(json.dumps({'fasi': self.fasi}, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    def stampa(self, righe: int | None = None):
+        """
+        Stampa le misure ordinate per tempo reale decrescente.
+
+        Keyword Arguments:
+            righe {int | None} -- numero massimo di fasi da mostrare, tutte se None (default: {None})
+        """
+        fasi = sorted(self.fasi, key=lambda f: f['secondi'], reverse=True)[:righe]
+        larghezza = max([len(f['fase']) for f in fasi] + [4])
+        print(f"{'fase':<{larghezza}}  {'secondi':>8}  {'cpu':>8}  {'MiB':>7}  {'celle':>7}  {'unioni':>6}  {'stili':>5}")
+        for f in fasi:
+            print(
+                f"{f['fase']:<{larghezza}}  {f['secondi']:8.3f}  {f['cpu']:8.3f}  {f['memoria_picco'] / 2**20:7.2f}  "
+                f"{f['celle']:7d}  {f['unioni']:6d}  {f['stili']:5d}"
+            )
+
+
+def misura(profilo: Profilo | None, fase: str, wb: Workbook | None = None):
+    """
+    Misura una fase se il profilo è attivo, altrimenti non fa nulla.
+
+    Arguments:
+        profilo {Profilo | None} -- profilo in cui registrare la fase
+        fase {str} -- nome della fase
+
+    Keyword Arguments:
+        wb {Workbook | None} -- workbook in cui la fase scrive (default: {None})
+
+    Returns:
+        contesto da usare con with
+    """
+    return profilo.misura(fase, wb) if profilo is not None else nullcontext()
@@ -0,0 +1,142 @@
+"""Rendimenti su più orizzonti delle serie storiche di indici e tassi di cambio."""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def posizioni_alla_data(indice: pd.DatetimeIndex, date: list) -> np.ndarray:
+    """
+    Per ogni data restituisce la posizione dell'ultima quotazione disponibile a quella data,
+    così che una data che cade nel weekend o in un festivo usi la quotazione precedente.
+
+    Arguments:
+        indice {pd.DatetimeIndex} -- date delle quotazioni, in ordine crescente
+        date {list} -- date da cercare
+
+    Returns:
+        np.ndarray -- posizioni in indice, -1 per le date precedenti alla prima quotazione
+    """
+    return indice.get_indexer(pd.DatetimeIndex(date), method='pad')
+
+
+def rendimenti_periodo(prezzi: pd.DataFrame, t1: datetime.datetime, orizzonti: dict) -> pd.DataFrame:
+    """
+    Calcola i rendimenti di tutte le serie su tutti gli orizzonti con un'unica operazione sugli array.
+    Per più interrogazioni sugli stessi prezzi conviene costruire una volta IndiceRendimenti.
+    Le date sono risolte, serie per serie, all'ultima quotazione disponibile di quella serie; se la data è
+    precedente alla prima quotazione della serie il rendimento è NaN.
+
+    Arguments:
+        prezzi {pd.DataFrame} -- quotazioni, una colonna per serie, indicizzate per data
+        t1 {datetime.datetime} -- data finale
+        orizzonti {dict} -- nome dell'orizzonte -> data iniziale (es. {'1y': t1 un anno fa})
+
+    Returns:
+        pd.DataFrame -- una riga per serie e una colonna per orizzonte
+    """
+    return IndiceRendimenti(prezzi).rendimenti(t1, orizzonti)
+
+
+class IndiceRendimenti():
+    """
+    Indice dei rendimenti logaritmici cumulati di più serie di prezzi con le stesse date: il valore di ogni data
+    è la somma dei rendimenti logaritmici fino a quella data (il logaritmo del prezzo). Il rendimento tra
+    due date qualsiasi è la differenza di due valori dell'indice, quindi ogni orizzonte o serie di periodi
+    si calcola senza ripassare lo storico; l'unico costo che cresce con lo storico è la ricerca binaria della data.
+    Nelle date in cui una serie non è quotata (es. festivi diversi tra indici) l'indice riporta l'ultimo valore
+    della serie, così che ogni data sia risolta sull'ultima quotazione disponibile di quella serie.
+    """
+
+    def __init__(self, prezzi: pd.DataFrame):
+        """
+        Arguments:
+            prezzi {pd.DataFrame} -- prezzi positivi, una colonna per serie, indicizzati per data
+        """
+        if not prezzi.index.is_monotonic_increasing:
+            prezzi = prezzi.sort_index()
+        self.date = pd.DatetimeIndex(prezzi.index)
+        self.serie = prezzi.columns
+        self.__istanti = self.date.as_unit('ns').asi8
+        with np.errstate(divide='ignore', invalid='ignore'):
+            logaritmi = np.log(prezzi.to_numpy(dtype=float))
+        self.cumulati = pd.DataFrame(logaritmi).ffill().to_numpy() # date x serie
+
+    def posizioni(self, date) -> np.ndarray:
+        """
+        Posizione dell'ultima data dell'indice non successiva a ogni data (come posizioni_alla_data).
+
+        Arguments:
+            date {list-like} -- date da cercare
+
+        Returns:
+            np.ndarray -- posizioni, -1 per le date precedenti alla prima data dell'indice
+        """
+        istanti = pd.DatetimeIndex(date).as_unit('ns').asi8
+        return np.searchsorted(self.__istanti, istanti, side='right') - 1
+
+    def matrice(self, inizi, fini) -> np.ndarray:
+        """
+        Rendimenti di tutte le serie per più periodi, con un'unica operazione sugli array.
+        Le date sono risolte all'ultima quotazione disponibile di ogni serie; il rendimento è NaN se una delle
+        due date precede l'indice o la prima quotazione della serie.
+
+        Arguments:
+            inizi {list-like} -- date iniziali dei periodi
+            fini {list-like} -- date finali dei periodi, una per periodo o una sola per tutti
+
+        Returns:
+            np.ndarray -- rendimenti, serie x periodi
+        """
+        inizi = self.posizioni(inizi)
+        fini = np.broadcast_to(self.posizioni(fini), inizi.shape)
+        rendimenti = np.expm1(self.cumulati[fini] - self.cumulati[inizi])
+        rendimenti[(inizi == -1) | (fini == -1)] = np.nan
+        return rendimenti.T
+
+    def ret(self, serie: str, inizio, fine) -> float:
+        """
+        Rendimento di una serie tra due date, risolte all'ultima data disponibile.
+
+        Arguments:
+            serie {str} -- colonna dei prezzi
+            inizio {datetime.datetime | str} -- data iniziale
+            fine {datetime.datetime | str} -- data finale
+
+        Returns:
+            float -- rendimento, NaN se non calcolabile (vedi matrice)
+        """
+        colonna = self.serie.get_loc(serie)
+        inizio, fine = (
+            np.searchsorted(self.__istanti, pd.Timestamp(data).value, side='right') - 1
+            for data in (inizio, fine)
+        )
+        if inizio == -1 or fine == -1:
+            return np.nan
+        return float(np.expm1(self.cumulati[fine, colonna] - self.cumulati[inizio, colonna]))
+
+    def rendimenti(self, t1: datetime.datetime, orizzonti: dict) -> pd.DataFrame:
+        """
+        Rendimenti di tutte le serie fino a t1 su tutti gli orizzonti (come rendimenti_periodo).
+
+        Arguments:
+            t1 {datetime.datetime} -- data finale
+            orizzonti {dict} -- nome dell'orizzonte -> data iniziale
+
+        Returns:
+            pd.DataFrame -- una riga per serie e una colonna per orizzonte
+        """
+        return pd.DataFrame(self.matrice(list(orizzonti.values()), [t1]), index=self.serie, columns=list(orizzonti))
+
+    def mobili(self, date) -> pd.DataFrame:
+        """
+        Rendimenti di tutte le serie tra ogni data e la successiva (es. le fine mese per i rendimenti mensili).
+
+        Arguments:
+            date {list-like} -- date in ordine crescente
+
+        Returns:
+            pd.DataFrame -- una riga per periodo, indicizzata per data finale, e una colonna per serie
+        """
+        date = pd.DatetimeIndex(date)
+        return pd.DataFrame(self.matrice(date[:-1], date[1:]).T, index=date[1:], columns=self.serie)
@@ -0,0 +1,89 @@
+"""Indicatori di rischio del portafoglio e dei benchmark su più finestre temporali, dalle serie mensili."""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# Finestre su cui calcolare gli indicatori: nome -> mesi fino a t1
+FINESTRE = {'1y': 12, '3y': 36, '5y': 60}
+# Tasso privo di rischio annuo dello Sharpe ratio
+TASSO_PRIVO_DI_RISCHIO = 0.0
+# Indicatori di ogni serie e, rispetto al portafoglio, di ogni benchmark
+ASSOLUTI = ('Volatilità', 'Max drawdown', 'Sharpe')
+RELATIVI = ('Tracking error', 'Information ratio', 'Beta')
+
+
+def indicatori(serie: pd.DataFrame, portafoglio: str, t1: datetime.datetime, finestre: dict = FINESTRE,
+    tasso: float = TASSO_PRIVO_DI_RISCHIO, periodi_anno: int = 12) -> pd.DataFrame:
+    """
+    Calcola volatilità, max drawdown e Sharpe di ogni serie e tracking error, information ratio e beta
+    del portafoglio rispetto a ogni altra serie, per tutte le finestre che terminano a t1.
+    Il calcolo è un'unica passata sugli array: una matrice finestre x mesi seleziona i rendimenti di ogni finestra
+    e somme, quadrati e prodotti incrociati di tutte le serie si ottengono con prodotti matriciali.
+    Gli indicatori di una finestra sono NaN se la storia è più corta della finestra o se la serie ha valori mancanti;
+    sono tutti NaN se t1 non è successiva alla prima data.
+
+    Arguments:
+        serie {pd.DataFrame} -- valori mensili, una colonna per serie, indicizzati per data
+        portafoglio {str} -- colonna del portafoglio, rispetto a cui si calcolano gli indicatori relativi
+        t1 {datetime.datetime} -- data finale, risolta all'ultima data disponibile
+
+    Keyword Arguments:
+        finestre {dict} -- nome -> numero di periodi fino a t1 (default: {FINESTRE})
+        tasso {float} -- tasso privo di rischio annuo (default: {TASSO_PRIVO_DI_RISCHIO})
+        periodi_anno {int} -- periodi in un anno, per annualizzare (default: {12})
+
+    Returns:
+        pd.DataFrame -- una riga per serie e una colonna per (finestra, indicatore);
+            gli indicatori relativi del portafoglio rispetto a sé stesso sono NaN
+    """
+    serie = serie.sort_index()
+    posizione = serie.index.get_indexer([t1], method='pad')[0]
+    colonne = pd.MultiIndex.from_product([list(finestre), [*ASSOLUTI, *RELATIVI]])
+    if posizione < 1: # nessun rendimento fino a t1
+        return pd.DataFrame(np.nan, index=serie.columns, columns=colonne)
+    livelli = serie.to_numpy(dtype=float)[:posizione + 1]
+    rendimenti = livelli[1:] / livelli[:-1] - 1 # periodi x serie
+    periodi = len(rendimenti)
+    p = serie.columns.get_loc(portafoglio)
+
+    n = np.array(list(finestre.values()))
+    valide = (n <= periodi)[:, None]
+    # Finestre x periodi: 1 per i rendimenti degli ultimi n periodi di ogni finestra
+    maschera = (np.arange(periodi)[None, :] >= periodi - n[:, None]).astype(float)
+    mancanti = maschera @ np.isnan(rendimenti) > 0
+    r = np.nan_to_num(rendimenti)
+    attivi = r[:, [p]] - r
+    somme = maschera @ r
+    media = somme / n[:, None]
+    varianza = (maschera @ r**2 - n[:, None] * media**2) / (n[:, None] - 1)
+    varianza_attivi = (maschera @ attivi**2 - n[:, None] * (media[:, [p]] - media)**2) / (n[:, None] - 1)
+    covarianza = (maschera @ (r[:, [p]] * r) - n[:, None] * media[:, [p]] * media) / (n[:, None] - 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatilita = np.sqrt(varianza * periodi_anno)
+        sharpe = (media * periodi_anno - tasso) / volatilita
+        tracking_error = np.sqrt(np.maximum(varianza_attivi, 0) * periodi_anno)
+        information_ratio = (media[:, [p]] - media) * periodi_anno / tracking_error
+        beta = covarianza / varianza
+
+        # Max drawdown: per ogni finestra, massimo progressivo dei valori dall'inizio della finestra
+        inizio = periodi - n[:, None] # posizione del valore iniziale di ogni finestra
+        dentro = np.arange(periodi + 1)[None, :] >= inizio
+        valori = np.where(dentro[:, :, None], livelli[None, -(periodi + 1):], np.nan) # finestre x date x serie
+        massimi = np.fmax.accumulate(valori, axis=1)
+        max_drawdown = np.fmin.reduce(valori / massimi - 1, axis=1)
+
+    risultati = {'Volatilità': volatilita, 'Max drawdown': max_drawdown, 'Sharpe': sharpe,
+        'Tracking error': tracking_error, 'Information ratio': information_ratio, 'Beta': beta}
+    nulli = ~valide | mancanti # finestre x serie
+    for nome, valori in risultati.items():
+        if nome in RELATIVI:
+            valori[nulli | nulli[:, [p]]] = np.nan
+            valori[:, p] = np.nan
+        else:
+            valori[nulli] = np.nan
+
+    # Finestre x serie x indicatori -> serie x (finestra, indicatore)
+    dati = np.stack([risultati[nome] for nome in (*ASSOLUTI, *RELATIVI)], axis=2)
+    return pd.DataFrame(dati.transpose(1, 0, 2).reshape(len(serie.columns), -1), index=serie.columns, columns=colonne)
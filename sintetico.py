@@ -0,0 +1,223 @@
+"""Generazione di file di input sintetici, con gli stessi fogli letti dal report, per misurarne le prestazioni."""
+import argparse
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from dataset import FOGLI
+from portfolio import COMPOSIZIONI, ESCLUSI_PERFORMANCE, VOCI_MANUALI
+
+# Indici e tassi di cambio dei fogli Indici e Indici_in_euro, nell'ordine della pagina 4
+INDICI = [
+    'S&P 500', 'NIKKEI', 'NASDAQ', 'FTSE 100', 'FTSE MIB', 'DAX', 'DOW JONES INDUSTRIAL AVERAGE', 'EURO STOXX 50',
+    'HANG SENG', 'MSCI WORLD', 'MSCI EMERGING MARKETS', 'HFRX EWSI', 'WTI CRUDE OIL FUTURE', 'LONDON GOLD MARKET FIXING LTD',
+    'COMMODITY RESEARCH BUREAU', 'LYXOR ETF EURO CASH', 'LYXOR ETF EURO CORP BOND', 'BARCLAYS EUROAGG CORP TR',
+    'JPM GBI EMU 1_10', 'JPM GBI EMU 3_5', 'JPM GBI EMU 1_3', 'USDEUR', 'GBPEUR', 'CHFEUR', 'AUDEUR', 'NOKEUR'
+]
+# Intermediari citati per nome dalle pagine del report
+INTERMEDIARI = [
+    'Banca Patrimoni Nespoli', 'Banca Patrimoni Artes', 'Banca Valsabbina Artes', 'Corner', 'Mediobanca', 'Mediolanum',
+    'Banca Valsabbina Nespoli', 'Crédit Agricole Artes', 'Crédit Agricole B.N.', 'Altro'
+]
+# Intermediari esclusi dalla performance del mese (pagina 11): devono sempre essere presenti
+ESCLUSI = list(ESCLUSI_PERFORMANCE)
+CATEGORIE = ['CASH', 'GP', 'EQUITY', 'CASH_FOREIGN_CURR', 'CORPORATE_BOND', 'GOVERNMENT_BOND', 'ALTERNATIVE_ASSET', 'HEDGE_FUND']
+DIVISE = ['EUR', 'USD', 'CHF', 'GBP', 'JPY', 'AUD', 'NOK', 'SEK', 'CAD', 'HKD']
+# Inizio dello storico mensile: i benchmark e i portafogli partono da 100 a inizio 2007
+INIZIO_STORICO = '2006-11-30'
+
+
+def nomi_intermediari(numero: int) -> list[str]:
+    """
+    Nomi degli intermediari: quelli citati dalle pagine, poi 'Intermediario 1', 'Intermediario 2', ...
+    Gli intermediari esclusi dalla pagina 11 sono sempre compresi.
+
+    Arguments:
+        numero {int} -- numero di intermediari, almeno len(ESCLUSI)
+
+    Returns:
+        list[str] -- nomi degli intermediari
+    """
+    if numero < len(ESCLUSI):
+        raise ValueError(f'Servono almeno {len(ESCLUSI)} intermediari')
+    nomi = INTERMEDIARI + [f'Intermediario {k}' for k in range(1, numero - len(INTERMEDIARI) + 1)]
+    altri = [nome for nome in nomi if nome not in ESCLUSI][:numero - len(ESCLUSI)]
+    return [nome for nome in nomi if nome in ESCLUSI or nome in altri]
+
+
+def _livelli(rng: np.random.Generator, righe: int, colonne: int, volatilita: float = 0.04) -> np.ndarray:
+    """
+    Serie storiche casuali con base 100, una per colonna.
+
+    Arguments:
+        rng {np.random.Generator} -- generatore di numeri casuali
+        righe {int} -- numero di date
+        colonne {int} -- numero di serie
+
+    Keyword Arguments:
+        volatilita {float} -- deviazione standard dei rendimenti logaritmici per data (default: {0.04})
+
+    Returns:
+        np.ndarray -- livelli, una riga per data
+    """
+    return 100 * np.exp(np.cumsum(rng.normal(0.003, volatilita, (righe, colonne)), axis=0))
+
+
+def portfolio(rng: np.random.Generator, posizioni: int, intermediari: list[str], categorie: int,
+    divise: int) -> pd.DataFrame:
+    """
+    Posizioni del foglio Portfolio, distribuite a rotazione su intermediari, categorie e divise.
+    Circa una posizione su sette è liquidata nel mese (quantità in t1 nulla).
+
+    Arguments:
+        rng {np.random.Generator} -- generatore di numeri casuali
+        posizioni {int} -- numero di posizioni
+        intermediari {list[str]} -- intermediari
+        categorie {int} -- numero di categorie, prese nell'ordine di CATEGORIE
+        divise {int} -- numero di divise, prese nell'ordine di DIVISE
+
+    Returns:
+        pd.DataFrame -- posizioni con le colonne del foglio Portfolio
+    """
+    indice = np.arange(posizioni)
+    divisa = np.array(DIVISE[:divise])[indice % divise]
+    quantita_t0 = rng.integers(1, 1000, posizioni).astype(float)
+    quantita_t1 = np.where(indice % 7 == 0, 0.0, quantita_t0)
+    prezzo_t0, prezzo_t1 = rng.uniform(50, 150, posizioni), rng.uniform(50, 150, posizioni)
+    cambio_t0 = np.where(divisa == 'EUR', 1.0, rng.uniform(0.5, 1.5, posizioni))
+    cambio_t1 = cambio_t0 * np.where(divisa == 'EUR', 1.0, rng.uniform(0.97, 1.03, posizioni))
+    return pd.DataFrame({
+        'INTERMEDIARIO': np.array(intermediari)[indice % len(intermediari)],
+        'CATEGORIA': np.array(CATEGORIE[:categorie])[(indice // len(intermediari)) % categorie],
+        'PRODOTTO': [f'Prodotto {i}' for i in indice],
+        'DIVISA': divisa,
+        'QUANTITA t0': quantita_t0,
+        'QUANTITA t1': quantita_t1,
+        'prezzo_di_carico': rng.uniform(50, 150, posizioni),
+        'PREZZO t0': prezzo_t0,
+        'PREZZO t1': prezzo_t1,
+        'CAMBIO t0': cambio_t0,
+        'CAMBIO t1': cambio_t1,
+        'TOTALE t0': quantita_t0 * prezzo_t0 * cambio_t0,
+        'TOTALE t1': quantita_t1 * prezzo_t1 * cambio_t1,
+    })
+
+
+def genera(file_portafoglio: Path | str, t1: str = '31/12/2024', posizioni: int = 60, intermediari: int = 10,
+    categorie: int = len(CATEGORIE), divise: int = 3, anni: int = 5, seme: int = 0) -> Path:
+    """
+    Scrive un file di input sintetico con tutti i fogli letti dal report (vedi dataset.FOGLI):
+    Portfolio con l'intestazione nella seconda riga, Indici e Indici_in_euro con due righe di intestazione,
+    Indici_giornalieri con una colonna di date per ogni serie, Benchmark, Portafoglio, Delta, Gestioni,
+    Componenti con i livelli degli indici dei benchmark di portfolio.COMPOSIZIONI e Movimenti con alcuni
+    conferimenti e prelievi nel mese di t1.
+    Lo stesso seme produce sempre lo stesso file.
+
+    Arguments:
+        file_portafoglio {Path | str} -- file excel da creare
+
+    Keyword Arguments:
+        t1 {str} -- data finale del report, ultima data degli storici (default: {'31/12/2024'})
+        posizioni {int} -- numero di posizioni del foglio Portfolio (default: {60})
+        intermediari {int} -- numero di intermediari, almeno 4 (default: {10})
+        categorie {int} -- numero di categorie, al massimo 8 (default: {8})
+        divise {int} -- numero di divise, al massimo 10 (default: {3})
+        anni {int} -- anni di storico giornaliero del foglio Indici_giornalieri (default: {5})
+        seme {int} -- seme del generatore di numeri casuali (default: {0})
+
+    Returns:
+        Path -- file creato
+    """
+    rng = np.random.default_rng(seme)
+    t1 = datetime.datetime.strptime(t1, '%d/%m/%Y')
+    mesi = pd.date_range(INIZIO_STORICO, t1, freq='ME', name='Date')
+    mesi_2007 = mesi[mesi >= '2007-01-01']
+    strumenti = portfolio(rng, posizioni, nomi_intermediari(intermediari), categorie, divise)
+
+    fogli = {}
+    for nome in ('Indici', 'Indici_in_euro'):
+        fogli[nome] = pd.DataFrame(
+            _livelli(rng, len(mesi), len(INDICI)), index=mesi,
+            columns=pd.MultiIndex.from_tuples([(indice, 'PX_LAST') for indice in INDICI])
+        )
+    giorni = pd.bdate_range(t1 - pd.DateOffset(years=anni), t1)
+    giornalieri = {}
+    for data, serie in zip(FOGLI['Indici_giornalieri']['names'][::2], FOGLI['Indici_giornalieri']['names'][1::2]):
+        giornalieri[data] = giorni
+        giornalieri[serie] = _livelli(rng, len(giorni), 1, volatilita=0.01)[:, 0]
+    fogli['Indici_giornalieri'] = pd.DataFrame(giornalieri)
+    fogli['Benchmark'] = pd.DataFrame(
+        _livelli(rng, len(mesi), 26), index=mesi,
+        columns=['benchmark_2007', *(f'bk_{k}' for k in range(2, 25)), 'benchmark_2016', 'benchmark_2022']
+    )
+    fogli['Portafoglio'] = pd.DataFrame(
+        _livelli(rng, len(mesi_2007), 5), index=mesi_2007, columns=['ptf_2007', 'a', 'b', 'ptf_2016', 'ptf_2022']
+    )
+    # Voci manuali e Δ% YTD degli intermediari, usato finché non ci sono le istantanee dei mesi precedenti
+    voci = [*(nome for nome in strumenti['INTERMEDIARIO'].unique() if nome not in ESCLUSI), *VOCI_MANUALI]
+    fogli['Delta'] = pd.DataFrame(
+        rng.uniform(0, 1, (len(voci), 5)), index=voci,
+        columns=['Totale mese passato', 'Totale mese corrente', 'Δ', 'Δ%', 'Δ% YTD']
+    )
+    gestioni = strumenti.loc[strumenti['CATEGORIA'] == 'GP', 'INTERMEDIARIO'].unique()
+    fogli['Gestioni'] = pd.DataFrame(
+        [(nome, categoria, 1000.0, 900.0) for nome in gestioni for categoria in CATEGORIE if categoria != 'GP'],
+        columns=['INTERMEDIARIO', 'CATEGORIA', 'TOTALE t1', 'TOTALE t0']
+    )
+    componenti = list(dict.fromkeys(indice for composizione in COMPOSIZIONI.values() for indice in composizione['pesi']))
+    fogli['Componenti'] = pd.DataFrame(_livelli(rng, len(mesi), len(componenti)), index=mesi, columns=componenti)
+    performance = [nome for nome in strumenti['INTERMEDIARIO'].unique() if nome not in ESCLUSI]
+    giorni = pd.date_range(t1.replace(day=1), t1)
+    fogli['Movimenti'] = pd.DataFrame({
+        'DATA': rng.choice(giorni, 2 * len(performance)),
+        'INTERMEDIARIO': rng.choice(performance, 2 * len(performance)),
+        'IMPORTO': rng.normal(0, 10000, 2 * len(performance)).round(2),
+    }).sort_values('DATA', kind='stable')
+
+    file_portafoglio = Path(file_portafoglio)
+    with pd.ExcelWriter(file_portafoglio) as writer:
+        pd.DataFrame([['Portafoglio']]).to_excel(writer, sheet_name='Portfolio', header=False, index=False)
+        strumenti.to_excel(writer, sheet_name='Portfolio', startrow=1, index=False)
+        fogli['Indici'].to_excel(writer, sheet_name='Indici')
+        fogli['Indici_in_euro'].to_excel(writer, sheet_name='Indici_in_euro')
+        fogli['Indici_giornalieri'].to_excel(writer, sheet_name='Indici_giornalieri', index=False)
+        for nome in ('Benchmark', 'Portafoglio', 'Delta', 'Gestioni', 'Componenti', 'Movimenti'):
+            fogli[nome].to_excel(writer, sheet_name=nome, index=nome not in ('Gestioni', 'Movimenti'))
+    return file_portafoglio
+
+
+def logo(percorso: Path | str) -> Path:
+    """
+    Scrive un logo segnaposto, per creare il report in una cartella senza il logo della società.
+
+    Arguments:
+        percorso {Path | str} -- file immagine da creare
+
+    Returns:
+        Path -- file creato
+    """
+    percorso = Path(percorso)
+    percorso.parent.mkdir(parents=True, exist_ok=True)
+    Image.new('RGB', (240, 70), '#31869B').save(percorso)
+    return percorso
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crea un file di input sintetico per il report.')
+    parser.add_argument('output', help='file excel da creare')
+    parser.add_argument('--t1', default='31/12/2024', help='data finale del report (gg/mm/aaaa)')
+    parser.add_argument('--posizioni', type=int, default=60)
+    parser.add_argument('--intermediari', type=int, default=10)
+    parser.add_argument('--categorie', type=int, default=len(CATEGORIE))
+    parser.add_argument('--divise', type=int, default=3)
+    parser.add_argument('--anni', type=int, default=5, help='anni di storico giornaliero')
+    parser.add_argument('--seme', type=int, default=0)
+    args = parser.parse_args()
+    genera(args.output, args.t1, args.posizioni, args.intermediari, args.categorie, args.divise, args.anni, args.seme)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Stili con nome condivisi dalle pagine del report."""
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.workbook.workbook import Workbook
+
+BLU = '31869B'
+
+# Nomi degli stili registrati nel workbook
+TITOLO = 'report_titolo'
+INTESTAZIONE = 'report_intestazione'
+CORPO = 'report_corpo'
+CORPO_NOME = 'report_corpo_nome'
+SOMMA = 'report_somma'
+SOMMA_NOME = 'report_somma_nome'
+POSITIVO = 'report_positivo'
+NEGATIVO = 'report_negativo'
+NON_DISPONIBILE = 'report_non_disponibile'
+TESTO = 'report_testo'
+MERCATO_TITOLO = 'report_mercato_titolo'
+MERCATO_INTESTAZIONE = 'report_mercato_intestazione'
+MERCATO_SEZIONE = 'report_mercato_sezione'
+MERCATO_NOME = 'report_mercato_nome'
+COMPOSIZIONE = 'report_composizione'
+COMPOSIZIONE_PESO = 'report_composizione_peso'
+MESE_INTESTAZIONE = 'report_mese_intestazione'
+MESE_NOME = 'report_mese_nome'
+MESE_CORPO = 'report_mese_corpo'
+MESE_TOTALE_NOME = 'report_mese_totale_nome'
+MESE_TOTALE = 'report_mese_totale'
+PREZZI_INTESTAZIONE = 'report_prezzi_intestazione'
+PREZZI_CORPO = 'report_prezzi_corpo'
+PREZZI_CORPO_CENTRATO = 'report_prezzi_corpo_centrato'
+CONTATTI = 'report_contatti'
+DISCLAIMER = 'report_disclaimer'
+
+_tratteggiato = Side(border_style='dashed', color=BLU)
+_sottile = Side(border_style='thin', color=BLU)
+_nero = Side(border_style='thin', color='000000')
+_medio = Side(border_style='medium', color=BLU)
+_medio_nero = Side(border_style='medium', color='000000')
+_tratto_punto = Side(border_style='mediumDashDot', color=BLU)
+
+STILI = {
+    # Titolo della pagina, su sfondo blu
+    TITOLO: {
+        'font': Font(name='Times New Roman', size=48, bold=True, color='FFFFFF'),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+    },
+    # Intestazione delle colonne delle tabelle
+    INTESTAZIONE: {
+        'font': Font(name='Times New Roman', size=10, color='FFFFFF'),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center', wrap_text=True),
+        'border': Border(right=_sottile, left=_sottile),
+    },
+    # Corpo delle tabelle, bordi tratteggiati
+    CORPO: {
+        'font': Font(name='Times New Roman', size=9),
+        'alignment': Alignment(horizontal='center'),
+        'border': Border(bottom=_tratteggiato, right=_tratteggiato, left=_tratteggiato),
+    },
+    CORPO_NOME: {
+        'font': Font(name='Times New Roman', size=9, color='000000'),
+        'alignment': Alignment(horizontal='left', vertical='center'),
+        'border': Border(bottom=_tratteggiato, right=_tratteggiato, left=_tratteggiato),
+    },
+    # Riga dei totali, bordi continui
+    SOMMA: {
+        'font': Font(name='Times New Roman', size=9, bold=True),
+        'alignment': Alignment(horizontal='center'),
+        'border': Border(bottom=_sottile, right=_sottile, left=_sottile, top=_sottile),
+    },
+    SOMMA_NOME: {
+        'font': Font(name='Times New Roman', size=9, bold=True),
+        'alignment': Alignment(horizontal='left', vertical='center'),
+        'border': Border(bottom=_sottile, right=_sottile, left=_sottile, top=_sottile),
+    },
+    # Variazioni percentuali positive e negative
+    POSITIVO: {
+        'font': Font(color='00B050'),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(bottom=_nero, right=_nero),
+    },
+    NEGATIVO: {
+        'font': Font(color='FF0000'),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(bottom=_nero, right=_nero),
+    },
+    # Variazione non calcolabile (es. manca la quotazione a una data)
+    NON_DISPONIBILE: {
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(bottom=_nero, right=_nero),
+    },
+    # Riquadro di testo
+    TESTO: {
+        'font': Font(name='Times New Roman', size=12, color=BLU),
+        'fill': PatternFill(fill_type='solid', fgColor='FFFFFF'),
+    },
+    # Tabella dei rendimenti di mercato (pagina 4): titolo, intestazione, righe delle sezioni e nomi degli indici
+    MERCATO_TITOLO: {
+        'font': Font(name='Times New Roman', size=10, bold=True, color='FFFFFF'),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(top=_medio_nero, bottom=_medio_nero, right=_medio_nero, left=_medio_nero),
+    },
+    MERCATO_INTESTAZIONE: {
+        'font': Font(name='Times New Roman', size=9, bold=True, color='FFFFFF'),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(top=_medio_nero, bottom=_medio_nero),
+    },
+    MERCATO_SEZIONE: {
+        'font': Font(name='Times New Roman', size=8, bold=True, color='006666'),
+        'fill': PatternFill(fill_type='solid', fgColor='92CDDC'),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(top=_medio_nero, left=_medio_nero, bottom=_medio_nero, right=_medio_nero),
+    },
+    MERCATO_NOME: {
+        'font': Font(name='Times New Roman', size=8, bold=True, color='FFFFFF'),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(vertical='center'),
+        'border': Border(left=_nero, bottom=_nero, right=_nero),
+    },
+    # Composizione del nuovo benchmark (pagina 10): indice e peso
+    COMPOSIZIONE: {
+        'font': Font(name='Calibri', size=11, bold=True, italic=True, color='000000'),
+        'border': Border(bottom=_tratto_punto),
+    },
+    COMPOSIZIONE_PESO: {
+        'font': Font(name='Calibri', size=11, bold=True, italic=True, color='000000'),
+        'alignment': Alignment(horizontal='right'),
+        'border': Border(bottom=_tratto_punto),
+    },
+    # Performance del mese (pagina 11): il formato dei numeri è impostato per colonna
+    MESE_INTESTAZIONE: {
+        'font': Font(name='Times New Roman', size=10, color='FFFFFF'),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center', wrap_text=True),
+    },
+    MESE_NOME: {
+        'font': Font(name='Times New Roman', size=9, color='000000'),
+        'alignment': Alignment(horizontal='left', vertical='center', wrap_text=True),
+        'border': Border(left=_tratteggiato, bottom=_tratteggiato, right=_tratteggiato),
+    },
+    MESE_CORPO: {
+        'font': Font(name='Times New Roman', size=9),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(right=_tratteggiato, bottom=_tratteggiato),
+    },
+    MESE_TOTALE_NOME: {
+        'font': Font(name='Times New Roman', size=9, bold=True),
+        'alignment': Alignment(horizontal='left', vertical='center', wrap_text=True),
+        'border': Border(top=_medio, right=_medio, left=_medio, bottom=_medio),
+    },
+    MESE_TOTALE: {
+        'font': Font(name='Times New Roman', size=9, bold=True),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+        'border': Border(top=_medio, right=_medio, left=_medio, bottom=_medio),
+    },
+    # Prezzi degli strumenti (pagine 12-14): il formato dei numeri è impostato per colonna
+    PREZZI_INTESTAZIONE: {
+        'font': Font(name='Times New Roman', size=10, color='FFFFFF', bold=True),
+        'fill': PatternFill(fill_type='solid', fgColor=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+    },
+    PREZZI_CORPO: {
+        'font': Font(name='Times New Roman', size=10),
+    },
+    PREZZI_CORPO_CENTRATO: {
+        'font': Font(name='Times New Roman', size=10),
+        'alignment': Alignment(horizontal='center'),
+    },
+    # Contatti e disclaimer (pagina 28)
+    CONTATTI: {
+        'font': Font(name='Times New Roman', size=11, bold=True, color=BLU),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+    },
+    DISCLAIMER: {
+        'font': Font(name='Times New Roman', size=11, bold=True, italic=True, color=BLU),
+        'alignment': Alignment(horizontal='left', vertical='center', wrap_text=True),
+    },
+}
+
+
+def registra_stili(wb: Workbook):
+    """
+    Registra gli stili con nome nel workbook, così che le celle li applichino per nome
+    invece di costruire font, bordi e riempimenti cella per cella.
+    Un NamedStyle può appartenere a un solo workbook, quindi gli stili sono creati di nuovo per ogni workbook.
+
+    Arguments:
+        wb {Workbook} -- workbook del report
+    """
+    for nome, attributi in STILI.items():
+        wb.add_named_style(NamedStyle(name=nome, **attributi))
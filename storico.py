@@ -0,0 +1,123 @@
+"""
+Report arretrati di un cliente: un report per ogni fine mese di un periodo, leggendo il file di input una sola volta.
+I fogli letti, le fasi di calcolo che non dipendono dalla data e le serie della sezione di mercato
+sono condivisi tra i mesi; per ogni mese si calcola solo ciò che dipende da t1.
+
+Esempio:
+    python storico.py artes.xlsx --dal 31/01/2023 --al 31/12/2024 --output report
+"""
+import argparse
+import datetime
+import json
+import time
+import traceback
+from pathlib import Path
+
+import pandas as pd
+
+from batch import stampa_riepilogo
+from dataset import CacheFogli, Dataset
+from portfolio import Report, fogli_necessari, risolvi_pagine
+
+
+def fine_mesi(dal: str, al: str) -> list[str]:
+    """
+    Ultimi giorni dei mesi compresi tra due date, estremi inclusi (il mese di `dal` conta anche se la data
+    non è un fine mese).
+
+    Arguments:
+        dal {str} -- prima data (gg/mm/aaaa)
+        al {str} -- ultima data (gg/mm/aaaa)
+
+    Returns:
+        list[str] -- date di fine mese (gg/mm/aaaa), in ordine crescente
+    """
+    inizio = datetime.datetime.strptime(dal, '%d/%m/%Y')
+    fine = datetime.datetime.strptime(al, '%d/%m/%Y')
+    date = pd.date_range(inizio.replace(day=1), fine, freq='ME')
+    return [data.strftime('%d/%m/%Y') for data in date]
+
+
+def file_report(file_portafoglio: Path | str, t1: str, cartella: Path | str) -> Path:
+    """
+    Percorso del report di un mese: report_<nome del file di input>_<aaaa-mm>.xlsx nella cartella di output.
+
+    Arguments:
+        file_portafoglio {Path | str} -- file excel del cliente
+        t1 {str} -- data finale del report (gg/mm/aaaa)
+        cartella {Path | str} -- cartella in cui salvare i report
+
+    Returns:
+        Path -- percorso del report
+    """
+    mese = datetime.datetime.strptime(t1, '%d/%m/%Y').strftime('%Y-%m')
+    return Path(cartella).joinpath(f'report_{Path(file_portafoglio).stem}_{mese}.xlsx')
+
+
+def storico(file_portafoglio: Path | str, dal: str, al: str, cartella: Path | str = 'report',
+    pagine: list | None = None) -> list[dict]:
+    """
+    Crea i report di tutti i fine mese tra `dal` e `al` e salva il riepilogo in riepilogo.json.
+    I report sono creati uno dopo l'altro nello stesso processo, così che condividano i dati già letti e calcolati;
+    un mese che fallisce (es. manca la quotazione a fine mese) non interrompe gli altri. Le istantanee della pagina 11
+    non vengono salvate: il foglio Portfolio contiene solo l'ultimo mese.
+
+    Arguments:
+        file_portafoglio {Path | str} -- file excel del cliente
+        dal {str} -- prima data (gg/mm/aaaa)
+        al {str} -- ultima data (gg/mm/aaaa)
+
+    Keyword Arguments:
+        cartella {Path | str} -- cartella in cui salvare i report (default: {'report'})
+        pagine {list | None} -- pagine da creare, per nome o numero (default: {tutte})
+
+    Returns:
+        list[dict] -- esito di ogni report, nell'ordine dei mesi
+    """
+    inizio = time.perf_counter()
+    Path(cartella).mkdir(parents=True, exist_ok=True)
+    file_portafoglio = Path(file_portafoglio).resolve()
+    dati = Dataset(
+        file_portafoglio, fogli=fogli_necessari(risolvi_pagine(pagine)), cache=CacheFogli(Path.cwd().joinpath('.cache'))
+    )
+    calcoli = {}
+    risultati = []
+    for t1 in fine_mesi(dal, al):
+        inizio_mese = time.perf_counter()
+        file_output = file_report(file_portafoglio, t1, cartella)
+        risultato = {'input': str(file_portafoglio), 'output': str(file_output), 'esito': 'ok', 'errore': None}
+        try:
+            Report(
+                t1=t1, file_portafoglio=file_portafoglio, dati=dati, pagine=pagine, calcoli=calcoli, salva_istantanee=False
+            ).genera(file_output)
+        except Exception:
+            risultato['esito'] = 'errore'
+            risultato['errore'] = traceback.format_exc()
+        risultato['secondi'] = round(time.perf_counter() - inizio_mese, 3)
+        risultati.append(risultato)
+        print(f"{risultato['esito']:>6}  {risultato['secondi']:8.2f} s  {file_output.name}")
+
+    riepilogo = {
+        'dal': dal, 'al': al, 'secondi': round(time.perf_counter() - inizio, 3),
+        'ok': sum(r['esito'] == 'ok' for r in risultati), 'errori': sum(r['esito'] != 'ok' for r in risultati),
+        'report': risultati,
+    }
+    Path(cartella).joinpath('riepilogo.json').write_text(json.dumps(riepilogo, indent=2, ensure_ascii=False), encoding='utf-8')
+    stampa_riepilogo(riepilogo)
+    return risultati
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crea un report per ogni fine mese di un periodo.')
+    parser.add_argument('input', nargs='?', default='artes.xlsx', help='file excel da lavorare (default: artes.xlsx)')
+    parser.add_argument('--dal', required=True, help='prima data del periodo (gg/mm/aaaa)')
+    parser.add_argument('--al', required=True, help='ultima data del periodo (gg/mm/aaaa)')
+    parser.add_argument('-o', '--output', default='report', help='cartella dei report (default: report)')
+    parser.add_argument('--pages', nargs='+', default=None, metavar='PAGINA', help='pagine da creare, per nome o numero')
+    args = parser.parse_args()
+    risultati = storico(args.input, args.dal, args.al, args.output, args.pages)
+    raise SystemExit(1 if any(r['esito'] != 'ok' for r in risultati) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Disegno delle tabelle per intermediario delle pagine del report."""
+import pandas as pd
+from openpyxl.worksheet.worksheet import Worksheet
+
+from stili import CORPO, CORPO_NOME, INTESTAZIONE, SOMMA, SOMMA_NOME, TITOLO
+
+# Colonne occupate dal titolo della pagina
+COLONNE_PAGINA = 12
+# Prima colonna della tabella in base al numero di intermediari, per centrarla nella pagina
+COLONNA_INIZIALE = {1: 4, 2: 4, 3: 3, 4: 3, 5: 2, 6: 2}
+
+
+def impaginazione(intermediari: int, colonne: int) -> tuple[int, int]:
+    """
+    Prima colonna della tabella e colonne occupate dal titolo.
+    Da uno a sette intermediari il titolo occupa la pagina; oltre, o senza intermediari, la tabella è allineata
+    a sinistra e il titolo è largo quanto la tabella.
+
+    Arguments:
+        intermediari {int} -- numero di colonne degli intermediari
+        colonne {int} -- numero totale di colonne della tabella, compresa quella dei nomi
+
+    Returns:
+        tuple[int, int] -- prima colonna della tabella e colonne occupate dal titolo
+    """
+    if 1 <= intermediari <= 7:
+        return COLONNA_INIZIALE.get(intermediari, 1), COLONNE_PAGINA
+    return 1, colonne
+
+
+def scrivi_tabella(ws: Worksheet, titolo: str | None, tabella: pd.DataFrame, min_col: int = 1,
+    larghezza_titolo: int = COLONNE_PAGINA, formati: dict | None = None, margine: float = 2.5, min_row: int = 8,
+    totali: bool = True):
+    """
+    Scrive una tabella già calcolata in un'unica passata: titolo della pagina, intestazione,
+    una riga per ogni riga di tabella e la riga dei totali in fondo.
+    Gli stili sono applicati per intervallo (intestazione, corpo, totali) e i formati numerici per colonna.
+    I valori mancanti (NaN, es. un indicatore non calcolabile) sono scritti come 'n.d.'.
+
+    Arguments:
+        ws {Worksheet} -- foglio in cui scrivere
+        titolo {str | None} -- titolo della pagina, None per una tabella aggiunta sotto a un'altra
+        tabella {pd.DataFrame} -- valori da scrivere; l'indice contiene i nomi delle righe,
+            le colonne le intestazioni e l'ultima riga i totali
+
+    Keyword Arguments:
+        min_col {int} -- prima colonna della tabella (default: {1})
+        larghezza_titolo {int} -- colonne occupate dal titolo (default: {COLONNE_PAGINA})
+        formati {dict | None} -- formato numerico delle colonne, '#,0' per quelle non indicate (default: {None})
+        margine {float} -- spazio aggiunto alla larghezza della colonna dei nomi (default: {2.5})
+        min_row {int} -- riga dell'intestazione (default: {8})
+        totali {bool} -- l'ultima riga di tabella è quella dei totali (default: {True})
+    """
+    formati = [(formati or {}).get(colonna, '#,0') for colonna in tabella.columns]
+
+    # Titolo
+    if titolo is not None:
+        ws['A1'] = titolo
+        ws['A1'].style = TITOLO
+        ws.merge_cells(start_row=1, end_row=4, start_column=1, end_column=larghezza_titolo)
+
+    # Intestazione, su due righe
+    ws.row_dimensions[min_row].height = 20
+    ws.row_dimensions[min_row + 1].height = 20
+    for colonna, valore in enumerate(['', *tabella.columns], start=min_col):
+        cella = ws.cell(row=min_row, column=colonna, value=valore)
+        cella.style = INTESTAZIONE
+        ws.merge_cells(start_row=min_row, end_row=min_row + 1, start_column=colonna, end_column=colonna)
+        ws.column_dimensions[cella.column_letter].width = 12
+
+    # Corpo e totali
+    righe = list(tabella.itertuples(name=None))
+    for riga, (nome, *valori) in enumerate(righe, start=min_row + 2):
+        totale = totali and riga == min_row + 1 + len(righe)
+        cella = ws.cell(row=riga, column=min_col, value='TOTALE' if totale else nome)
+        cella.style = SOMMA_NOME if totale else CORPO_NOME
+        for colonna, (valore, formato) in enumerate(zip(valori, formati), start=min_col + 1):
+            cella = ws.cell(row=riga, column=colonna, value='n.d.' if pd.isna(valore) else valore)
+            cella.style = SOMMA if totale else CORPO
+            cella.number_format = formato
+
+    # Larghezza della colonna dei nomi
+    nomi = righe[:-1] if totali else righe
+    if nomi:
+        larghezza = max(len(str(nome)) for nome, *_ in nomi)
+        ws.column_dimensions[ws.cell(row=min_row, column=min_col).column_letter].width = larghezza + margine
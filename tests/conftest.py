@@ -0,0 +1,5 @@
+"""I moduli del report sono nella cartella principale del repository, non in un pacchetto."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
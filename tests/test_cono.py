@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import immagini
+import sintetico
+from cono import bande
+from portfolio import Report
+
+
+def test_riserva_se_la_storia_e_corta():
+    mesi = pd.date_range('2020-01-31', '2024-12-31', freq='ME')
+    lunga = pd.Series(np.linspace(100, 140, len(mesi)), index=mesi, name='benchmark_2007')
+    corta = lunga.where(mesi >= '2021-12-31').rename('benchmark_2022')
+
+    attese = bande(lunga, '2021-12-31').loc['2021-12-31':]
+    assert np.allclose(bande(corta, '2021-12-31', riserva=lunga).to_numpy(), attese.to_numpy())
+
+
+def test_pagina_9_senza_componenti(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sintetico.logo(tmp_path / immagini.LOGO)
+    file_portafoglio = sintetico.genera(tmp_path / 'input.xlsx')
+    wb = load_workbook(file_portafoglio)
+    del wb['Componenti']
+    ws = wb['Benchmark']
+    colonna = next(cella.column for cella in ws[1] if cella.value == 'benchmark_2022')
+    for riga in ws.iter_rows(min_row=2):
+        if riga[0].value < pd.Timestamp('2021-12-31'):
+            riga[colonna - 1].value = None
+    wb.save(file_portafoglio)
+
+    report = Report('31/12/2024', file_portafoglio='input.xlsx', pagine=['cono_9'], thread=1)
+    report.genera(tmp_path / 'report.xlsx')
+
+    ws = load_workbook(tmp_path / 'report.xlsx')['9.cono_2']
+    assert len(ws._charts) == 1
+    assert ws['A8'].value is None
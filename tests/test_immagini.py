@@ -0,0 +1,41 @@
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+from PIL import Image as PILImage
+
+import immagini
+
+
+def _report(percorso_logo, percorso):
+    wb = Workbook()
+    for nome in ('1.copertina', '2.indice', '3.an_mkt'):
+        ws = wb.create_sheet(nome)
+        ws.add_image(immagini.immagine(percorso_logo), 'F27')
+    immagini.salva(wb, percorso)
+
+
+def test_logo_condiviso_salvato_una_volta(tmp_path):
+    logo = tmp_path / 'logo.bmp'
+    PILImage.new('RGB', (40, 20), 'blue').save(logo)
+    percorso = tmp_path / 'report.xlsx'
+    _report(logo, percorso)
+
+    with zipfile.ZipFile(percorso) as archivio:
+        media = [nome for nome in archivio.namelist() if nome.startswith('xl/media/')]
+    assert len(media) == (1 if immagini.condivisione_supportata() else 3)
+    wb = load_workbook(percorso)
+    for nome in ('1.copertina', '2.indice', '3.an_mkt'):
+        assert len(wb[nome]._images) == 1
+        assert (wb[nome]._images[0].width, wb[nome]._images[0].height) == (40, 20)
+
+
+def test_versione_non_verificata_usa_openpyxl(tmp_path, monkeypatch):
+    monkeypatch.setattr(immagini, 'VERSIONE_OPENPYXL', (0, 0))
+    logo = tmp_path / 'logo.png'
+    PILImage.new('RGB', (40, 20), 'red').save(logo)
+    percorso = tmp_path / 'report.xlsx'
+    _report(logo, percorso)
+
+    assert not immagini.condivisione_supportata()
+    wb = load_workbook(percorso)
+    assert all(len(wb[nome]._images) == 1 for nome in ('1.copertina', '2.indice', '3.an_mkt'))
@@ -0,0 +1,46 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import immagini
+import sintetico
+from istantanee import Istantanee, performance_totale
+from portfolio import Report
+
+
+def test_senza_movimenti_i_rendimenti_coincidono(tmp_path):
+    portfolio = pd.DataFrame({
+        'INTERMEDIARIO': ['A', 'A', 'B'], 'TOTALE t0': [100.0, 50.0, 200.0], 'TOTALE t1': [110.0, 55.0, 190.0],
+    })
+    istantanee = Istantanee(tmp_path / 'istantanee.csv').leggi()
+
+    # Gennaio: il mese coincide con l'anno, nessuna istantanea da cui concatenare i rendimenti
+    totale = performance_totale(portfolio, datetime.datetime(2024, 1, 31), istantanee)
+    assert np.isclose(totale['mese'], 355 / 350 - 1)
+    assert np.allclose([totale['ytd'], totale['mwr_mese'], totale['mwr_ytd']], totale['mese'])
+
+    # Dicembre senza le istantanee dei mesi precedenti: da inizio anno non è calcolabile
+    totale = performance_totale(portfolio, datetime.datetime(2024, 12, 31), istantanee)
+    assert np.isclose(totale['mwr_mese'], totale['mese'])
+    assert np.isnan(totale['ytd']) and np.isnan(totale['mwr_ytd'])
+
+
+def test_tabelle_senza_movimenti(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sintetico.logo(tmp_path / immagini.LOGO)
+    file_portafoglio = sintetico.genera(tmp_path / 'input.xlsx')
+    wb = load_workbook(file_portafoglio)
+    del wb['Movimenti']
+    wb.save(file_portafoglio)
+
+    report = Report('31/12/2024', file_portafoglio='input.xlsx', pagine=['andamento_7', 'performance_11'], thread=1)
+    report.genera(tmp_path / 'report.xlsx')
+
+    wb = load_workbook(tmp_path / 'report.xlsx')
+    assert [cella.value for riga in wb['7.andamento']['E30:F31'] for cella in riga] == ['n.d.'] * 4
+    ws = wb['11.perf_mese']
+    righe = {riga[0]: riga[5:7] for riga in ws.iter_rows(min_row=7, max_col=7, values_only=True)}
+    assert righe['Totale Complessivo'] == ('n.d.', 'n.d.')
+    assert righe['Totale ponderato per il denaro'] == ('n.d.', 'n.d.')
@@ -0,0 +1,30 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from rendimenti import IndiceRendimenti, rendimenti_periodo
+
+
+def test_festivi_diversi_usano_la_quotazione_della_serie():
+    # Il 25/04 è festivo solo per il primo indice, il 01/05 solo per il secondo
+    prezzi = pd.DataFrame(
+        {'FTSE MIB': [100.0, 101.0, np.nan, 103.0, 104.0], 'S&P 500': [200.0, 202.0, 204.0, 206.0, np.nan]},
+        index=pd.to_datetime(['2024-04-23', '2024-04-24', '2024-04-25', '2024-04-30', '2024-05-01']),
+    )
+    rendimenti = rendimenti_periodo(
+        prezzi, datetime.datetime(2024, 5, 1), {'da festivo': datetime.datetime(2024, 4, 25)}
+    )
+    assert np.isclose(rendimenti.loc['FTSE MIB', 'da festivo'], 104.0 / 101.0 - 1)
+    assert np.isclose(rendimenti.loc['S&P 500', 'da festivo'], 206.0 / 204.0 - 1)
+
+
+def test_data_precedente_alla_prima_quotazione():
+    prezzi = pd.DataFrame(
+        {'a': [100.0, 110.0, 121.0], 'b': [np.nan, 50.0, 55.0]},
+        index=pd.to_datetime(['2024-01-31', '2024-02-29', '2024-03-31']),
+    )
+    indice = IndiceRendimenti(prezzi)
+    assert np.isclose(indice.ret('a', '2024-01-31', '2024-03-31'), 0.21)
+    assert np.isnan(indice.ret('b', '2024-01-31', '2024-03-31'))
+    assert np.isnan(indice.ret('a', '2023-12-31', '2024-03-31'))
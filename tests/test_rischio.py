@@ -0,0 +1,21 @@
+from openpyxl import load_workbook
+
+import immagini
+import sintetico
+from portfolio import Report
+
+
+def test_indicatori_non_calcolabili(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sintetico.logo(tmp_path / immagini.LOGO)
+    sintetico.genera(tmp_path / 'input.xlsx')
+
+    # Da gennaio 2007 ci sono solo tre rendimenti mensili: nessun indicatore sulle finestre di uno o più anni
+    report = Report('30/04/2007', file_portafoglio='input.xlsx', pagine=['analisi_rischio'], thread=1)
+    report.genera(tmp_path / 'report.xlsx')
+
+    ws = load_workbook(tmp_path / 'report.xlsx')['7.1.rischio']
+    portafoglio = [cella.value for riga in ws['B10:D12'] for cella in riga]
+    benchmark = [cella.value for riga in ws.iter_rows(min_row=16, max_row=ws.max_row, min_col=2, max_col=10) for cella in riga]
+    assert portafoglio == ['n.d.'] * 9
+    assert benchmark and all(valore == 'n.d.' for valore in benchmark if valore is not None)